@@ -1,6 +1,9 @@
+import logging
+import threading
+from concurrent.futures import Future
 from contextlib import contextmanager
 from pathlib import PurePosixPath
-from typing import Generator
+from typing import Any, Generator
 from urllib.parse import urlparse
 
 import duckdb
@@ -8,6 +11,8 @@ import duckdb
 from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
 from recap.browsers.fs import FilePath
 
+log = logging.getLogger(__name__)
+
 SUPPORTED_SCHEMES = set(["", "file", "http", "https", "s3"])
 
 
@@ -27,18 +32,46 @@ class FileColumnAnalyzer(AbstractAnalyzer):
     field.
 
     CSV and TSV schemas are inferred using DuckDB's `read_csv_auto` function.
+    Parquet schemas are read from the file's footer, so no data pages are
+    read. Remote files are read with ranged requests. Required (non-nullable)
+    Parquet columns are read from `parquet_schema`, which reuses the footer
+    from DuckDB's object cache.
+
+    With `batch` enabled, the second Parquet file analyzed in a directory
+    reads the schemas of every Parquet file in the directory with a single
+    `parquet_schema` call over a glob; DuckDB reads the footers with its own
+    threads. Files are grouped by schema, and each distinct schema is
+    described once. Other files in the directory are then served from
+    memory. The first file is described on its own, so directories where
+    only one file is analyzed (like sampled Hive partitions) never read
+    every footer. CSV and TSV files are always described one at a time,
+    since their schemas are inferred from each file's data.
     """
 
-    def __init__(self, url: str):
+    def __init__(self, url: str, batch: bool = False):
         """
         :param url: Base URL to connect to. The URL may be any format that
             DuckDB accepts (local, S3, http, and so on). Local URLs may start
             with either '/' or 'file://'.
+        :param batch: Describe all Parquet files in a directory at once.
         """
 
         # DuckDB doesn't understand 'file://' prefix, so remove it.
         self.url = url.removeprefix("file://")
+        self.batch = batch
         self.db = duckdb.connect()
+        # Cache Parquet footers between DESCRIBE and parquet_schema queries.
+        self.db.execute("SET enable_object_cache=true")
+        # Batched Parquet columns waiting to be returned, keyed by file URL.
+        self.batched: dict[str, dict[str, Column]] = {}
+        # The first Parquet file analyzed in each directory, keyed by the
+        # directory's URL.
+        self.first_files: dict[str, str] = {}
+        # Done when a directory's batch is in `batched`, keyed by the
+        # directory's URL.
+        self.batches: dict[str, Future] = {}
+        # Guards the dictionaries above. Never held while querying DuckDB.
+        self.lock = threading.Lock()
 
     def analyze(
         self,
@@ -53,35 +86,164 @@ class FileColumnAnalyzer(AbstractAnalyzer):
 
         path_posix = PurePosixPath(str(path))
         url_and_path = self.url + str(path_posix)
+        # DuckDB connections aren't thread-safe, but their cursors are.
+        cursor = self.db.cursor()
         match path_posix.suffix:
             case (".csv" | ".tsv"):
-                self.db.execute(
-                    "DESCRIBE SELECT * FROM read_csv_auto(?)",
-                    [url_and_path],
-                )
+                columns_dict = self._describe(cursor, "read_csv_auto", url_and_path)
             case ".parquet":
-                self.db.execute(
-                    "DESCRIBE SELECT * FROM read_parquet(?)",
-                    [url_and_path],
-                )
+                columns_dict = None
+                if self.batch:
+                    columns_dict = self._batched_parquet_columns(
+                        cursor,
+                        url_and_path,
+                    )
+                if columns_dict is None:
+                    columns_dict = self._parquet_columns(cursor, url_and_path)
             case _:
                 return None
+        return Columns.parse_obj(columns_dict)
+
+    def _describe(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        function: str,
+        url: str,
+    ) -> dict[str, Column]:
+        cursor.execute(f"DESCRIBE SELECT * FROM {function}(?)", [url])
         columns_dict = {}
-        for column_tuple in self.db.fetchall():
+        for column_tuple in cursor.fetchall():
             name = column_tuple[0]
             type_ = column_tuple[1]
             nullable = column_tuple[2] == "YES"
             columns_dict[name] = Column(type=type_, nullable=nullable)
-        return Columns.parse_obj(columns_dict)
+        return columns_dict
+
+    def _parquet_columns(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        url: str,
+        schema: list[tuple[Any, ...]] | None = None,
+    ) -> dict[str, Column]:
+        """
+        :param schema: The file's `(name, repetition_type)` rows from
+            `parquet_schema`, if they've already been read.
+        """
+
+        columns_dict = self._describe(cursor, "read_parquet", url)
+        if schema is None:
+            cursor.execute(
+                "SELECT name, repetition_type FROM parquet_schema(?)",
+                [url],
+            )
+            schema = cursor.fetchall()
+        # DESCRIBE says every column is nullable, but Parquet's schema knows
+        # which are required.
+        for name, repetition_type in schema:
+            if name in columns_dict and repetition_type == "REQUIRED":
+                columns_dict[name].nullable = False
+        return columns_dict
+
+    def _batched_parquet_columns(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        url: str,
+    ) -> dict[str, Column] | None:
+        """
+        :returns: A Parquet file's columns from its directory's batch, or None
+            if the file wasn't in the batch.
+        """
+
+        # Not PurePosixPath, which would turn 's3://bucket' into 's3:/bucket'.
+        directory = url.rsplit("/", 1)[0]
+        # DuckDB can't glob directories that contain glob characters.
+        if any(c in directory for c in "*?[]{}"):
+            return None
+        with self.lock:
+            if directory not in self.first_files:
+                self.first_files[directory] = url
+                return None
+            batch = self.batches.get(directory)
+            is_owner = batch is None
+            if batch is None:
+                batch = self.batches[directory] = Future()
+        if is_owner:
+            # Other files in the directory wait for the batch, but files in
+            # other directories don't.
+            try:
+                self._describe_parquet_directory(cursor, directory)
+            except duckdb.Error as e:
+                log.debug(
+                    "Unable to batch describe directory=%s",
+                    directory,
+                    exc_info=e,
+                )
+            finally:
+                with self.lock:
+                    # The first file was already described on its own.
+                    self.batched.pop(self.first_files[directory], None)
+                batch.set_result(None)
+        batch.result()
+        with self.lock:
+            # Each file is only analyzed once per crawl, so don't keep it.
+            return self.batched.pop(url, None)
+
+    def _describe_parquet_directory(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        directory: str,
+    ):
+        cursor.execute(
+            """
+            SELECT
+                file_name,
+                name,
+                repetition_type,
+                type,
+                type_length,
+                num_children,
+                converted_type,
+                scale,
+                precision,
+                logical_type
+            FROM parquet_schema(?)
+            """,
+            [f"{directory}/*.parquet"],
+        )
+        schemas: dict[str, list[tuple[Any, ...]]] = {}
+        for row in cursor.fetchall():
+            schemas.setdefault(row[0], []).append(row[1:])
+        columns_by_schema: dict[tuple[Any, ...], dict[str, Column]] = {}
+        batched = {}
+        for file_name, schema in schemas.items():
+            signature = tuple(schema)
+            if signature not in columns_by_schema:
+                columns_by_schema[signature] = self._parquet_columns(
+                    cursor,
+                    file_name,
+                    [row[:2] for row in schema],
+                )
+            batched[file_name] = {
+                name: column.copy()
+                for name, column in columns_by_schema[signature].items()
+            }
+        with self.lock:
+            self.batched |= batched
 
 
 @contextmanager
 def create_analyzer(
     url: str,
+    duckdb_batch: bool = False,
     **_,
 ) -> Generator[FileColumnAnalyzer, None, None]:
+    """
+    :param url: Base URL to connect to.
+    :param duckdb_batch: Describe all Parquet files in a directory at once.
+    """
+
     scheme = urlparse(url).scheme
     if scheme in SUPPORTED_SCHEMES:
-        yield FileColumnAnalyzer(url)
+        yield FileColumnAnalyzer(url, duckdb_batch)
     else:
         raise ValueError(f"Unsupported url={url}")
@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+from typing import Any, Generator
+from urllib.parse import urlparse
+
+import duckdb
+from pydantic import BaseModel
+
+from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
+from recap.browsers.fs import FilePath
+
+from .columns import SUPPORTED_SCHEMES
+
+
+class ColumnChunk(BaseModel):
+    row_group: int
+    num_values: int
+    null_count: int | None
+    min: str | None
+    max: str | None
+    compressed_size: int
+    uncompressed_size: int
+
+
+class ParquetColumn(BaseModel):
+    type: str
+    compression: list[str]
+    compressed_size: int
+    uncompressed_size: int
+    # None if any row group is missing null count statistics.
+    null_count: int | None
+    chunks: list[ColumnChunk] | None = None
+
+
+class ParquetMetadata(BaseMetadataModel):
+    num_rows: int
+    num_row_groups: int
+    columns: dict[str, ParquetColumn]
+
+
+class FileParquetAnalyzer(AbstractAnalyzer):
+    """
+    Use DuckDB's `parquet_metadata` function to read row counts, row group
+    counts, compression, and column chunk statistics from a Parquet file's
+    footer. No data pages are read; remote files are read with a few ranged
+    requests.
+    """
+
+    def __init__(self, url: str, column_chunks: bool = False):
+        """
+        :param url: Base URL to connect to. The URL may be any format that
+            DuckDB accepts (local, S3, http, and so on). Local URLs may start
+            with either '/' or 'file://'.
+        :param column_chunks: Include each row group's column chunk
+            statistics (min, max, null count, and sizes). Files with many row
+            groups have many chunks.
+        """
+
+        # DuckDB doesn't understand 'file://' prefix, so remove it.
+        self.url = url.removeprefix("file://")
+        self.column_chunks = column_chunks
+        self.db = duckdb.connect()
+
+    def analyze(self, path: FilePath) -> ParquetMetadata | None:
+        """
+        :param path: Path relative to the URL root.
+        :returns: Parquet footer metadata, or None if the file isn't Parquet.
+        """
+
+        path_posix = PurePosixPath(str(path))
+        if path_posix.suffix != ".parquet":
+            return None
+        # DuckDB connections aren't thread-safe, but their cursors are.
+        cursor = self.db.cursor()
+        cursor.execute(
+            "SELECT * FROM parquet_metadata(?)",
+            [self.url + str(path_posix)],
+        )
+        names = [description[0] for description in cursor.description]
+        rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        row_groups: dict[int, int] = {}
+        columns: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            row_groups[row["row_group_id"]] = row["row_group_num_rows"]
+            column = columns.setdefault(
+                row["path_in_schema"],
+                {
+                    "type": row["type"],
+                    "compression": [],
+                    "compressed_size": 0,
+                    "uncompressed_size": 0,
+                    "null_count": 0,
+                    "chunks": [] if self.column_chunks else None,
+                },
+            )
+            if row["compression"] not in column["compression"]:
+                column["compression"].append(row["compression"])
+            column["compressed_size"] += row["total_compressed_size"] or 0
+            column["uncompressed_size"] += row["total_uncompressed_size"] or 0
+            null_count = row.get("stats_null_count")
+            if column["null_count"] is not None and null_count is not None:
+                column["null_count"] += null_count
+            else:
+                column["null_count"] = None
+            if self.column_chunks:
+                column["chunks"].append(
+                    ColumnChunk(
+                        row_group=row["row_group_id"],
+                        num_values=row["num_values"],
+                        null_count=null_count,
+                        min=_statistic(row, "min"),
+                        max=_statistic(row, "max"),
+                        compressed_size=row["total_compressed_size"],
+                        uncompressed_size=row["total_uncompressed_size"],
+                    )
+                )
+        return ParquetMetadata(
+            num_rows=sum(row_groups.values()),
+            num_row_groups=len(row_groups),
+            columns=columns,
+        )
+
+
+def _statistic(row: dict[str, Any], name: str) -> str | None:
+    """
+    :returns: A column chunk's min or max statistic. Files written by older
+        Parquet writers (and older DuckDB versions) only have the deprecated
+        `stats_min`/`stats_max` statistics.
+    """
+
+    value = row.get(f"stats_{name}_value")
+    return value if value is not None else row.get(f"stats_{name}")
+
+
+@contextmanager
+def create_analyzer(
+    url: str,
+    parquet_column_chunks: bool = False,
+    **_,
+) -> Generator[FileParquetAnalyzer, None, None]:
+    """
+    :param url: Base URL to connect to.
+    :param parquet_column_chunks: Include column chunk statistics.
+    """
+
+    scheme = urlparse(url).scheme
+    if scheme in SUPPORTED_SCHEMES:
+        yield FileParquetAnalyzer(url, parquet_column_chunks)
+    else:
+        raise ValueError(f"Unsupported url={url}")
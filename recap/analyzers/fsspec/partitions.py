@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+from typing import Generator
+
+from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
+from recap.browsers.fs import (
+    DirectoryPath,
+    FilesystemBrowser,
+    create_browser,
+    is_data_file,
+    partition_values,
+)
+
+
+class Partitions(BaseMetadataModel):
+    # Partition keys, outermost first.
+    keys: list[str]
+    # Number of data files for each value of each partition key.
+    values: dict[str, dict[str, int]]
+    # Number of leaf partition directories.
+    partitions: int
+    files: int
+    size: int
+
+
+class DirectoryPartitionAnalyzer(AbstractAnalyzer):
+    """
+    Describe a directory of Hive-style partitions (`dt=2023-01-01/hour=00/`)
+    as one dataset: its partition keys, the values of each key, and file
+    counts and sizes.
+
+    Directories are listed through the crawl's FilesystemBrowser, so
+    prefetched listings are reused, and the browser's `children` call reuses
+    the analyzer's `ls` and `find` calls.
+    """
+
+    def __init__(self, browser: FilesystemBrowser):
+        """
+        :param browser: The FilesystemBrowser to list partitions with.
+        """
+
+        self.browser = browser
+
+    def analyze(self, path: DirectoryPath) -> Partitions | None:
+        """
+        :param path: Path relative to the URL root.
+        :returns: Partition values and counts, or None if the directory isn't
+            partitioned.
+        """
+
+        found = self.browser.partition_files(str(path))
+        if found is None:
+            return None
+        absolute_path = str(
+            PurePosixPath(self.browser.base_path, str(path).lstrip("/"))
+        )
+        keys: list[str] = []
+        values: dict[str, dict[str, int]] = {}
+        partitions = set()
+        files = 0
+        size = 0
+        for info in found:
+            relative_path = str(PurePosixPath("/", info["name"])).removeprefix(
+                str(PurePosixPath("/", absolute_path))
+            )
+            if not is_data_file(relative_path):
+                continue
+            partition = partition_values(relative_path)
+            for key, value in partition:
+                if key not in keys:
+                    keys.append(key)
+                key_values = values.setdefault(key, {})
+                key_values[value] = key_values.get(value, 0) + 1
+            partitions.add(tuple(partition))
+            files += 1
+            size += info.get("size") or 0
+        return Partitions(
+            keys=keys,
+            values=values,
+            partitions=len(partitions),
+            files=files,
+            size=size,
+        )
+
+
+@contextmanager
+def create_analyzer(
+    url: str,
+    hive_partitions: bool = False,
+    **config,
+) -> Generator[DirectoryPartitionAnalyzer, None, None]:
+    """
+    :param url: The filesystem URL to analyze.
+    :param hive_partitions: Must be set. Skip this analyzer otherwise, since
+        it lists every directory the crawler visits.
+    """
+
+    assert hive_partitions, "Partition analysis requires hive_partitions=true"
+    with create_browser(url=url, hive_partitions=hive_partitions, **config) as browser:
+        yield DirectoryPartitionAnalyzer(browser)
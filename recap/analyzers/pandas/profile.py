@@ -1,17 +1,21 @@
 import logging
 import math
-from contextlib import contextmanager
-from datetime import datetime
+import re
+from contextlib import ExitStack, contextmanager
+from datetime import date, time
 from json import dumps
 from pathlib import PurePosixPath
-from typing import Any, Generator
+from typing import Any, Generator, Iterable, Iterator
 
 import pandas
+import sqlalchemy
 
 from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
-from recap.browsers.db import TablePath, ViewPath
+from recap.browsers.db import TablePath, ViewPath, create_browser
 from recap.browsers.fs import FilePath
 
+from .streaming import StreamingProfiler
+
 log = logging.getLogger(__name__)
 
 
@@ -38,20 +42,53 @@ class Profile(BaseMetadataModel):
 
 class ProfileAnalyzer(AbstractAnalyzer):
     """
-    Analyze CSV, TSV, JSON, Parquet, tables, and views using Parquet's
-    `describe()` method. `describe()` returns data profile statistics such as
-    count, unique, min, max, and various percentiles.
+    Analyze CSV, TSV, JSON, Parquet, tables, and views. The analyzer returns
+    the same statistics as Pandas' `describe()` method: count, unique, min,
+    max, and various percentiles.
+
+    Data is read `chunksize` rows at a time (row groups for Parquet, and a
+    server-side cursor for tables and views), and statistics are merged into
+    bounded-size sketches as each chunk arrives (see
+    `recap.analyzers.pandas.streaming`). Memory use doesn't depend on the
+    file or table size. Percentiles, unique, and top/freq are exact until a
+    column has more values than the sketches keep.
+
+    When PyArrow is installed, CSV, TSV, and Parquet files are parsed with
+    PyArrow's readers, and each column of a batch is converted and profiled
+    separately. Strings become dictionary-encoded categoricals rather than a
+    Python object per cell. The CSV reader's batches are sized in bytes, not
+    rows.
+
+    Only columns in `include_columns` (if set) and not in `exclude_columns`
+    are profiled. Parquet and table reads skip the other columns entirely;
+    other formats drop them before they're converted to Pandas.
     """
 
     def __init__(
         self,
         url: str,
+        engine: sqlalchemy.engine.Engine | None = None,
+        chunksize: int = 100_000,
+        include_columns: list[str] | None = None,
+        exclude_columns: list[str] = [],
     ):
         """
         :param url: Base URL to connect to. The URL may be any format that
             Pandas accepts (local, S3, http, and so on).
+        :param engine: SQLAlchemy engine to read tables and views with, if the
+            URL is a database URL.
+        :param chunksize: Number of rows to read at a time.
+        :param include_columns: Columns to profile. Profile all columns if
+            unset.
+        :param exclude_columns: Columns not to profile.
         """
+
+        assert chunksize > 0, f"Expected chunksize > 0, but got {chunksize}"
         self.url = url
+        self.engine = engine
+        self.chunksize = chunksize
+        self.include_columns = include_columns
+        self.exclude_columns = exclude_columns
 
     def analyze(
         self,
@@ -64,76 +101,235 @@ class ProfileAnalyzer(AbstractAnalyzer):
         :returns: Data profile descriptions for each column.
         """
 
+        profiler = StreamingProfiler()
+        for chunk in self._read_chunks(path):
+            if chunk is None:
+                # The reader started over.
+                profiler = StreamingProfiler()
+            elif isinstance(chunk, pandas.DataFrame):
+                profiler.update(chunk)
+            else:
+                profiler.update_arrow(chunk)
+        description = profiler.describe()
+        if not any(stats["count"] for stats in description.values()):
+            return None
+        return Profile.parse_obj(
+            {
+                name: ColumnProfile(**_json_compatible(stats))
+                for name, stats in description.items()
+            }
+        )
+
+    def _read_chunks(
+        self,
+        path: TablePath | ViewPath | FilePath,
+    ) -> Iterator[Any]:
+        """
+        :returns: An iterator of DataFrames or PyArrow RecordBatches with only
+            the selected columns. A `None` chunk means the path is being read
+            again from the start.
+        """
+
         path_posix = PurePosixPath(str(path))
         url_and_path = self.url + str(path_posix)
-        df = pandas.DataFrame()
         match (path, path_posix.suffix):
             case (FilePath(), ".csv"):
-                df = pandas.read_csv(url_and_path)
+                yield from self._read_csv(url_and_path, ",")
             case (FilePath(), ".tsv"):
-                df = pandas.read_csv(url_and_path, sep="\t")
+                yield from self._read_csv(url_and_path, "\t")
             case (FilePath(), ".json" | ".ndjson" | ".jsonl"):
-                df = pandas.read_json(url_and_path, lines=True)
+                with pandas.read_json(
+                    url_and_path,
+                    lines=True,
+                    chunksize=self.chunksize,
+                ) as reader:
+                    for df in reader:
+                        yield df[self._select_columns(df.columns)]
             case (FilePath(), ".parquet"):
-                df = pandas.read_parquet(url_and_path)
+                yield from self._read_parquet(url_and_path)
             case (TablePath() | ViewPath(), _):
                 # Meh.. try a SQL connection, I guess.
                 # Types are pretty busted with structured matching. :(
                 name = (
                     path.table if isinstance(path, TablePath) else path.view
                 )  # pyright: ignore [reportGeneralTypeIssues]
-                # TODO should sample the data here
-                df = pandas.read_sql_table(
-                    table_name=name,
-                    schema=path.schema_,  # pyright: ignore [reportGeneralTypeIssues]
-                    con=self.url,
+                engine = self.engine or sqlalchemy.create_engine(self.url)
+                try:
+                    # Stream rows with a server-side cursor where the driver
+                    # supports it, instead of fetching the whole table.
+                    with engine.connect().execution_options(
+                        stream_results=True
+                    ) as conn:
+                        columns = None
+                        if self.include_columns is not None or self.exclude_columns:
+                            columns = self._select_columns(
+                                column["name"]
+                                for column in sqlalchemy.inspect(conn).get_columns(
+                                    name,
+                                    path.schema_,  # pyright: ignore [reportGeneralTypeIssues]
+                                )
+                            )
+                        yield from pandas.read_sql_table(
+                            table_name=name,
+                            schema=path.schema_,  # pyright: ignore [reportGeneralTypeIssues]
+                            con=conn,
+                            columns=columns,
+                            chunksize=self.chunksize,
+                        )
+                finally:
+                    if engine is not self.engine:
+                        engine.dispose()
+
+    def _read_csv(self, url: str, sep: str) -> Iterator[Any]:
+        """
+        :returns: An iterator of DataFrames or PyArrow RecordBatches. A `None`
+            chunk means the file is being read again from the start, and
+            earlier chunks should be discarded.
+        """
+
+        try:
+            import fsspec
+            import pyarrow
+            from pyarrow import csv
+        except ImportError:
+            yield from self._read_csv_pandas(url, sep)
+            return
+        parse_options = csv.ParseOptions(delimiter=sep)
+        # Treat empty strings as nulls, like Pandas.
+        convert_options = csv.ConvertOptions(strings_can_be_null=True)
+        convert_options.column_types = {}
+        while True:
+            with fsspec.open(url, compression="infer") as f:
+                reader = csv.open_csv(
+                    f,
+                    parse_options=parse_options,
+                    convert_options=convert_options,
                 )
-        return self._analyze_dataframe(df) if not df.empty else None
-
-    def _analyze_dataframe(self, df: pandas.DataFrame) -> Profile:
-        profile_dict = {}
-        df_description = df.describe(
-            percentiles=[0.25, 0.5, 0.75, 0.95, 0.99, 0.999],
-            include="all",
-            # Get rid of FutureWarning
-            datetime_is_numeric=True,
-        )
-        # Get rid of 'nan' for JSON.
-        df_description = df_description.replace({math.nan: None})
-        for name, stats_dict in df_description.to_dict().items():
-            # Replace percentiles if they're set.
-            formatted_percentiles = (
-                {
-                    "p25": stats_dict.pop("25%"),
-                    "p50": stats_dict.pop("50%"),
-                    "p75": stats_dict.pop("75%"),
-                    "p95": stats_dict.pop("95%"),
-                    "p99": stats_dict.pop("99%"),
-                    "p999": stats_dict.pop("99.9%"),
+                # Pandas doesn't parse dates, times, or timestamps in CSVs.
+                # Read them as strings so profiles match `pandas.read_csv`.
+                temporal = {
+                    field.name: pyarrow.string()
+                    for field in reader.schema
+                    if pyarrow.types.is_temporal(field.type)
                 }
-                if "25%" in stats_dict
-                else {}
-            )
-            column_profile_dict: dict[str, Any] = formatted_percentiles | stats_dict
-            # Replace datetime with ISO 8601 for JSON.
-            column_profile_dict = dict(
-                [
-                    (k, v.isoformat()) if isinstance(v, datetime) else (k, v)
-                    for k, v in column_profile_dict.items()
-                ]
+                if temporal:
+                    convert_options.column_types = (
+                        convert_options.column_types | temporal
+                    )
+                    continue
+                try:
+                    for batch in reader:
+                        yield batch.select(self._select_columns(batch.schema.names))
+                    return
+                except pyarrow.ArrowInvalid as e:
+                    # Column types come from the first block, so a value
+                    # that doesn't fit appears later as a conversion error.
+                    # Read the column as strings instead, like Pandas does.
+                    match = re.match(r"In CSV column #(\d+)", str(e))
+                    if not match:
+                        log.debug("Falling back to Pandas for url=%s", url, exc_info=e)
+                        yield None
+                        yield from self._read_csv_pandas(url, sep)
+                        return
+                    column = reader.schema.names[int(match.group(1))]
+                    log.debug(
+                        "Reading column=%s as strings for url=%s",
+                        column,
+                        url,
+                        exc_info=e,
+                    )
+                    convert_options.column_types = convert_options.column_types | {
+                        column: pyarrow.string()
+                    }
+                    yield None
+
+    def _read_csv_pandas(self, url: str, sep: str) -> Iterator[Any]:
+        with pandas.read_csv(
+            url,
+            sep=sep,
+            chunksize=self.chunksize,
+            # A callable doesn't fail if a file lacks some columns.
+            usecols=lambda column: column in self._select_columns([column]),
+        ) as reader:
+            yield from reader
+
+    def _read_parquet(self, url: str) -> Iterator[Any]:
+        try:
+            import fsspec
+            from pyarrow.parquet import ParquetFile
+        except ImportError:
+            # Without PyArrow, Pandas reads the whole file at once.
+            df = pandas.read_parquet(url)
+            yield df[self._select_columns(df.columns)]
+            return
+        with fsspec.open(url) as f:
+            parquet_file = ParquetFile(f)
+            yield from parquet_file.iter_batches(
+                batch_size=self.chunksize,
+                columns=self._select_columns(parquet_file.schema_arrow.names),
             )
-            # Pandas `top` can be a list or dict if input was JSON.
-            # Convert it to a JSON string.
-            if column_profile_dict["top"] is not None and not isinstance(
-                column_profile_dict["top"], str
-            ):
-                column_profile_dict["top"] = dumps(column_profile_dict["top"])
-            # Finally! Create the ColumnProfile.
-            profile_dict[name] = ColumnProfile(**column_profile_dict)
-        return Profile.parse_obj(profile_dict)
+
+    def _select_columns(self, columns: Iterable[str]) -> list[str]:
+        """
+        :returns: The columns to profile, in their original order.
+        """
+
+        return [
+            column
+            for column in columns
+            if (self.include_columns is None or column in self.include_columns)
+            and column not in self.exclude_columns
+        ]
+
+
+def _json_compatible(stats: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert statistics to values the ColumnProfile model and JSON encoder
+    accept.
+    """
+
+    top = stats.get("top")
+    if isinstance(top, (date, time)):
+        # Replace dates and times (from Parquet and PyArrow) with ISO 8601.
+        stats["top"] = top.isoformat()
+    elif top is not None and not isinstance(top, str):
+        # Pandas `top` can be a list or dict if input was JSON.
+        # Convert it to a JSON string.
+        stats["top"] = dumps(top)
+    # Get rid of 'nan' for JSON.
+    return {
+        k: None if isinstance(v, float) and math.isnan(v) else v
+        for k, v in stats.items()
+    }
 
 
 @contextmanager
-def create_analyzer(url: str, **_) -> Generator["ProfileAnalyzer", None, None]:
-    # TODO if URL is DB, create an engine that uses engine.* configs like db.py
-    yield ProfileAnalyzer(url)
+def create_analyzer(
+    url: str,
+    pandas_chunksize: int = 100_000,
+    pandas_include_columns: list[str] | None = None,
+    pandas_exclude_columns: list[str] = [],
+    **config,
+) -> Generator["ProfileAnalyzer", None, None]:
+    """
+    :param url: Base URL to connect to.
+    :param pandas_chunksize: Number of rows to read at a time.
+    :param pandas_include_columns: Columns to profile. Profile all columns if
+        unset.
+    :param pandas_exclude_columns: Columns not to profile.
+    """
+
+    with ExitStack() as stack:
+        engine = None
+        try:
+            # Share the crawl's engine if the URL is a database URL.
+            engine = stack.enter_context(create_browser(url=url, **config)).engine
+        except Exception as e:
+            log.debug("Not using a database engine for url=%s", url, exc_info=e)
+        yield ProfileAnalyzer(
+            url,
+            engine,
+            pandas_chunksize,
+            pandas_include_columns,
+            pandas_exclude_columns,
+        )
@@ -0,0 +1,378 @@
+"""
+Bounded-memory column statistics for DataFrames that arrive in chunks.
+
+Every statistic is kept in a mergeable summary whose size doesn't depend on
+the number of rows:
+
+* Counts and moments (mean, standard deviation) use Chan et al.'s parallel
+  variance algorithm.
+* Percentiles use a KLL-style compactor sketch.
+* `unique` uses a k-minimum-values (KMV) distinct count sketch.
+* `top` and `freq` use a Misra-Gries heavy-hitter sketch.
+
+All of them are exact until a column has more values (or distinct values)
+than the sketch keeps.
+"""
+
+from json import dumps
+from typing import Any
+
+import numpy
+import pandas
+
+PERCENTILES = {
+    "p25": 0.25,
+    "p50": 0.5,
+    "p75": 0.75,
+    "p95": 0.95,
+    "p99": 0.99,
+    "p999": 0.999,
+}
+
+
+class Moments:
+    """
+    Running count, mean, and sum of squared differences from the mean.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: numpy.ndarray):
+        other = Moments()
+        other.count = len(values)
+        if other.count:
+            other.mean = float(values.mean())
+            other.m2 = float(((values - other.mean) ** 2).sum())
+            self.merge(other)
+
+    def merge(self, other: "Moments"):
+        count = self.count + other.count
+        if not count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+
+    @property
+    def std(self) -> float | None:
+        # Sample standard deviation, like pandas.
+        if self.count < 2:
+            return None
+        return (self.m2 / (self.count - 1)) ** 0.5
+
+
+class QuantileSketch:
+    """
+    A KLL-style quantile sketch. Values are kept exactly until there are more
+    than `exact_size` of them. After that, values are kept in levels of
+    compactors. When a level fills up, it's sorted and every other value
+    (starting at a random offset) moves to the next level with twice the
+    weight. Rank error is roughly proportional to 1/k; with the default k,
+    estimated quantiles are within 0.5% of the true rank.
+    """
+
+    def __init__(self, k: int = 2048, exact_size: int = 65_536, seed: int = 0):
+        self.k = k
+        self.exact_size = exact_size
+        self.count = 0
+        self.levels: list[numpy.ndarray] = [numpy.empty(0)]
+        self.random = numpy.random.default_rng(seed)
+
+    def update(self, values: numpy.ndarray):
+        self.count += len(values)
+        self.levels[0] = numpy.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other: "QuantileSketch"):
+        self.count += other.count
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(numpy.empty(0))
+            self.levels[level] = numpy.concatenate([self.levels[level], values])
+        self._compact()
+
+    def quantiles(self, qs: list[float]) -> list[float] | None:
+        values = numpy.concatenate(self.levels)
+        if not len(values):
+            return None
+        weights = numpy.concatenate(
+            [numpy.full(len(v), 2**level) for level, v in enumerate(self.levels)]
+        )
+        order = numpy.argsort(values, kind="stable")
+        values = values[order]
+        cumulative = numpy.cumsum(weights[order])
+        # Linearly interpolate between ranks, like pandas' default. This
+        # matches pandas exactly until values are compacted.
+        ranks = (cumulative - weights[order]) / max(cumulative[-1] - 1, 1)
+        return [float(numpy.interp(q, ranks, values)) for q in qs]
+
+    def _compact(self):
+        if self.count <= self.exact_size:
+            return
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self.k:
+                values = numpy.sort(values)
+                # Keep an even number to compact; the odd one out stays put.
+                keep = values[-1:] if len(values) % 2 else values[:0]
+                values = values[: len(values) - len(keep)]
+                promoted = values[int(self.random.integers(2)) :: 2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(numpy.empty(0))
+                self.levels[level + 1] = numpy.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+
+class DistinctSketch:
+    """
+    A k-minimum-values distinct count sketch. Keeps the k smallest 64-bit
+    value hashes. The count is exact until a column has k distinct values.
+    """
+
+    def __init__(self, k: int = 4096):
+        self.k = k
+        self.hashes = numpy.empty(0, dtype=numpy.uint64)
+
+    def update(self, values: pandas.Series):
+        if not isinstance(values.dtype, pandas.CategoricalDtype):
+            # Pandas hashes object columns with mixed types as strings, and
+            # everything else by value. Always hash strings, so a value gets
+            # the same hash in every chunk.
+            values = values.astype(str)
+        hashes = pandas.util.hash_pandas_object(values, index=False).to_numpy()
+        self.hashes = numpy.unique(numpy.concatenate([self.hashes, hashes]))[: self.k]
+
+    def merge(self, other: "DistinctSketch"):
+        self.hashes = numpy.unique(numpy.concatenate([self.hashes, other.hashes]))[
+            : self.k
+        ]
+
+    @property
+    def count(self) -> int:
+        if len(self.hashes) < self.k:
+            return len(self.hashes)
+        kth = float(self.hashes[-1]) / 2.0**64
+        return round((self.k - 1) / kth)
+
+
+class HeavyHitters:
+    """
+    A Misra-Gries heavy-hitter sketch. Any value that occurs in more than
+    1/(capacity + 1) of the rows is kept. Frequencies are lower bounds, and
+    exact until a column has more than `capacity` distinct values.
+
+    If no value stands out (a unique key, say), every count drops to zero.
+    The most frequent value seen before then is kept as a fallback `top`, so
+    there's still a top value, like `describe()` returns.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.counts = pandas.Series(dtype="int64")
+        self.fallback: tuple[Any, int] | None = None
+
+    def update(self, values: pandas.Series):
+        counts = values.value_counts(sort=False)
+        # Categoricals count unused categories, too.
+        self.add(counts[counts > 0])
+
+    def merge(self, other: "HeavyHitters"):
+        if other.fallback and (
+            not self.fallback or other.fallback[1] > self.fallback[1]
+        ):
+            self.fallback = other.fallback
+        self.add(other.counts)
+
+    def top(self) -> tuple[Any, int] | None:
+        if self.counts.empty:
+            if not self.fallback:
+                return None
+            top, freq = self.fallback
+        else:
+            top, freq = self.counts.idxmax(), int(self.counts.max())
+        # NumPy scalars (like numpy.bool_) aren't JSON serializable.
+        if isinstance(top, numpy.generic):
+            top = top.item()
+        return top, freq
+
+    def add(self, counts: pandas.Series):
+        """
+        :param counts: Number of times each value (the index) occurred.
+        """
+
+        counts = self.counts.add(counts, fill_value=0)
+        if len(counts) > self.capacity:
+            threshold = counts.nlargest(self.capacity + 1).iloc[-1]
+            if not (counts > threshold).any():
+                self.fallback = counts.idxmax(), int(counts.max())
+            counts = counts[counts > threshold] - threshold
+        self.counts = counts.astype("int64")
+
+
+class ColumnStatistics:
+    """
+    Running statistics for one column. Numeric and datetime columns get
+    moments, min/max, and percentiles. Other columns get unique, top, and
+    freq. This matches what `DataFrame.describe()` returns for each type.
+
+    A numeric column that later gets a non-numeric chunk (a string in a JSON
+    column, say) becomes an object column, like it would in one DataFrame.
+    Values seen so far are replayed from the quantile sketch, so unique, top,
+    and freq are exact if that happens within the sketch's first
+    `exact_size` values, and estimates after.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.numeric: bool | None = None
+        self.datetime = False
+        self.dtype: Any = None
+        self.moments = Moments()
+        self.quantiles = QuantileSketch()
+        self.min: Any = None
+        self.max: Any = None
+        self.distinct = DistinctSketch()
+        self.heavy_hitters = HeavyHitters()
+
+    def update(self, series: pandas.Series):
+        series = series.dropna()
+        if self.numeric is None and not series.empty:
+            self.datetime = pandas.api.types.is_datetime64_any_dtype(series)
+            self.numeric = self.datetime or _is_numeric(series)
+            self.dtype = series.dtype
+        self.count += len(series)
+        if series.empty:
+            return
+        if self.numeric and not (
+            pandas.api.types.is_datetime64_any_dtype(series)
+            if self.datetime
+            else _is_numeric(series)
+        ):
+            self._demote()
+        if self.numeric:
+            if self.datetime:
+                # Nanoseconds since the epoch, in UTC.
+                values = series.to_numpy(dtype="datetime64[ns]").astype("int64")
+                values = values.astype("float64")
+            else:
+                values = series.to_numpy(dtype="float64")
+            self.moments.update(values)
+            self.quantiles.update(values)
+            chunk_min, chunk_max = float(values.min()), float(values.max())
+            self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+            self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+        else:
+            if series.dtype == object:
+                # JSON lists and objects aren't hashable.
+                series = series.map(
+                    lambda v: dumps(v, sort_keys=True)
+                    if isinstance(v, (dict, list))
+                    else v
+                )
+            self.distinct.update(series)
+            self.heavy_hitters.update(series)
+
+    def _demote(self):
+        """
+        Switch to object statistics, and count the values seen so far.
+        """
+
+        self.numeric = False
+        values = numpy.concatenate(self.quantiles.levels)
+        weights = numpy.concatenate(
+            [
+                numpy.full(len(v), 2**level, dtype="int64")
+                for level, v in enumerate(self.quantiles.levels)
+            ]
+        )
+        if self.datetime:
+            values = values.astype("int64").astype("datetime64[ns]")
+        elif pandas.api.types.is_integer_dtype(self.dtype):
+            values = values.astype("int64")
+        counts = pandas.Series(weights, index=values).groupby(level=0).sum()
+        self.distinct.update(counts.index.to_series())
+        self.heavy_hitters.add(counts)
+        self.quantiles = QuantileSketch()
+        self.moments = Moments()
+        self.min = self.max = None
+
+    def describe(self) -> dict[str, Any]:
+        """
+        :returns: The same statistics `DataFrame.describe()` would, keyed by
+            ColumnProfile field names.
+        """
+
+        statistics: dict[str, Any] = {"count": self.count}
+        if self.numeric:
+            percentiles = self.quantiles.quantiles(list(PERCENTILES.values()))
+            statistics |= {
+                "mean": self.moments.mean,
+                "min": self.min,
+                "max": self.max,
+            } | dict(zip(PERCENTILES.keys(), percentiles or []))
+            if self.datetime:
+                statistics = {
+                    k: pandas.Timestamp(round(v)).isoformat()
+                    for k, v in statistics.items()
+                    if k != "count"
+                } | {"count": self.count}
+            else:
+                statistics["std"] = self.moments.std
+        elif self.count:
+            statistics["unique"] = self.distinct.count
+            if top := self.heavy_hitters.top():
+                statistics["top"], statistics["freq"] = top
+        return statistics
+
+
+class StreamingProfiler:
+    """
+    Profiles DataFrame chunks one at a time. Memory use depends on the chunk
+    size and number of columns, not the number of rows.
+    """
+
+    def __init__(self):
+        self.columns: dict[str, ColumnStatistics] = {}
+
+    def update(self, df: pandas.DataFrame):
+        for name, series in df.items():
+            self.update_column(str(name), series)
+
+    def update_arrow(self, batch: Any):
+        """
+        Profile a PyArrow RecordBatch one column at a time, so only one
+        column is converted to Pandas at once. Strings are converted to
+        categoricals, which share one Python object per distinct value.
+
+        :param batch: A `pyarrow.RecordBatch`.
+        """
+
+        for name, column in zip(batch.schema.names, batch.columns):
+            self.update_column(
+                name,
+                column.to_pandas(strings_to_categorical=True),
+            )
+
+    def update_column(self, name: str, series: pandas.Series):
+        self.columns.setdefault(name, ColumnStatistics()).update(series)
+
+    def describe(self) -> dict[str, dict[str, Any]]:
+        """
+        :returns: Statistics for each column seen so far.
+        """
+
+        return {name: stats.describe() for name, stats in self.columns.items()}
+
+
+def _is_numeric(series: pandas.Series) -> bool:
+    # Pandas describes booleans like strings.
+    is_bool = pandas.api.types.is_bool_dtype(series)
+    return pandas.api.types.is_numeric_dtype(series) and not is_bool
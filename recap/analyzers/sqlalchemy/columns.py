@@ -7,6 +7,8 @@ import sqlalchemy
 from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
 from recap.browsers.db import TablePath, ViewPath, create_browser
 
+from .reflection import get_reflector
+
 log = logging.getLogger(__name__)
 
 
@@ -44,20 +46,14 @@ class TableColumnAnalyzer(AbstractAnalyzer):
 
         table = path.table if isinstance(path, TablePath) else path.view
         results = {}
-        columns = sqlalchemy.inspect(self.engine).get_columns(
+        columns = get_reflector(self.engine).get(
+            "columns",
             table,
             path.schema_,
         )
         for column in columns:
             try:
-                generic_type = column["type"].as_generic()
-                # Strip length/precision to make generic strings more generic.
-                if isinstance(generic_type, sqlalchemy.sql.sqltypes.String):
-                    generic_type.length = None
-                elif isinstance(generic_type, sqlalchemy.sql.sqltypes.Numeric):
-                    generic_type.precision = None
-                    generic_type.scale = None
-                column["generic_type"] = str(generic_type)
+                column["generic_type"] = generic_type(column["type"])
             except NotImplementedError as e:
                 # Unable to convert. Probably a weird type like PG's OID.
                 log.debug(
@@ -83,6 +79,24 @@ class TableColumnAnalyzer(AbstractAnalyzer):
         return None
 
 
+def generic_type(column_type: sqlalchemy.types.TypeEngine) -> str:
+    """
+    :param column_type: A reflected column type.
+    :returns: The type's generic SQLAlchemy type name, such as INTEGER or
+        VARCHAR, without length or precision.
+    :raises NotImplementedError: If the type has no generic equivalent.
+    """
+
+    generic = column_type.as_generic()
+    # Strip length/precision to make generic strings more generic.
+    if isinstance(generic, sqlalchemy.sql.sqltypes.String):
+        generic.length = None
+    elif isinstance(generic, sqlalchemy.sql.sqltypes.Numeric):
+        generic.precision = None
+        generic.scale = None
+    return str(generic)
+
+
 @contextmanager
 def create_analyzer(**config) -> Generator["TableColumnAnalyzer", None, None]:
     with create_browser(**config) as browser:
@@ -7,6 +7,8 @@ import sqlalchemy
 from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
 from recap.browsers.db import TablePath, ViewPath, create_browser
 
+from .reflection import get_reflector
+
 log = logging.getLogger(__name__)
 
 
@@ -32,7 +34,8 @@ class TableCommentAnalyzer(AbstractAnalyzer):
         """
 
         table = path.table if isinstance(path, TablePath) else path.view
-        comment = sqlalchemy.inspect(self.engine).get_table_comment(
+        comment = get_reflector(self.engine).get(
+            "table_comment",
             table,
             path.schema_,
         )
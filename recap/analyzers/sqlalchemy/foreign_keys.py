@@ -7,6 +7,8 @@ import sqlalchemy
 from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
 from recap.browsers.db import TablePath, ViewPath, create_browser
 
+from .reflection import get_reflector
+
 log = logging.getLogger(__name__)
 
 
@@ -40,7 +42,8 @@ class TableForeignKeyAnalyzer(AbstractAnalyzer):
 
         table = path.table if isinstance(path, TablePath) else path.view
         results = {}
-        fks = sqlalchemy.inspect(self.engine).get_foreign_keys(
+        fks = get_reflector(self.engine).get(
+            "foreign_keys",
             table,
             path.schema_,
         )
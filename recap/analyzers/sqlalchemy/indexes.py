@@ -7,6 +7,8 @@ import sqlalchemy
 from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
 from recap.browsers.db import TablePath, ViewPath, create_browser
 
+from .reflection import get_reflector
+
 log = logging.getLogger(__name__)
 
 
@@ -38,7 +40,8 @@ class TableIndexAnalyzer(AbstractAnalyzer):
 
         table = path.table if isinstance(path, TablePath) else path.view
         indexes = {}
-        index_dicts = sqlalchemy.inspect(self.engine).get_indexes(
+        index_dicts = get_reflector(self.engine).get(
+            "indexes",
             table,
             path.schema_,
         )
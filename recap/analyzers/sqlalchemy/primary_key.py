@@ -7,6 +7,8 @@ import sqlalchemy
 from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
 from recap.browsers.db import TablePath, ViewPath, create_browser
 
+from .reflection import get_reflector
+
 log = logging.getLogger(__name__)
 
 
@@ -33,7 +35,8 @@ class TablePrimaryKeyAnalyzer(AbstractAnalyzer):
         """
 
         table = path.table if isinstance(path, TablePath) else path.view
-        pk_dict = sqlalchemy.inspect(self.engine).get_pk_constraint(
+        pk_dict = get_reflector(self.engine).get(
+            "pk_constraint",
             table,
             path.schema_,
         )
@@ -1,6 +1,8 @@
+import decimal
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Generator
 
 import sqlalchemy
 from pydantic import BaseModel, Field
@@ -12,9 +14,51 @@ from .columns import Columns, TableColumnAnalyzer
 
 log = logging.getLogger(__name__)
 
+NUMERIC_TYPES = [
+    "BIGINT",
+    "FLOAT",
+    "INT",
+    "INTEGER",
+    "NUMERIC",
+    "REAL",
+    "SMALLINT",
+]
+DATE_TYPES = ["DATE", "DATETIME", "TIMESTAMP"]
+# TODO Excluding 'JSON' because PG's 'JSONB' doesn't have LENGTH()
+STRING_TYPES = ["CHAR", "CLOB", "NCHAR", "NVARCHAR", "TEXT", "VARCHAR"]
+BINARY_TYPES = ["BLOB", "VARBINARY"]
+STAT_TYPES = [
+    "min",
+    "max",
+    "average",
+    "sum",
+    "distinct",
+    "nulls",
+    "zeros",
+    "negatives",
+    "min_length",
+    "max_length",
+    "empty_strings",
+    "unix_epochs",
+]
+
+# Approximate distinct count functions for dialects that have one.
+APPROX_COUNT_DISTINCT = {
+    "bigquery": "APPROX_COUNT_DISTINCT",
+    "duckdb": "APPROX_COUNT_DISTINCT",
+    "mssql": "APPROX_COUNT_DISTINCT",
+    "snowflake": "APPROX_COUNT_DISTINCT",
+}
+
 
 class BaseColumnProfile(BaseModel):
     count: int
+    # Fraction of the table that was sampled with TABLESAMPLE, if any.
+    sample_rate: float | None = None
+    # Maximum number of rows that were profiled, if the profile was limited.
+    row_limit: int | None = None
+    # Whether distinct counts are approximate.
+    approximate: bool | None = None
 
 
 class BinaryColumnProfile(BaseColumnProfile):
@@ -72,12 +116,59 @@ class TableProfileAnalyzer(AbstractAnalyzer):
     consits of max, min, distinct, and so on.
 
     The query used to generate the statistics has been tested against
-    PostgreSQL, Snowflake, adn BigQuery. The query does not sample data, so
-    large tables will be slow.
+    PostgreSQL, Snowflake, adn BigQuery. By default, the query scans the whole
+    table or view, so large tables will be slow. To profile large tables
+    cheaply:
+
+    * `sample_percent` samples blocks of a table with TABLESAMPLE on
+      PostgreSQL, Snowflake, and BigQuery. Other dialects, and views (which
+      can't be block sampled), fall back to `row_limit`.
+    * `row_limit` profiles only the first rows the database returns.
+    * `approximate` uses the dialect's approximate distinct count function
+      (a HyperLogLog sketch) where it has one.
+
+    Each column profile records the `sample_rate` or `row_limit` that was
+    used, and whether distinct counts are `approximate`. Statistics describe
+    the sampled rows; they aren't scaled to the whole table.
+
+    Wide tables would need thousands of aggregates in a single SELECT, so
+    columns are profiled `chunk_size` at a time. Up to `concurrency` chunk
+    queries run at once, each on its own pooled connection.
     """
 
-    def __init__(self, engine: sqlalchemy.engine.Engine):
+    def __init__(
+        self,
+        engine: sqlalchemy.engine.Engine,
+        sample_percent: float | None = None,
+        row_limit: int | None = None,
+        approximate: bool = False,
+        chunk_size: int = 100,
+        concurrency: int = 1,
+    ):
+        """
+        :param engine: SQLAlchemy engine to profile tables with.
+        :param sample_percent: Percent (0-100] of a table's blocks to sample.
+        :param row_limit: Maximum number of rows to profile.
+        :param approximate: Use approximate distinct counts where possible.
+        :param chunk_size: Maximum number of columns to profile per query.
+        :param concurrency: Maximum number of chunk queries to run at once.
+            Keep this within the engine's connection pool size.
+        """
+
+        assert (
+            sample_percent is None or 0 < sample_percent <= 100
+        ), f"Expected 0 < sample_percent <= 100, but got {sample_percent}"
+        assert (
+            row_limit is None or row_limit > 0
+        ), f"Expected row_limit > 0, but got {row_limit}"
+        assert chunk_size > 0, f"Expected chunk_size > 0, but got {chunk_size}"
+        assert concurrency > 0, f"Expected concurrency > 0, but got {concurrency}"
         self.engine = engine
+        self.sample_percent = sample_percent
+        self.row_limit = row_limit
+        self.approximate = approximate
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
 
     def analyze(
         self,
@@ -94,149 +185,212 @@ class TableProfileAnalyzer(AbstractAnalyzer):
         # TODO ZOMG SQL injection attacks all over!
         # TODO Is db.Table().select the right way to paramaterize tables?
         columns = column_analyzer.analyze(path) or Columns()
-        sql_col_queries = ""
-        numeric_types = [
-            "BIGINT",
-            "FLOAT",
-            "INT",
-            "INTEGER",
-            "NUMERIC",
-            "REAL",
-            "SMALLINT",
-        ]
-        date_types = ["DATE", "DATETIME", "TIMESTAMP"]
-        # TODO Excluding 'JSON' because PG's 'JSONB' doesn't have LENGTH()
-        string_types = ["CHAR", "CLOB", "NCHAR", "NVARCHAR", "TEXT", "VARCHAR"]
-        binary_types = ["BLOB", "VARBINARY"]
-        stat_types = [
-            "min",
-            "max",
-            "average",
-            "sum",
-            "distinct",
-            "nulls",
-            "zeros",
-            "negatives",
-            "min_length",
-            "max_length",
-            "empty_strings",
-            "unix_epochs",
-        ]
-
-        with self.engine.connect() as conn:
-            varchar_type = "VARCHAR"
-
-            # BigQuery doesn't havt FLOAT or VARCHAR, so use its type.
-            # TODO SQLAlchemy should expose a dialect type for a generic type.
-            if conn.dialect.name == "bigquery":
-                varchar_type = "STRING"
-            elif conn.dialect.name == "snowflake":
-                conn.execute("ALTER SESSION SET QUOTED_IDENTIFIERS_IGNORE_CASE = TRUE")
-
-            for column_name, column in columns.dict()["__root__"].items():
-                generic_type = column["generic_type"]
-                quoted_column_name = f'"{column_name}"'
-                if conn.dialect.name in ["bigquery", "mysql"]:
-                    quoted_column_name = f"`{column_name}`"
-                if generic_type in numeric_types:
-                    # TODO add approx median and quantiles
-                    # TODO can we use a STRUCT or something here?
-                    sql_col_queries += f"""
-                        , MIN({quoted_column_name}) AS min_{column_name}
-                        , MAX({quoted_column_name}) AS max_{column_name}
-                        , AVG({quoted_column_name}) AS average_{column_name}
-                        , SUM({quoted_column_name}) AS sum_{column_name}
-                        , COUNT(DISTINCT {quoted_column_name}) AS {column_name}_distinct
-                        , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
-                        , SUM(CASE WHEN {quoted_column_name} = 0 THEN 1 ELSE 0 END) AS zeros_{column_name}
-                        , SUM(CASE WHEN {quoted_column_name} < 0 THEN 1 ELSE 0 END) AS negatives_{column_name}
-                    """
-                if generic_type in string_types:
-                    sql_col_queries += f"""
-                        , MIN(LENGTH({quoted_column_name})) AS min_length_{column_name}
-                        , MAX(LENGTH({quoted_column_name})) AS max_length_{column_name}
-                        , COUNT(DISTINCT {quoted_column_name}) AS distinct_{column_name}
-                        , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
-                        , SUM(CASE WHEN {quoted_column_name} LIKE '' THEN 1 ELSE 0 END) AS empty_strings_{column_name}
-                    """
-                if generic_type in binary_types:
-                    sql_col_queries += f"""
-                        , MIN(LENGTH({quoted_column_name})) AS min_length_{column_name}
-                        , MAX(LENGTH({quoted_column_name})) AS max_length_{column_name}
-                        , COUNT(DISTINCT {quoted_column_name}) AS distinct_{column_name}
-                        , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
-                    """
-                if generic_type in date_types:
-                    sql_col_queries += f"""
-                        , CAST(MIN({quoted_column_name}) AS {varchar_type}) AS min_{column_name}
-                        , CAST(MAX({quoted_column_name}) AS {varchar_type}) AS max_{column_name}
-                        , COUNT(DISTINCT {quoted_column_name}) AS distinct_{column_name}
-                        , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
-                        , SUM(CASE WHEN {quoted_column_name} = TIMESTAMP '1970-01-01 00:00:00' THEN 1 ELSE 0 END) AS unix_epochs_{column_name}
-                    """
-
-            quoted_schema = f'"{path.schema_}"'
-            quoted_table = f'"{table}"'
-            if conn.dialect.name in ["bigquery", "mysql"]:
-                quoted_schema = f"`{path.schema_}`"
-                quoted_table = f"`{table}`"
-
-            sql = f"""
+        dialect = self.engine.dialect.name
+        varchar_type = "VARCHAR"
+
+        # BigQuery doesn't havt FLOAT or VARCHAR, so use its type.
+        # TODO SQLAlchemy should expose a dialect type for a generic type.
+        if dialect == "bigquery":
+            varchar_type = "STRING"
+
+        count_distinct = "COUNT(DISTINCT "
+        approximate = None
+        if self.approximate and (approx_function := APPROX_COUNT_DISTINCT.get(dialect)):
+            count_distinct = f"{approx_function}("
+            approximate = True
+
+        # Aggregate expressions for each column, keyed by column name.
+        column_queries: dict[str, str] = {}
+
+        for column_name, column in columns.dict()["__root__"].items():
+            generic_type = column["generic_type"]
+            quoted_column_name = f'"{column_name}"'
+            if dialect in ["bigquery", "mysql"]:
+                quoted_column_name = f"`{column_name}`"
+            if generic_type in NUMERIC_TYPES:
+                # TODO add approx median and quantiles
+                # TODO can we use a STRUCT or something here?
+                column_queries[
+                    column_name
+                ] = f"""
+                    , MIN({quoted_column_name}) AS min_{column_name}
+                    , MAX({quoted_column_name}) AS max_{column_name}
+                    , AVG({quoted_column_name}) AS average_{column_name}
+                    , SUM({quoted_column_name}) AS sum_{column_name}
+                    , {count_distinct}{quoted_column_name}) AS {column_name}_distinct
+                    , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
+                    , SUM(CASE WHEN {quoted_column_name} = 0 THEN 1 ELSE 0 END) AS zeros_{column_name}
+                    , SUM(CASE WHEN {quoted_column_name} < 0 THEN 1 ELSE 0 END) AS negatives_{column_name}
+                """
+            if generic_type in STRING_TYPES:
+                column_queries[
+                    column_name
+                ] = f"""
+                    , MIN(LENGTH({quoted_column_name})) AS min_length_{column_name}
+                    , MAX(LENGTH({quoted_column_name})) AS max_length_{column_name}
+                    , {count_distinct}{quoted_column_name}) AS distinct_{column_name}
+                    , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
+                    , SUM(CASE WHEN {quoted_column_name} LIKE '' THEN 1 ELSE 0 END) AS empty_strings_{column_name}
+                """
+            if generic_type in BINARY_TYPES:
+                column_queries[
+                    column_name
+                ] = f"""
+                    , MIN(LENGTH({quoted_column_name})) AS min_length_{column_name}
+                    , MAX(LENGTH({quoted_column_name})) AS max_length_{column_name}
+                    , {count_distinct}{quoted_column_name}) AS distinct_{column_name}
+                    , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
+                """
+            if generic_type in DATE_TYPES:
+                column_queries[
+                    column_name
+                ] = f"""
+                    , CAST(MIN({quoted_column_name}) AS {varchar_type}) AS min_{column_name}
+                    , CAST(MAX({quoted_column_name}) AS {varchar_type}) AS max_{column_name}
+                    , {count_distinct}{quoted_column_name}) AS distinct_{column_name}
+                    , SUM(CASE WHEN {quoted_column_name} IS NULL THEN 1 ELSE 0 END) AS nulls_{column_name}
+                    , SUM(CASE WHEN {quoted_column_name} = TIMESTAMP '1970-01-01 00:00:00' THEN 1 ELSE 0 END) AS unix_epochs_{column_name}
+                """
+
+        quoted_schema = f'"{path.schema_}"'
+        quoted_table = f'"{table}"'
+        if dialect in ["bigquery", "mysql"]:
+            quoted_schema = f"`{path.schema_}`"
+            quoted_table = f"`{table}`"
+
+        from_clause, sample_stats = self._from_clause(
+            dialect,
+            f"{quoted_schema}.{quoted_table}",
+            isinstance(path, TablePath),
+        )
+        if approximate:
+            sample_stats["approximate"] = approximate
+
+        # Columns without aggregates (JSON, etc.) still get a row count.
+        column_names = list(columns.__root__.keys())
+        chunks = [
+            column_names[i : i + self.chunk_size]
+            for i in range(0, len(column_names), self.chunk_size)
+        ] or [[]]
+        chunk_queries = [
+            f"""
                 SELECT
-                    COUNT(*) AS count {sql_col_queries}
+                    COUNT(*) AS count {"".join(column_queries.get(c, "") for c in chunk)}
                 FROM
-                    {quoted_schema}.{quoted_table} t
+                    {from_clause}
             """
+            for chunk in chunks
+        ]
 
-            rows = conn.execute(sql)
-            row = dict(rows.first() or {})
-            results = {}
-
-            for column_name in columns.dict()["__root__"].keys():
-                col_stats = results.get(column_name, {"count": row["count"]})
-                for stat_type in stat_types:
-                    stat_name = f"{stat_type}_{column_name}"
-                    if stat_name in row:
-                        stat_value = row[stat_name]
-                        # JSON encoder can't handle decimal.Decimal
-                        import decimal
-
-                        if isinstance(row[stat_name], decimal.Decimal):
-                            stat_value = float(row[stat_name])
-                        col_stats[stat_type] = stat_value
-                results[column_name] = col_stats
-
-            results = {}
-            for column_name, column in columns.__root__.items():
-                generic_type = column.generic_type
-                col_stats = {"count": row["count"]}
-                for stat_type in stat_types:
+        if self.concurrency > 1 and len(chunk_queries) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.concurrency, len(chunk_queries)),
+                thread_name_prefix="recap-profile",
+            ) as executor:
+                chunk_rows = list(executor.map(self._execute, chunk_queries))
+        else:
+            chunk_rows = list(map(self._execute, chunk_queries))
+
+        results = {}
+        for chunk, row in zip(chunks, chunk_rows):
+            for column_name in chunk:
+                generic_type = columns.__root__[column_name].generic_type
+                # Each chunk counts its own rows. Counts can differ between
+                # chunks if the table changes or is sampled non-repeatably.
+                col_stats = {"count": row["count"]} | sample_stats
+                for stat_type in STAT_TYPES:
                     stat_name = f"{stat_type}_{column_name}"
                     if stat_name in row:
                         stat_value = row[stat_name]
                         # JSON encoder can't handle decimal.Decimal
-                        import decimal
-
-                        if isinstance(row[stat_name], decimal.Decimal):
-                            stat_value = float(row[stat_name])
+                        if isinstance(stat_value, decimal.Decimal):
+                            stat_value = float(stat_value)
                         col_stats[stat_type] = stat_value
-                if generic_type in numeric_types:
+                if generic_type in NUMERIC_TYPES:
                     results[column_name] = NumericColumnProfile(**col_stats)
-                elif generic_type in string_types:
+                elif generic_type in STRING_TYPES:
                     results[column_name] = StringColumnProfile(**col_stats)
-                elif generic_type in binary_types:
+                elif generic_type in BINARY_TYPES:
                     results[column_name] = BinaryColumnProfile(**col_stats)
-                elif generic_type in date_types:
+                elif generic_type in DATE_TYPES:
                     results[column_name] = DateColumnProfile(**col_stats)
                 else:
                     results[column_name] = BaseColumnProfile(**col_stats)
 
-            return Profile.parse_obj(results)
+        return Profile.parse_obj(results)
+
+    def _execute(self, sql: str) -> dict[str, Any]:
+        """
+        Run a profile query on its own pooled connection, so chunks can run
+        concurrently.
+        """
+
+        with self.engine.connect() as conn:
+            if conn.dialect.name == "snowflake":
+                conn.execute("ALTER SESSION SET QUOTED_IDENTIFIERS_IGNORE_CASE = TRUE")
+            return dict(conn.execute(sql).first() or {})
+
+    def _from_clause(
+        self,
+        dialect: str,
+        quoted_table: str,
+        is_table: bool,
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        :param dialect: The SQLAlchemy dialect name.
+        :param quoted_table: The quoted `schema.table` to profile.
+        :param is_table: False if the path is a view. Views can't be block
+            sampled.
+        :returns: A FROM clause that samples or limits the table, and the
+            sample stats to record in each column profile.
+        """
+
+        if self.sample_percent and is_table:
+            percent = float(self.sample_percent)
+            sample_stats = {"sample_rate": percent / 100}
+            match dialect:
+                case "postgresql" | "snowflake":
+                    return (
+                        f"{quoted_table} t TABLESAMPLE SYSTEM ({percent})",
+                        sample_stats,
+                    )
+                case "bigquery":
+                    return (
+                        f"{quoted_table} t TABLESAMPLE SYSTEM ({percent} PERCENT)",
+                        sample_stats,
+                    )
+        if self.row_limit:
+            return (
+                f"(SELECT * FROM {quoted_table} LIMIT {int(self.row_limit)}) t",
+                {"row_limit": self.row_limit},
+            )
+        return f"{quoted_table} t", {}
 
 
 @contextmanager
 def create_analyzer(
+    profile_sample_percent: float | None = None,
+    profile_row_limit: int | None = None,
+    profile_approximate: bool = False,
+    profile_chunk_size: int = 100,
+    profile_concurrency: int = 1,
     **config,
 ) -> Generator["TableProfileAnalyzer", None, None]:
+    """
+    :param profile_sample_percent: Percent of each table to sample.
+    :param profile_row_limit: Maximum number of rows to profile per table.
+    :param profile_approximate: Use approximate distinct counts.
+    :param profile_chunk_size: Maximum number of columns per profile query.
+    :param profile_concurrency: Maximum number of profile queries to run at
+        once per table.
+    """
+
     with create_browser(**config) as browser:
-        yield TableProfileAnalyzer(browser.engine)
+        yield TableProfileAnalyzer(
+            browser.engine,
+            profile_sample_percent,
+            profile_row_limit,
+            profile_approximate,
+            profile_chunk_size,
+            profile_concurrency,
+        )
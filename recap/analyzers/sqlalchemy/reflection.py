@@ -0,0 +1,796 @@
+"""
+Schema-level reflection for the SQLAlchemy analyzers.
+
+SQLAlchemy's Inspector `get_*` methods reflect one table at a time, which
+costs one or more catalog queries per table. SchemaReflector reflects every
+table and view in a schema with a single query per kind of information, and
+serves per-table lookups from the prefetched results:
+
+* SQLAlchemy 2.0: Inspector's `get_multi_*` methods.
+* PostgreSQL: `pg_catalog` queries (the same catalogs SQLAlchemy's
+  PostgreSQL dialect reads one table at a time).
+* MySQL: `information_schema` queries.
+
+Other dialects fall back to per-table Inspector calls.
+"""
+
+import logging
+import re
+import threading
+from copy import deepcopy
+from typing import Any
+
+import sqlalchemy
+
+log = logging.getLogger(__name__)
+
+# What Inspector.get_* returns for a table that has none of a kind of
+# information.
+EMPTY_RESULTS: dict[str, Any] = {
+    "columns": [],
+    "foreign_keys": [],
+    "indexes": [],
+    "pk_constraint": {"constrained_columns": [], "name": None},
+    "table_comment": {"text": None},
+}
+
+# Tables, partitioned tables, views, materialized views, and foreign tables.
+PG_RELKINDS = "('r', 'p', 'v', 'm', 'f')"
+
+# pg_constraint.confupdtype and confdeltype values. 'a' (NO ACTION) is the
+# default, so SQLAlchemy leaves it out of foreign key options.
+PG_FK_ACTIONS = {
+    "r": "RESTRICT",
+    "c": "CASCADE",
+    "n": "SET NULL",
+    "d": "SET DEFAULT",
+}
+
+# pg_constraint.confmatchtype values. 's' (SIMPLE) is the default.
+PG_FK_MATCHES = {"f": "FULL", "p": "PARTIAL"}
+
+# Private dialect attributes that bulk reflection hooks use to build the same
+# results as Inspector. They're only used on SQLAlchemy 1.4 (2.0 has
+# `get_multi_*`), but SQLAlchemy doesn't promise to keep them, so hooks whose
+# attributes are missing fall back to per-table Inspector calls.
+PRIVATE_DIALECT_ATTRIBUTES = {
+    "_postgresql_columns": ["_load_domains", "_load_enums", "_get_column_info"],
+    "_mysql_columns": ["_tabledef_parser", "_connection_charset"],
+}
+
+
+class SchemaReflector:
+    """
+    Reflects tables and views a schema at a time. The first lookup for a kind
+    of information (columns, foreign keys, and so on) in a schema fetches it
+    for every table and view in the schema. Later lookups are served from
+    memory.
+
+    Tables that weren't in the schema when it was reflected, and dialects
+    without bulk reflection support, fall back to per-table Inspector calls.
+    """
+
+    def __init__(self, engine: sqlalchemy.engine.Engine):
+        self.engine = engine
+        # Reflected information, keyed by (kind, schema), then by table.
+        self.schemas: dict[tuple[str, str], dict[str, Any] | None] = {}
+        # Guards `schemas` and `key_locks`. Only held briefly, never while
+        # querying the database.
+        self.lock = threading.Lock()
+        # One lock per (kind, schema), so threads only wait for each other
+        # when they need the same kind of information for the same schema.
+        self.key_locks: dict[tuple[str, str], threading.Lock] = {}
+        # One Inspector for all per-table calls, so they share its reflection
+        # cache. Inspectors aren't thread-safe.
+        self.inspector_lock = threading.Lock()
+        self.inspector: sqlalchemy.engine.Inspector | None = None
+
+    def get(self, kind: str, table: str, schema: str) -> Any:
+        """
+        :param kind: The kind of information to get. One of the keys in
+            EMPTY_RESULTS.
+        :param table: The table or view name.
+        :param schema: The table's schema.
+        :returns: The same result as Inspector's `get_<kind>` method. Callers
+            may modify the result.
+        """
+
+        tables = self._get_schema(kind, schema)
+        if tables is None or table not in tables:
+            return self._inspect(f"get_{kind}", table, schema)
+        return deepcopy(tables[table])
+
+    def _inspect(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a method on the reflector's Inspector. Calls are serialized with
+        `inspector_lock`.
+
+        :param method: Inspector method name, such as `get_columns`.
+        :returns: The method's return value.
+        """
+
+        with self.inspector_lock:
+            if not self.inspector:
+                self.inspector = sqlalchemy.inspect(self.engine)
+            return getattr(self.inspector, method)(*args, **kwargs)
+
+    def _get_schema(self, kind: str, schema: str) -> dict[str, Any] | None:
+        key = (kind, schema)
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self.lock:
+                if key in self.schemas:
+                    return self.schemas[key]
+            tables = self._get_multi(kind, schema)
+            with self.lock:
+                self.schemas[key] = tables
+            return tables
+
+    def _get_multi(self, kind: str, schema: str) -> dict[str, Any] | None:
+        """
+        :returns: A dictionary of table or view name to reflected information
+            for every table and view in the schema, or None if the dialect
+            doesn't support bulk reflection.
+        """
+
+        get_multi = hasattr(sqlalchemy.engine.Inspector, f"get_multi_{kind}")
+        dialect = self.engine.dialect.name
+        get_relations = getattr(self, f"_{dialect}_relations", None)
+        get_kind = getattr(self, f"_{dialect}_{kind}", None)
+        if not get_multi and not (get_relations and get_kind):
+            log.debug("No bulk reflection support for dialect=%s", dialect)
+            return None
+        try:
+            if get_multi:
+                from sqlalchemy.engine.reflection import ObjectKind
+
+                results = self._inspect(
+                    f"get_multi_{kind}",
+                    schema=schema,
+                    kind=ObjectKind.ANY,
+                )
+                # Keys are (schema, table) tuples.
+                return {table: result for (_, table), result in results.items()}
+            with self.engine.connect() as conn:
+                missing = [
+                    attribute
+                    for attribute in PRIVATE_DIALECT_ATTRIBUTES.get(
+                        f"_{dialect}_{kind}", []
+                    )
+                    if not hasattr(conn.dialect, attribute)
+                ]
+                if missing:
+                    log.debug(
+                        "No bulk reflection support for kind=%s dialect=%s "
+                        "missing=%s",
+                        kind,
+                        dialect,
+                        missing,
+                    )
+                    return None
+                tables = dict.fromkeys(
+                    get_relations(conn, schema),
+                    EMPTY_RESULTS[kind],
+                )
+                return tables | get_kind(conn, schema)
+        except Exception as e:
+            log.debug(
+                "Unable to bulk reflect kind=%s schema=%s",
+                kind,
+                schema,
+                exc_info=e,
+            )
+            return None
+
+    def _postgresql_relations(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> list[str]:
+        return list(
+            conn.execute(
+                sqlalchemy.text(
+                    f"""
+                    SELECT c.relname
+                    FROM pg_catalog.pg_class c
+                    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = :schema AND c.relkind IN {PG_RELKINDS}
+                    """
+                ),
+                {"schema": schema},
+            ).scalars()
+        )
+
+    def _postgresql_columns(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, list[dict[str, Any]]]:
+        dialect = conn.dialect
+        version = dialect.server_version_info
+        generated = "a.attgenerated" if version >= (12,) else "NULL"
+        # Same as SQLAlchemy's PostgreSQL dialect. a.attidentity != '' keeps
+        # serial columns from being reflected as identity columns.
+        identity = (
+            """
+            (
+                SELECT json_build_object(
+                    'always', a.attidentity = 'a',
+                    'start', s.seqstart,
+                    'increment', s.seqincrement,
+                    'minvalue', s.seqmin,
+                    'maxvalue', s.seqmax,
+                    'cache', s.seqcache,
+                    'cycle', s.seqcycle
+                )
+                FROM pg_catalog.pg_sequence s
+                WHERE a.attidentity != ''
+                AND s.seqrelid = pg_catalog.pg_get_serial_sequence(
+                    a.attrelid::regclass::text, a.attname
+                )::regclass::oid
+            )
+            """
+            if version >= (10,)
+            else "NULL"
+        )
+        domains = dialect._load_domains(conn)
+        enums = {
+            (enum["name"],)
+            if enum["visible"]
+            else (enum["schema"], enum["name"]): (enum)
+            for enum in dialect._load_enums(conn, schema="*")
+        }
+        tables: dict[str, list[dict[str, Any]]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                f"""
+                SELECT
+                    c.relname,
+                    a.attname,
+                    pg_catalog.format_type(a.atttypid, a.atttypmod) AS format_type,
+                    pg_catalog.pg_get_expr(d.adbin, d.adrelid) AS default,
+                    a.attnotnull,
+                    pgd.description AS comment,
+                    {generated} AS generated,
+                    {identity} AS identity_options
+                FROM pg_catalog.pg_attribute a
+                JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+                JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                LEFT JOIN pg_catalog.pg_attrdef d
+                    ON d.adrelid = a.attrelid AND d.adnum = a.attnum AND a.atthasdef
+                LEFT JOIN pg_catalog.pg_description pgd
+                    ON pgd.objoid = a.attrelid AND pgd.objsubid = a.attnum
+                WHERE n.nspname = :schema
+                AND c.relkind IN {PG_RELKINDS}
+                AND a.attnum > 0
+                AND NOT a.attisdropped
+                ORDER BY c.relname, a.attnum
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            tables.setdefault(row["relname"], []).append(
+                dialect._get_column_info(
+                    row["attname"],
+                    row["format_type"],
+                    row["default"],
+                    row["attnotnull"],
+                    domains,
+                    enums,
+                    schema,
+                    row["comment"],
+                    row["generated"],
+                    row["identity_options"],
+                )
+            )
+        return tables
+
+    def _postgresql_pk_constraint(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, dict[str, Any]]:
+        tables: dict[str, dict[str, Any]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                f"""
+                SELECT c.relname, con.conname, {_pg_attnames("conkey", "conrelid")}
+                FROM pg_catalog.pg_constraint con
+                JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+                JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema AND con.contype = 'p'
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            tables[row["relname"]] = {
+                "constrained_columns": row["attnames"],
+                "name": row["conname"],
+            }
+        return tables
+
+    def _postgresql_foreign_keys(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, list[dict[str, Any]]]:
+        tables: dict[str, list[dict[str, Any]]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                f"""
+                SELECT
+                    c.relname,
+                    con.conname,
+                    {_pg_attnames("conkey", "conrelid")},
+                    rn.nspname AS referred_schema,
+                    rc.relname AS referred_table,
+                    {_pg_attnames("confkey", "confrelid", "referred_attnames")},
+                    con.confupdtype,
+                    con.confdeltype,
+                    con.confmatchtype,
+                    con.condeferrable,
+                    con.condeferred
+                FROM pg_catalog.pg_constraint con
+                JOIN pg_catalog.pg_class c ON c.oid = con.conrelid
+                JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_catalog.pg_class rc ON rc.oid = con.confrelid
+                JOIN pg_catalog.pg_namespace rn ON rn.oid = rc.relnamespace
+                WHERE n.nspname = :schema AND con.contype = 'f'
+                ORDER BY c.relname, con.conname
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            options = {
+                "onupdate": PG_FK_ACTIONS.get(row["confupdtype"]),
+                "ondelete": PG_FK_ACTIONS.get(row["confdeltype"]),
+                "initially": "DEFERRED" if row["condeferred"] else None,
+                "deferrable": True if row["condeferrable"] else None,
+                "match": PG_FK_MATCHES.get(row["confmatchtype"]),
+            }
+            tables.setdefault(row["relname"], []).append(
+                {
+                    "name": row["conname"],
+                    "constrained_columns": row["attnames"],
+                    # Always the referred table's actual schema, even if it's
+                    # on the search path.
+                    "referred_schema": row["referred_schema"],
+                    "referred_table": row["referred_table"],
+                    "referred_columns": row["referred_attnames"],
+                    "options": {k: v for k, v in options.items() if v is not None},
+                }
+            )
+        return tables
+
+    def _postgresql_indexes(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, list[dict[str, Any]]]:
+        has_include = conn.dialect.server_version_info >= (11,)
+        tables: dict[str, list[dict[str, Any]]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                f"""
+                SELECT
+                    t.relname,
+                    i.relname AS name,
+                    ix.indisunique,
+                    ix.indexprs IS NOT NULL AS is_expression,
+                    {_pg_attnames("indkey::int2[]", "indrelid", table="ix")},
+                    {"ix.indnkeyatts" if has_include else "NULL"} AS indnkeyatts,
+                    ix.indoption::int2[] AS indoption,
+                    i.reloptions,
+                    am.amname,
+                    pg_catalog.pg_get_expr(ix.indpred, ix.indrelid) AS predicate,
+                    EXISTS (
+                        SELECT 1
+                        FROM pg_catalog.pg_constraint con
+                        WHERE con.conrelid = ix.indrelid
+                        AND con.conindid = ix.indexrelid
+                        AND con.contype IN ('p', 'u', 'x')
+                    ) AS is_constraint
+                FROM pg_catalog.pg_index ix
+                JOIN pg_catalog.pg_class t ON t.oid = ix.indrelid
+                JOIN pg_catalog.pg_class i ON i.oid = ix.indexrelid
+                JOIN pg_catalog.pg_namespace n ON n.oid = t.relnamespace
+                LEFT JOIN pg_catalog.pg_am am ON am.oid = i.relam
+                WHERE n.nspname = :schema
+                AND t.relkind IN {PG_RELKINDS}
+                AND NOT ix.indisprimary
+                ORDER BY t.relname, i.relname
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            if row["is_expression"]:
+                # Inspector skips expression-based indexes, too.
+                log.debug("Skipping expression-based index=%s", row["name"])
+                continue
+            attnames = row["attnames"]
+            key_count = row["indnkeyatts"] or len(attnames)
+            index: dict[str, Any] = {
+                "name": row["name"],
+                "unique": row["indisunique"],
+                "column_names": attnames[:key_count],
+            }
+            dialect_options: dict[str, Any] = {}
+            if has_include:
+                index["include_columns"] = attnames[key_count:]
+                dialect_options["postgresql_include"] = index["include_columns"]
+            if row["is_constraint"]:
+                index["duplicates_constraint"] = row["name"]
+            if sorting := {
+                attnames[i]: _pg_column_sorting(flags)
+                for i, flags in enumerate((row["indoption"] or [])[:key_count])
+                if _pg_column_sorting(flags)
+            }:
+                index["column_sorting"] = sorting
+            if row["reloptions"]:
+                dialect_options["postgresql_with"] = dict(
+                    option.split("=") for option in row["reloptions"]
+                )
+            if row["amname"] and row["amname"] != "btree":
+                dialect_options["postgresql_using"] = row["amname"]
+            if row["predicate"]:
+                dialect_options["postgresql_where"] = row["predicate"]
+            if dialect_options:
+                index["dialect_options"] = dialect_options
+            tables.setdefault(row["relname"], []).append(index)
+        return tables
+
+    def _postgresql_table_comment(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, dict[str, Any]]:
+        return {
+            row["relname"]: {"text": row["description"]}
+            for row in conn.execute(
+                sqlalchemy.text(
+                    f"""
+                    SELECT c.relname, d.description
+                    FROM pg_catalog.pg_class c
+                    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                    JOIN pg_catalog.pg_description d
+                        ON d.objoid = c.oid
+                        AND d.classoid = 'pg_catalog.pg_class'::regclass
+                        AND d.objsubid = 0
+                    WHERE n.nspname = :schema AND c.relkind IN {PG_RELKINDS}
+                    """
+                ),
+                {"schema": schema},
+            ).mappings()
+        }
+
+    def _mysql_relations(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> list[str]:
+        return list(
+            conn.execute(
+                sqlalchemy.text(
+                    """
+                    SELECT TABLE_NAME
+                    FROM information_schema.TABLES
+                    WHERE TABLE_SCHEMA = :schema
+                    """
+                ),
+                {"schema": schema},
+            ).scalars()
+        )
+
+    def _mysql_columns(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, list[dict[str, Any]]]:
+        dialect = conn.dialect
+        preparer = dialect.identifier_preparer
+        definitions: dict[str, list[str]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT
+                    TABLE_NAME,
+                    COLUMN_NAME,
+                    COLUMN_TYPE,
+                    IS_NULLABLE,
+                    COLUMN_DEFAULT,
+                    EXTRA,
+                    COLUMN_COMMENT,
+                    GENERATION_EXPRESSION
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = :schema
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            definitions.setdefault(row["TABLE_NAME"], []).append(
+                _mysql_column_definition(preparer, row)
+            )
+        # Columns are parsed by the same parser that SQLAlchemy's MySQL
+        # dialect uses for SHOW CREATE TABLE, so types and defaults match.
+        return {
+            table: dialect._tabledef_parser.parse(
+                "CREATE TABLE %s (\n%s\n) "
+                % (preparer.quote_identifier(table), ",\n".join(lines)),
+                dialect._connection_charset,
+            ).columns
+            for table, lines in definitions.items()
+        }
+
+    def _mysql_pk_constraint(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, dict[str, Any]]:
+        tables: dict[str, dict[str, Any]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT TABLE_NAME, COLUMN_NAME
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = :schema AND INDEX_NAME = 'PRIMARY'
+                ORDER BY TABLE_NAME, SEQ_IN_INDEX
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            # MySQL primary keys are always named PRIMARY, so SQLAlchemy
+            # doesn't report a name.
+            tables.setdefault(
+                row["TABLE_NAME"],
+                {"constrained_columns": [], "name": None},
+            )["constrained_columns"].append(row["COLUMN_NAME"])
+        return tables
+
+    def _mysql_foreign_keys(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, list[dict[str, Any]]]:
+        foreign_keys: dict[tuple[str, str], dict[str, Any]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT
+                    k.TABLE_NAME,
+                    k.CONSTRAINT_NAME,
+                    k.COLUMN_NAME,
+                    k.REFERENCED_TABLE_SCHEMA,
+                    k.REFERENCED_TABLE_NAME,
+                    k.REFERENCED_COLUMN_NAME,
+                    r.UPDATE_RULE,
+                    r.DELETE_RULE
+                FROM information_schema.KEY_COLUMN_USAGE k
+                JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+                    ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA
+                    AND r.TABLE_NAME = k.TABLE_NAME
+                    AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+                WHERE k.TABLE_SCHEMA = :schema
+                ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            options = {
+                "onupdate": row["UPDATE_RULE"],
+                "ondelete": row["DELETE_RULE"],
+            }
+            foreign_key = foreign_keys.setdefault(
+                (row["TABLE_NAME"], row["CONSTRAINT_NAME"]),
+                {
+                    "name": row["CONSTRAINT_NAME"],
+                    "constrained_columns": [],
+                    "referred_schema": row["REFERENCED_TABLE_SCHEMA"],
+                    "referred_table": row["REFERENCED_TABLE_NAME"],
+                    "referred_columns": [],
+                    # RESTRICT and NO ACTION are the same in MySQL, and are
+                    # the default.
+                    "options": {
+                        k: v
+                        for k, v in options.items()
+                        if v not in ("RESTRICT", "NO ACTION", None)
+                    },
+                },
+            )
+            foreign_key["constrained_columns"].append(row["COLUMN_NAME"])
+            foreign_key["referred_columns"].append(row["REFERENCED_COLUMN_NAME"])
+        tables: dict[str, list[dict[str, Any]]] = {}
+        for (table, _), foreign_key in foreign_keys.items():
+            tables.setdefault(table, []).append(foreign_key)
+        return tables
+
+    def _mysql_indexes(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, list[dict[str, Any]]]:
+        indexes: dict[tuple[str, str], dict[str, Any] | None] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT
+                    TABLE_NAME,
+                    INDEX_NAME,
+                    NON_UNIQUE,
+                    COLUMN_NAME,
+                    SUB_PART,
+                    INDEX_TYPE
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = :schema AND INDEX_NAME != 'PRIMARY'
+                ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            key = (row["TABLE_NAME"], row["INDEX_NAME"])
+            if key not in indexes:
+                flavor = None
+                dialect_options = {}
+                if not int(row["NON_UNIQUE"]):
+                    flavor = "UNIQUE"
+                elif row["INDEX_TYPE"] in ("FULLTEXT", "SPATIAL"):
+                    flavor = row["INDEX_TYPE"]
+                    dialect_options["mysql_prefix"] = flavor
+                indexes[key] = {
+                    "name": row["INDEX_NAME"],
+                    "column_names": [],
+                    "unique": flavor == "UNIQUE",
+                } | ({"type": flavor} if flavor else {})
+                if dialect_options:
+                    indexes[key]["dialect_options"] = dialect_options
+            index = indexes[key]
+            if index is None:
+                continue
+            if row["COLUMN_NAME"] is None:
+                # Functional key parts (MySQL 8.0.13+) have no column name,
+                # and SQLAlchemy can't reflect them.
+                log.debug("Skipping expression-based index=%s", row["INDEX_NAME"])
+                indexes[key] = None
+                continue
+            index["column_names"].append(row["COLUMN_NAME"])
+            if row["SUB_PART"] is not None:
+                index.setdefault("dialect_options", {}).setdefault(
+                    "mysql_length",
+                    {},
+                )[
+                    row["COLUMN_NAME"]
+                ] = int(row["SUB_PART"])
+        tables: dict[str, list[dict[str, Any]]] = {}
+        for (table, _), index in indexes.items():
+            if index is not None:
+                tables.setdefault(table, []).append(index)
+        return tables
+
+    def _mysql_table_comment(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> dict[str, dict[str, Any]]:
+        return {
+            row["TABLE_NAME"]: {"text": row["TABLE_COMMENT"] or None}
+            for row in conn.execute(
+                sqlalchemy.text(
+                    """
+                    SELECT TABLE_NAME, TABLE_COMMENT
+                    FROM information_schema.TABLES
+                    WHERE TABLE_SCHEMA = :schema AND TABLE_TYPE != 'VIEW'
+                    """
+                ),
+                {"schema": schema},
+            ).mappings()
+        }
+
+
+def _pg_attnames(
+    key: str,
+    relid: str,
+    label: str = "attnames",
+    table: str = "con",
+) -> str:
+    """
+    :param key: A column of attribute numbers, like `pg_constraint.conkey`.
+    :param relid: The column with the attributes' table OID.
+    :returns: A SQL expression for the attributes' names, in key order.
+    """
+
+    return f"""
+        ARRAY(
+            SELECT a.attname::text
+            FROM unnest({table}.{key}) WITH ORDINALITY AS k(attnum, ord)
+            JOIN pg_catalog.pg_attribute a
+                ON a.attrelid = {table}.{relid} AND a.attnum = k.attnum
+            ORDER BY k.ord
+        ) AS {label}
+    """
+
+
+def _pg_column_sorting(flags: int) -> tuple[str, ...]:
+    """
+    :param flags: A `pg_index.indoption` bitmask. 0x01 is DESC and 0x02 is
+        NULLS FIRST.
+    :returns: The column's sorting options that differ from PostgreSQL's
+        defaults, the way Inspector reports them.
+    """
+
+    if flags & 0x01:
+        return ("desc",) if flags & 0x02 else ("desc", "nulls_last")
+    return ("nulls_first",) if flags & 0x02 else ()
+
+
+def _mysql_column_definition(
+    preparer: sqlalchemy.sql.compiler.IdentifierPreparer,
+    row: sqlalchemy.engine.RowMapping,
+) -> str:
+    """
+    :param row: An information_schema.COLUMNS row.
+    :returns: The column's definition, formatted like a SHOW CREATE TABLE
+        line.
+    """
+
+    column_type = row["COLUMN_TYPE"]
+    extra = row["EXTRA"] or ""
+    default = row["COLUMN_DEFAULT"]
+    parts = ["", "", preparer.quote_identifier(row["COLUMN_NAME"]), column_type]
+    if row["IS_NULLABLE"] == "NO":
+        parts.append("NOT NULL")
+    if default is not None:
+        is_timestamp = column_type.startswith(("timestamp", "datetime"))
+        if is_timestamp and default.upper().startswith("CURRENT_TIMESTAMP"):
+            parts += ["DEFAULT", default]
+        elif "DEFAULT_GENERATED" in extra:
+            # MySQL 8.0.13+ expression defaults.
+            parts += ["DEFAULT", f"({default})"]
+        else:
+            parts += ["DEFAULT", "'%s'" % default.replace("'", "''")]
+    elif row["IS_NULLABLE"] == "YES" and not row["GENERATION_EXPRESSION"]:
+        parts += ["DEFAULT", "NULL"]
+    if on_update := re.search(r"on update (\S+)", extra, re.IGNORECASE):
+        parts += ["ON UPDATE", on_update.group(1)]
+    if row["GENERATION_EXPRESSION"]:
+        persistence = "STORED" if "STORED" in extra.upper() else "VIRTUAL"
+        parts.append(
+            f"GENERATED ALWAYS AS ({row['GENERATION_EXPRESSION']}) {persistence}"
+        )
+    if "auto_increment" in extra.lower():
+        parts.append("AUTO_INCREMENT")
+    if row["COLUMN_COMMENT"]:
+        comment = row["COLUMN_COMMENT"].replace("\\", "\\\\").replace("'", "''")
+        parts.append(f"COMMENT '{comment}'")
+    return " ".join(parts)
+
+
+# Reflectors are dropped when their engine is disposed, which happens when
+# the last `create_engine` context for a crawl exits. The next crawl reflects
+# its schemas again.
+_reflectors: dict[sqlalchemy.engine.Engine, SchemaReflector] = {}
+_reflectors_lock = threading.Lock()
+
+
+def get_reflector(engine: sqlalchemy.engine.Engine) -> SchemaReflector:
+    """
+    :returns: The SchemaReflector for an engine. Analyzers that share an
+        engine share its reflector, so a schema is only reflected once per
+        crawl.
+    """
+
+    with _reflectors_lock:
+        if engine not in _reflectors:
+            _reflectors[engine] = SchemaReflector(engine)
+            sqlalchemy.event.listen(
+                engine,
+                "engine_disposed",
+                _drop_reflector,
+                once=True,
+            )
+        return _reflectors[engine]
+
+
+def _drop_reflector(engine: sqlalchemy.engine.Engine):
+    with _reflectors_lock:
+        _reflectors.pop(engine, None)
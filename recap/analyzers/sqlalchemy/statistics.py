@@ -0,0 +1,422 @@
+"""
+Column statistics read from the statistics that databases maintain for their
+query planners. Reading them doesn't scan any table data, so this analyzer is
+cheap enough to run on every crawl, while `sqlalchemy.profile` runs rarely.
+"""
+
+import json
+import logging
+import math
+import threading
+from contextlib import contextmanager
+from typing import Any, Generator
+
+import sqlalchemy
+from pydantic import BaseModel
+
+from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
+from recap.browsers.db import TablePath, create_browser
+
+from .columns import generic_type
+from .profile import (
+    NUMERIC_TYPES,
+    STRING_TYPES,
+    BaseColumnProfile,
+    NumericColumnProfile,
+    StringColumnProfile,
+)
+from .reflection import get_reflector
+
+log = logging.getLogger(__name__)
+
+
+class PlannerStatistics(BaseModel):
+    # Statistics that only the planner keeps. All values are estimates.
+    null_fraction: float | None = None
+    distinct: int | None = None
+    most_common_values: list[Any] | None = None
+    most_common_frequencies: list[float] | None = None
+    histogram_bounds: list[Any] | None = None
+
+
+class NumericColumnStatistics(NumericColumnProfile, PlannerStatistics):
+    class Config:
+        # Keep float bounds as floats instead of truncating them to the first
+        # type in `int | float`.
+        smart_union = True
+
+
+class StringColumnStatistics(StringColumnProfile, PlannerStatistics):
+    min: Any | None = None
+    max: Any | None = None
+
+
+class OtherColumnStatistics(BaseColumnProfile, PlannerStatistics):
+    nulls: int | None = None
+    min: Any | None = None
+    max: Any | None = None
+
+
+ColumnStatistics = (
+    NumericColumnStatistics
+    | StringColumnStatistics
+    |
+    # This must be at the end, since it matches every column.
+    OtherColumnStatistics
+)
+
+
+class Statistics(BaseMetadataModel):
+    __root__: dict[str, ColumnStatistics] = {}
+
+
+# Row estimates keyed by table, and column statistics keyed by table, then by
+# column.
+SchemaStatistics = tuple[
+    dict[str, float],
+    dict[str, dict[str, dict[str, Any]]],
+]
+
+
+class TableStatisticsAnalyzer(AbstractAnalyzer):
+    """
+    Reads row estimates and column statistics from a database's catalog
+    instead of scanning tables:
+
+    * PostgreSQL: `pg_class.reltuples` and `pg_stats`.
+    * MySQL: `information_schema.TABLES`, index cardinality from
+      `information_schema.STATISTICS`, and histograms from
+      `information_schema.COLUMN_STATISTICS` (MySQL 8.0+).
+    * Snowflake: row counts from `information_schema.TABLES`.
+    * BigQuery: row counts from the dataset's `__TABLES__` view.
+
+    Columns get the same profile models as `sqlalchemy.profile`
+    (NumericColumnProfile and StringColumnProfile), with `approximate` set.
+    Fields that the catalog has no estimate for (such as `sum` or
+    `empty_strings`) are None. Null fractions, distinct counts, most common
+    values, and histograms are added to the profile fields.
+
+    Statistics are read a schema at a time; later tables in the same schema
+    are served from memory. Tables that have never been analyzed (and
+    unsupported dialects) return None.
+    """
+
+    def __init__(self, engine: sqlalchemy.engine.Engine):
+        self.engine = engine
+        self.schemas: dict[str, SchemaStatistics | None] = {}
+        # Guards `schemas` and `key_locks`. Only held briefly, never while
+        # querying the database.
+        self.lock = threading.Lock()
+        # One lock per schema, so tables in other schemas don't wait.
+        self.key_locks: dict[str, threading.Lock] = {}
+
+    def analyze(self, path: TablePath) -> Statistics | None:
+        """
+        :param path: Fetch statistics for a table at this path.
+        :returns: Estimated statistics for each of the table's columns, or
+            None if the database has no statistics for the table.
+        """
+
+        schema_statistics = self._get_cached(path.schema_)
+        if schema_statistics is None:
+            return None
+        rows, columns = schema_statistics
+        row_estimate = rows.get(path.table)
+        # PostgreSQL 14+ uses -1 for tables that were never analyzed.
+        if row_estimate is None or row_estimate < 0:
+            return None
+        count = int(row_estimate)
+        column_statistics = columns.get(path.table, {})
+        results = {}
+        for column in get_reflector(self.engine).get(
+            "columns",
+            path.table,
+            path.schema_,
+        ):
+            name = column["name"]
+            try:
+                column_type = generic_type(column["type"])
+            except NotImplementedError:
+                column_type = None
+            stats = column_statistics.get(name, {})
+            nulls = None
+            if stats.get("null_fraction") is not None:
+                nulls = round(stats["null_fraction"] * count)
+            if column_type in NUMERIC_TYPES:
+                results[name] = NumericColumnStatistics(
+                    count=count,
+                    approximate=True,
+                    nulls=nulls,
+                    average=None,
+                    sum=None,
+                    zeros=None,
+                    negatives=None,
+                    **(stats | _numeric_range(stats)),
+                )
+            elif column_type in STRING_TYPES:
+                results[name] = StringColumnStatistics(
+                    count=count,
+                    approximate=True,
+                    nulls=nulls,
+                    min_length=None,
+                    max_length=None,
+                    empty_strings=None,
+                    **({"distinct": None} | stats),
+                )
+            else:
+                results[name] = OtherColumnStatistics(
+                    count=count,
+                    approximate=True,
+                    nulls=nulls,
+                    **stats,
+                )
+        return Statistics.parse_obj(results)
+
+    def _get_cached(self, schema: str) -> SchemaStatistics | None:
+        with self.lock:
+            key_lock = self.key_locks.setdefault(schema, threading.Lock())
+        with key_lock:
+            with self.lock:
+                if schema in self.schemas:
+                    return self.schemas[schema]
+            schema_statistics = self._get_schema_statistics(schema)
+            with self.lock:
+                self.schemas[schema] = schema_statistics
+            return schema_statistics
+
+    def _get_schema_statistics(self, schema: str) -> SchemaStatistics | None:
+        dialect = self.engine.dialect.name
+        get_statistics = getattr(self, f"_{dialect}_statistics", None)
+        if not get_statistics:
+            log.debug("No statistics support for dialect=%s", dialect)
+            return None
+        try:
+            with self.engine.connect() as conn:
+                return get_statistics(conn, schema)
+        except Exception as e:
+            # We probably don't have access to the statistics catalog.
+            log.debug(
+                "Unable to fetch statistics for schema=%s",
+                schema,
+                exc_info=e,
+            )
+            return None
+
+    def _postgresql_statistics(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> SchemaStatistics:
+        rows = {
+            row["relname"]: row["reltuples"]
+            for row in conn.execute(
+                sqlalchemy.text(
+                    """
+                    SELECT c.relname, c.reltuples
+                    FROM pg_class c
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = :schema AND c.relkind IN ('r', 'p', 'm')
+                    """
+                ),
+                {"schema": schema},
+            ).mappings()
+        }
+        columns: dict[str, dict[str, dict[str, Any]]] = {}
+        for row in conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT
+                    tablename,
+                    attname,
+                    null_frac,
+                    n_distinct,
+                    most_common_vals::text::text[] AS most_common_vals,
+                    most_common_freqs,
+                    histogram_bounds::text::text[] AS histogram_bounds
+                FROM pg_stats
+                WHERE schemaname = :schema
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            columns.setdefault(row["tablename"], {})[row["attname"]] = {
+                "null_fraction": row["null_frac"],
+                "distinct": _pg_distinct(
+                    row["n_distinct"],
+                    rows.get(row["tablename"], 0),
+                ),
+                "most_common_values": row["most_common_vals"],
+                "most_common_frequencies": row["most_common_freqs"],
+                "histogram_bounds": row["histogram_bounds"],
+            }
+        return rows, columns
+
+    def _mysql_statistics(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> SchemaStatistics:
+        rows = {
+            row["TABLE_NAME"]: row["TABLE_ROWS"]
+            for row in conn.execute(
+                sqlalchemy.text(
+                    """
+                    SELECT TABLE_NAME, TABLE_ROWS
+                    FROM information_schema.TABLES
+                    WHERE TABLE_SCHEMA = :schema AND TABLE_ROWS IS NOT NULL
+                    """
+                ),
+                {"schema": schema},
+            ).mappings()
+        }
+        columns: dict[str, dict[str, dict[str, Any]]] = {}
+        # Cardinality of an index's first column is its distinct estimate.
+        for row in conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT TABLE_NAME, COLUMN_NAME, MAX(CARDINALITY) AS CARDINALITY
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = :schema AND SEQ_IN_INDEX = 1
+                GROUP BY TABLE_NAME, COLUMN_NAME
+                """
+            ),
+            {"schema": schema},
+        ).mappings():
+            if row["CARDINALITY"] is not None:
+                columns.setdefault(row["TABLE_NAME"], {})[row["COLUMN_NAME"]] = {
+                    "distinct": int(row["CARDINALITY"]),
+                }
+        try:
+            histograms = conn.execute(
+                sqlalchemy.text(
+                    """
+                    SELECT TABLE_NAME, COLUMN_NAME, HISTOGRAM
+                    FROM information_schema.COLUMN_STATISTICS
+                    WHERE SCHEMA_NAME = :schema
+                    """
+                ),
+                {"schema": schema},
+            ).mappings()
+            for row in histograms:
+                column = columns.setdefault(row["TABLE_NAME"], {}).setdefault(
+                    row["COLUMN_NAME"],
+                    {},
+                )
+                column |= _mysql_histogram(row["HISTOGRAM"])
+        except sqlalchemy.exc.DatabaseError as e:
+            # COLUMN_STATISTICS only exists in MySQL 8.0+.
+            log.debug(
+                "Unable to fetch histograms for schema=%s",
+                schema,
+                exc_info=e,
+            )
+        return rows, columns
+
+    def _snowflake_statistics(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> SchemaStatistics:
+        rows = {
+            conn.dialect.normalize_name(row["table_name"]): row["row_count"]
+            for row in conn.execute(
+                sqlalchemy.text(
+                    """
+                    SELECT table_name, row_count
+                    FROM information_schema.tables
+                    WHERE table_schema = :schema AND row_count IS NOT NULL
+                    """
+                ),
+                {"schema": conn.dialect.denormalize_name(schema)},
+            ).mappings()
+        }
+        return rows, {}
+
+    def _bigquery_statistics(
+        self,
+        conn: sqlalchemy.engine.Connection,
+        schema: str,
+    ) -> SchemaStatistics:
+        rows = {
+            row["table_id"]: row["row_count"]
+            for row in conn.execute(
+                sqlalchemy.text(
+                    f"SELECT table_id, row_count FROM `{schema}`.__TABLES__"
+                )
+            ).mappings()
+        }
+        return rows, {}
+
+
+def _numeric_range(stats: dict[str, Any]) -> dict[str, Any]:
+    """
+    :param stats: Column statistics from the catalog.
+    :returns: Numeric min and max estimates. Histogram bounds and most common
+        values are used if the catalog has no min or max (PostgreSQL returns
+        them as strings). Values that aren't numbers are ignored.
+    """
+
+    values = []
+    for value in (
+        [stats.get("min"), stats.get("max")]
+        + (stats.get("histogram_bounds") or [])
+        + (stats.get("most_common_values") or [])
+    ):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            continue
+        if math.isnan(number):
+            continue
+        values.append(int(number) if number.is_integer() else number)
+    return {"min": min(values), "max": max(values)} if values else {}
+
+
+def _pg_distinct(n_distinct: float | None, row_estimate: float) -> int | None:
+    """
+    :returns: An absolute distinct count. pg_stats uses negative n_distinct
+        values for a fraction of the table's rows.
+    """
+
+    if n_distinct is None:
+        return None
+    if n_distinct < 0:
+        return round(-n_distinct * max(row_estimate, 0))
+    return int(n_distinct)
+
+
+def _mysql_histogram(histogram: str | dict[str, Any]) -> dict[str, Any]:
+    """
+    :param histogram: A MySQL COLUMN_STATISTICS histogram JSON document.
+    :returns: Column statistics for the histogram.
+    """
+
+    if isinstance(histogram, str):
+        histogram = json.loads(histogram)
+    buckets = histogram.get("buckets", [])
+    statistics: dict[str, Any] = {"null_fraction": histogram.get("null-values")}
+    if not buckets:
+        return statistics
+    match histogram.get("histogram-type"):
+        case "singleton":
+            # Buckets are [value, cumulative frequency].
+            statistics["most_common_values"] = [b[0] for b in buckets]
+            statistics["most_common_frequencies"] = [
+                b[1] - (buckets[i - 1][1] if i else 0) for i, b in enumerate(buckets)
+            ]
+            statistics["distinct"] = len(buckets)
+            statistics["min"] = buckets[0][0]
+            statistics["max"] = buckets[-1][0]
+        case "equi-height":
+            # Buckets are [lower, upper, cumulative frequency, distinct].
+            statistics["histogram_bounds"] = [b[0] for b in buckets] + [buckets[-1][1]]
+            statistics["distinct"] = sum(b[3] for b in buckets)
+            statistics["min"] = buckets[0][0]
+            statistics["max"] = buckets[-1][1]
+    return statistics
+
+
+@contextmanager
+def create_analyzer(**config) -> Generator["TableStatisticsAnalyzer", None, None]:
+    with create_browser(**config) as browser:
+        yield TableStatisticsAnalyzer(browser.engine)
@@ -58,3 +58,19 @@ class AbstractBrowser(ABC):
         """
 
         raise NotImplementedError
+
+    def fingerprint(self, path: str) -> str | None:
+        """
+        Returns a cheap fingerprint for a path's current state. Fingerprints
+        let the crawler skip analyzing paths that haven't changed since the
+        last crawl. Browsers should derive fingerprints from information that
+        doesn't require scanning data (file size and modification time, or a
+        table's last DDL/modification time, for example).
+
+        The path parameter is relative; it does not include the browser's root.
+
+        :returns: A string that changes whenever the path's data or schema
+            changes, or None if the browser can't fingerprint the path.
+        """
+
+        return None
@@ -1,4 +1,12 @@
+import hashlib
+import inspect
+import json
 import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from contextlib import ExitStack, contextmanager
 from typing import Any, Generator
 
@@ -6,12 +14,16 @@ from recap.analyzers import create_analyzer
 from recap.analyzers.abstract import AbstractAnalyzer
 from recap.browsers import create_browser as create_wrapped_browser
 from recap.browsers.abstract import AbstractBrowser
-from recap.paths import CatalogPath, create_catalog_path
+from recap.browsers.db import statement_timeout_options
+from recap.paths import CatalogPath, RootPath, create_catalog_path
 from recap.plugins import load_analyzer_plugins, load_browser_plugins
-from recap.typing import BrowserInspector
+from recap.typing import AnalyzerInspector, BrowserInspector
 
 log = logging.getLogger(__name__)
 
+# Metadata key that lists analyzers that timed out on a path.
+TIMEOUTS_KEY = "analyzing.timeouts"
+
 
 class AnalyzingBrowser(AbstractBrowser):
     """
@@ -21,8 +33,28 @@ class AnalyzingBrowser(AbstractBrowser):
 
     AnalyzingBrowser takes in a browser and its compatible analyzers. It
     provides all of the same functionality as the wrapped browser, but it also
-    exposes an `analyze()` method, which runs all analyzers on a path and
-    returns the analyzed metadata.
+    exposes an `analyze()` method, which runs all compatible analyzers on a
+    path and returns the analyzed metadata.
+
+    An analyzer is compatible with a path if the path's type is (a subclass
+    of) one of the types in the analyzer's `analyze()` path type hint.
+    Analyzers without a path type hint are compatible with every path. The
+    compatible analyzers for each path type are computed once, so
+    incompatible analyzers are never called.
+
+    Analyzers run one after another by default. With `concurrency` > 1,
+    analyzers for a path run in parallel from a shared thread pool, so
+    analyzing a path takes as long as its slowest analyzer. Analyzers with a
+    timeout each run in a new thread instead, which starts right away, so
+    timeouts are measured from when the analyzer starts running. If an
+    analyzer doesn't finish in time, its result is dropped and the metadata
+    key it would have written is listed under `analyzing.timeouts`. Python
+    threads can't be interrupted, so a timed-out analyzer's thread is
+    abandoned and left to finish on its own. It never holds a pool worker
+    that other analyzers are waiting for. Once an analyzer has
+    `max_abandoned` abandoned threads that are still running, it's skipped
+    (and listed under `analyzing.timeouts`) until some of them finish, so a
+    hung analyzer can't pile up threads and connections.
 
     This browser is deliberately not added to Recap's browser plugin
     entrypoint. It's more of a utility class for the CLI and crawler.
@@ -32,12 +64,60 @@ class AnalyzingBrowser(AbstractBrowser):
         self,
         browser: AbstractBrowser,
         analyzers: list[AbstractAnalyzer],
+        concurrency: int = 1,
+        timeouts: dict[AbstractAnalyzer, float] = {},
+        configs: dict[AbstractAnalyzer, dict[str, Any]] = {},
+        max_abandoned: int = 8,
     ):
+        """
+        :param browser: The browser to wrap.
+        :param analyzers: Analyzers to run on the browser's paths.
+        :param concurrency: Maximum number of analyzers to run in parallel.
+        :param timeouts: Maximum seconds each analyzer may take on a path.
+            Analyzers without a timeout can take as long as they need.
+        :param configs: The config each analyzer was created with. Configs
+            are part of path fingerprints.
+        :param max_abandoned: Maximum number of timed-out threads per
+            analyzer to leave running before skipping the analyzer.
+        """
+
+        assert concurrency > 0, f"Expected concurrency > 0, but got {concurrency}"
         self.browser = browser
         self.analyzers = analyzers
+        self.timeouts = timeouts
+        self.max_abandoned = max_abandoned
+        # Analyzers whose timed-out threads are still running, keyed by the
+        # threads' futures. Guarded by `abandoned_lock`.
+        self.abandoned: dict[Future, AbstractAnalyzer] = {}
+        self.abandoned_lock = threading.Lock()
+        # Analyzer names and configs don't change, so serialize them once.
+        self.analyzers_fingerprint = json.dumps(
+            sorted(
+                [
+                    f"{type(analyzer).__module__}.{type(analyzer).__name__}",
+                    configs.get(analyzer, {}),
+                ]
+                for analyzer in analyzers
+            ),
+            sort_keys=True,
+            default=str,
+        )
+        self.executor = (
+            ThreadPoolExecutor(
+                max_workers=concurrency,
+                thread_name_prefix="recap-analyzer",
+            )
+            if concurrency > 1
+            else None
+        )
         self.root_str = str(browser.root())
         self.root_len = len(self.root_str)
         self.child_types = BrowserInspector(type(browser)).children_types()
+        # Compatible analyzers for each path type.
+        self.analyzers_by_path_type: dict[type[CatalogPath], list[AbstractAnalyzer]] = {
+            path_type: self._compatible_analyzers(path_type)
+            for path_type in self.child_types + [RootPath]
+        }
 
     def children(self, path: str) -> list[CatalogPath] | None:
         return self.browser.children(path)
@@ -45,46 +125,245 @@ class AnalyzingBrowser(AbstractBrowser):
     def root(self) -> CatalogPath:
         return self.browser.root()
 
-    def analyze(self, path: str) -> dict[str, Any] | None:
-        if catalog_path := create_catalog_path(
-            path,
-            *self.child_types,
-        ):
-            return self._get_metadata(catalog_path)
+    def fingerprint(self, path: str) -> str | None:
+        """
+        Fingerprint a path using the wrapped browser. The fingerprint also
+        covers the set of analyzers and their configs, so adding, excluding,
+        or reconfiguring an analyzer invalidates fingerprints from previous
+        crawls.
+        """
+
+        if browser_fingerprint := self.browser.fingerprint(path):
+            return hashlib.sha256(
+                repr([browser_fingerprint, self.analyzers_fingerprint]).encode(),
+            ).hexdigest()
+        return None
+
+    def analyze(self, path: str | CatalogPath) -> dict[str, Any] | None:
+        """
+        :param path: The path to analyze. Prefer passing the CatalogPath that
+            `children()` returned; a string is converted to the first of the
+            browser's path types whose template matches, which is ambiguous
+            for browsers with several path types that share a template (such
+            as FilesystemBrowser's DirectoryPath and FilePath).
+        """
+
+        if isinstance(path, str):
+            path = create_catalog_path(path, *self.child_types)
+        if path:
+            return self._get_metadata(path)
         return None
 
+    def _compatible_analyzers(
+        self,
+        path_type: type[CatalogPath],
+    ) -> list[AbstractAnalyzer]:
+        """
+        :returns: Analyzers whose `analyze()` type hints accept path_type.
+        """
+
+        compatible_analyzers = []
+        for analyzer in self.analyzers:
+            try:
+                input_types = AnalyzerInspector(type(analyzer)).input_path_types()
+            except Exception as e:
+                log.debug(
+                    "Unable to inspect analyzer=%s",
+                    analyzer.__class__.__name__,
+                    exc_info=e,
+                )
+                input_types = []
+            if not input_types or issubclass(path_type, tuple(input_types)):
+                compatible_analyzers.append(analyzer)
+        return compatible_analyzers
+
     def _get_metadata(
         self,
         path: CatalogPath,
     ) -> dict[str, Any]:
         results = {}
-        for analyzer in self.analyzers:
-            log.debug(
-                "Analyzing path=%s analyzer=%s",
-                path,
-                analyzer.__class__.__name__,
+        path_type = type(path)
+        if path_type not in self.analyzers_by_path_type:
+            self.analyzers_by_path_type[path_type] = self._compatible_analyzers(
+                path_type
             )
-            try:  # EAFP
-                if metadata := analyzer.analyze(path):
-                    metadata_dict = metadata.dict(
-                        by_alias=True,
-                        exclude_none=True,
-                        exclude_unset=True,
-                        exclude_defaults=True,
-                    )
-                    # Have to unpack __root__ if it exists, sigh.
-                    # https://github.com/pydantic/pydantic/issues/1193
-                    metadata_obj = metadata_dict.get("__root__", metadata_dict)
-                    results |= {metadata.key(): metadata_obj}
-            except Exception as e:
-                log.debug(
-                    "Unable to process path with analyzer path=%s analyzer=%s",
+        analyzers = self.analyzers_by_path_type[path_type]
+
+        # Start timed analyzers first, so they run alongside the others.
+        timed_futures = []
+        timed_out = []
+        for analyzer in analyzers:
+            if analyzer not in self.timeouts:
+                continue
+            if self._abandoned_count(analyzer) >= self.max_abandoned:
+                log.warning(
+                    "Skipped analyzing path=%s analyzer=%s, which has "
+                    "max_abandoned=%s timed-out threads still running",
                     path,
                     analyzer.__class__.__name__,
-                    exc_info=e,
+                    self.max_abandoned,
                 )
+                timed_out.append(self._metadata_key(analyzer))
+                continue
+            timed_futures.append(
+                (analyzer, time.monotonic(), self._analyze_in_thread(analyzer, path))
+            )
+        untimed_analyzers = [
+            analyzer for analyzer in analyzers if analyzer not in self.timeouts
+        ]
+        if self.executor:
+            futures = [
+                self.executor.submit(self._analyze, analyzer, path)
+                for analyzer in untimed_analyzers
+            ]
+            for future in futures:
+                results |= future.result()
+        else:
+            for analyzer in untimed_analyzers:
+                results |= self._analyze(analyzer, path)
+
+        for analyzer, started_at, future in timed_futures:
+            timeout = self.timeouts[analyzer]
+            try:
+                results |= future.result(
+                    max(0, started_at + timeout - time.monotonic())
+                )
+            except FutureTimeoutError:
+                log.warning(
+                    "Timed out analyzing path=%s analyzer=%s timeout=%s",
+                    path,
+                    analyzer.__class__.__name__,
+                    timeout,
+                )
+                timed_out.append(self._metadata_key(analyzer))
+                with self.abandoned_lock:
+                    if not future.done():
+                        self.abandoned[future] = analyzer
+        # Always set the key if a timeout applied, so a successful run clears
+        # timeouts that a previous run recorded.
+        if timed_futures or timed_out:
+            results[TIMEOUTS_KEY] = sorted(timed_out)
         return results
 
+    def _analyze_in_thread(
+        self,
+        analyzer: AbstractAnalyzer,
+        path: CatalogPath,
+    ) -> Future:
+        """
+        Run a single analyzer on a path in a new daemon thread. Daemon threads
+        don't keep the process alive if the analyzer never finishes.
+
+        :returns: A future for the analyzer's `_analyze()` results.
+        """
+
+        future = Future()
+
+        def run():
+            results = self._analyze(analyzer, path)
+            with self.abandoned_lock:
+                future.set_result(results)
+                self.abandoned.pop(future, None)
+
+        threading.Thread(
+            target=run,
+            name=f"recap-analyzer-{analyzer.__class__.__name__}",
+            daemon=True,
+        ).start()
+        return future
+
+    def _abandoned_count(self, analyzer: AbstractAnalyzer) -> int:
+        """
+        :returns: Number of the analyzer's timed-out threads still running.
+        """
+
+        with self.abandoned_lock:
+            return sum(1 for a in self.abandoned.values() if a is analyzer)
+
+    def _analyze(
+        self,
+        analyzer: AbstractAnalyzer,
+        path: CatalogPath,
+    ) -> dict[str, Any]:
+        """
+        Run a single analyzer on a path.
+
+        :returns: A dictionary with the analyzer's metadata under its key, or
+            an empty dictionary if the analyzer returned nothing or failed.
+        """
+
+        log.debug(
+            "Analyzing path=%s analyzer=%s",
+            path,
+            analyzer.__class__.__name__,
+        )
+        try:  # EAFP
+            if metadata := analyzer.analyze(path):
+                metadata_dict = metadata.dict(
+                    by_alias=True,
+                    exclude_none=True,
+                    exclude_unset=True,
+                    exclude_defaults=True,
+                )
+                # Have to unpack __root__ if it exists, sigh.
+                # https://github.com/pydantic/pydantic/issues/1193
+                metadata_obj = metadata_dict.get("__root__", metadata_dict)
+                return {metadata.key(): metadata_obj}
+        except Exception as e:
+            log.debug(
+                "Unable to process path with analyzer path=%s analyzer=%s",
+                path,
+                analyzer.__class__.__name__,
+                exc_info=e,
+            )
+        return {}
+
+    def _metadata_key(self, analyzer: AbstractAnalyzer) -> str:
+        """
+        :returns: The metadata key an analyzer writes to, or its class name if
+            its return type isn't hinted.
+        """
+
+        try:
+            if return_type := AnalyzerInspector(type(analyzer)).return_type():
+                return return_type.key()
+        except Exception:
+            pass
+        return analyzer.__class__.__name__
+
+
+def parse_timeout(timeout: str | int | float) -> float:
+    """
+    Parse a timeout setting. Timeouts may be a number of seconds or a string
+    with a unit, such as "500ms", "60s", "5m", or "1h".
+
+    :returns: The timeout in seconds.
+    """
+
+    if isinstance(timeout, int | float):
+        return float(timeout)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d*)?)\s*(ms|s|m|h)?\s*", timeout)
+    assert match, f"Unable to parse timeout={timeout}"
+    amount, unit = match.groups()
+    return float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit or "s"]
+
+
+def _analyzer_config(module: Any, config: dict[str, Any]) -> dict[str, Any]:
+    """
+    :param module: An analyzer plugin module.
+    :param config: The config the analyzer was created with.
+    :returns: The named `create_analyzer` parameters and their values, except
+        for the URL, which every analyzer gets.
+    """
+
+    parameters = inspect.signature(module.create_analyzer).parameters.values()
+    return {
+        parameter.name: config.get(parameter.name, parameter.default)
+        for parameter in parameters
+        if parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+        and parameter.name != "url"
+    }
+
 
 @contextmanager
 def create_browser(**config) -> Generator["AnalyzingBrowser", None, None]:
@@ -97,6 +376,23 @@ def create_browser(**config) -> Generator["AnalyzingBrowser", None, None]:
     searches for the first AbstractBrowser that doesn't throw an exception when
     its `create_browser` method is called.
 
+    Analyzer concurrency and timeouts are set with the `analyzer_concurrency`
+    and `analyzer_timeouts` configs. Timeouts are keyed by analyzer plugin
+    name:
+
+    ```toml
+    [[crawlers]]
+    url = "postgresql://username@localhost/some_db"
+    analyzer_concurrency = 8
+    analyzer_timeouts = {"sqlalchemy.profile" = "60s"}
+    ```
+
+    Analyzers with a timeout get their own database engine. For PostgreSQL
+    and MySQL, the engine also sets a server-side statement timeout, so the
+    database cancels queries that timed-out analyzers leave running. After
+    `analyzer_max_abandoned` (default 8) of an analyzer's timed-out threads
+    are still running, the analyzer is skipped until they finish.
+
     :param config: A **kwargs config for the browser to wrap.
     """
 
@@ -106,8 +402,14 @@ def create_browser(**config) -> Generator["AnalyzingBrowser", None, None]:
     with ExitStack() as stack:
         url = config.get("url")
         excludes = config.get("excludes", [])
+        analyzer_timeouts = {
+            name: parse_timeout(timeout)
+            for name, timeout in config.get("analyzer_timeouts", {}).items()
+        }
         browser = None
         analyzers = []
+        timeouts = {}
+        configs = {}
 
         # Find a real AbstractBrowser to wrap
         for browser_name in browser_plugins.keys():
@@ -134,14 +436,32 @@ def create_browser(**config) -> Generator["AnalyzingBrowser", None, None]:
         for analyzer_name in analyzer_plugins.keys():
             if analyzer_name not in excludes:
                 try:
+                    analyzer_config = config
+                    if analyzer_name in analyzer_timeouts:
+                        # Timed analyzers get their own engine, which cancels
+                        # queries that outlive the timeout. Abandoned threads
+                        # don't hold connections other analyzers need.
+                        analyzer_config = config | {
+                            "engine": statement_timeout_options(
+                                str(url),
+                                analyzer_timeouts[analyzer_name],
+                                config.get("engine", {}),
+                            )
+                        }
                     analyzer_context_manager = create_analyzer(
                         plugin=analyzer_name,
-                        **config,
+                        **analyzer_config,
                     )
                     analyzer = stack.enter_context(
                         analyzer_context_manager,
                     )
                     analyzers.append(analyzer)
+                    configs[analyzer] = _analyzer_config(
+                        analyzer_plugins[analyzer_name],
+                        config,
+                    )
+                    if analyzer_name in analyzer_timeouts:
+                        timeouts[analyzer] = analyzer_timeouts[analyzer_name]
                 except Exception as e:
                     log.debug(
                         "Skipped analyzer for url=%s name=%s",
@@ -157,4 +477,19 @@ def create_browser(**config) -> Generator["AnalyzingBrowser", None, None]:
                 url,
             )
 
-        yield AnalyzingBrowser(browser, analyzers)
+        analyzing_browser = AnalyzingBrowser(
+            browser,
+            analyzers,
+            config.get("analyzer_concurrency", 1),
+            timeouts,
+            configs,
+            config.get("analyzer_max_abandoned", 8),
+        )
+        if analyzing_browser.executor:
+            # Don't wait for timed-out analyzers that are still running.
+            stack.callback(
+                analyzing_browser.executor.shutdown,
+                wait=False,
+                cancel_futures=True,
+            )
+        yield analyzing_browser
@@ -1,4 +1,8 @@
+import hashlib
+import json
 import logging
+import threading
+import time
 from contextlib import contextmanager
 from typing import Any, Callable, Generator, Union
 from urllib.parse import urlparse
@@ -59,6 +63,102 @@ DatabaseBrowserPath = Union[
     ViewPath,
 ]
 
+# Queries that fetch cheap change information for every table and view in a
+# schema from a dialect's system catalogs. The first column must be the table
+# or view name. All other columns are hashed into the fingerprint. Rows with
+# the same name are hashed together, in order, so a query can return a row per
+# column. A table or view whose second column is NULL in any row isn't
+# fingerprinted (and is always analyzed), because nothing would tell when it
+# changed.
+FINGERPRINT_QUERIES = {
+    "postgresql": """
+        SELECT
+            c.relname,
+            c.xmin::text,
+            c.relfilenode,
+            c.relacl::text,
+            obj_description(c.oid, 'pg_class'),
+            CASE WHEN c.relkind IN ('v', 'm') THEN pg_get_viewdef(c.oid) END,
+            (
+                SELECT string_agg(
+                    a.attname
+                        || ':' || format_type(a.atttypid, a.atttypmod)
+                        || ':' || a.attnotnull
+                        || ':' || coalesce(col_description(c.oid, a.attnum), ''),
+                    ',' ORDER BY a.attnum
+                )
+                FROM pg_attribute a
+                WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            ),
+            (
+                SELECT string_agg(i.indexrelid::text, ',' ORDER BY i.indexrelid)
+                FROM pg_index i
+                WHERE i.indrelid = c.oid
+            ),
+            (
+                SELECT string_agg(con.oid::text, ',' ORDER BY con.oid)
+                FROM pg_constraint con
+                WHERE con.conrelid = c.oid
+            ),
+            s.n_tup_ins,
+            s.n_tup_upd,
+            s.n_tup_del
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+        WHERE n.nspname = :schema AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+    """,
+    # UPDATE_TIME is NULL for views, and for InnoDB tables that haven't been
+    # written since the server started. Views are fingerprinted by their
+    # definition instead. Tables and views include their column definitions.
+    "mysql": """
+        SELECT
+            t.TABLE_NAME,
+            CASE
+                WHEN t.TABLE_TYPE = 'VIEW' THEN v.VIEW_DEFINITION
+                ELSE t.UPDATE_TIME
+            END,
+            t.CREATE_TIME,
+            t.TABLE_ROWS,
+            t.TABLE_COMMENT,
+            c.COLUMN_NAME,
+            c.COLUMN_TYPE,
+            c.IS_NULLABLE,
+            c.COLUMN_DEFAULT,
+            c.COLUMN_KEY,
+            c.EXTRA,
+            c.COLUMN_COMMENT
+        FROM information_schema.TABLES t
+        LEFT JOIN information_schema.VIEWS v
+            ON v.TABLE_SCHEMA = t.TABLE_SCHEMA AND v.TABLE_NAME = t.TABLE_NAME
+        LEFT JOIN information_schema.COLUMNS c
+            ON c.TABLE_SCHEMA = t.TABLE_SCHEMA AND c.TABLE_NAME = t.TABLE_NAME
+        WHERE t.TABLE_SCHEMA = :schema
+        ORDER BY t.TABLE_NAME, c.ORDINAL_POSITION
+    """,
+    "snowflake": """
+        SELECT
+            table_name,
+            created,
+            last_altered,
+            row_count,
+            bytes,
+            comment
+        FROM information_schema.tables
+        WHERE UPPER(table_schema) = UPPER(:schema)
+    """,
+    # BigQuery doesn't allow bind parameters in table names.
+    "bigquery": """
+        SELECT
+            table_id,
+            creation_time,
+            last_modified_time,
+            row_count,
+            size_bytes
+        FROM `{schema}`.__TABLES__
+    """,
+}
+
 
 class DatabaseBrowser(AbstractBrowser):
     """
@@ -81,20 +181,46 @@ class DatabaseBrowser(AbstractBrowser):
     (https://en.wikipedia.org/wiki/Information_schema). PostgreSQL, in
     particular, is a little weird because it has both (the schema is usually
     `public`).
+
+    Schema, table, and view names are cached, along with SQLAlchemy's
+    reflection cache, for the browser's lifetime (a single crawl) so each is
+    only queried once. Set `cache_ttl` for browsers that live longer, such as
+    in a server.
+
+    Table and view fingerprints are read from the dialect's system catalogs
+    (PostgreSQL, MySQL, Snowflake, and BigQuery are supported). Fingerprints
+    for an entire schema are fetched with a single query the first time one of
+    its tables or views is fingerprinted.
     """
 
     def __init__(
         self,
         engine: sqlalchemy.engine.Engine,
         root_: DatabaseRootPath | None = None,
+        cache_ttl: float | None = None,
     ):
         """
         :param engine: SQLAlchemy engine to use when browsing the db.
         :param root_: The root CatalogPath that represents this DB instance.
+        :param cache_ttl: Seconds to cache schema, table, and view names (and
+            fingerprints) for. Cached forever if None.
         """
 
         self.engine = engine
         self.root_ = root_ or DatabaseBrowser.default_root(str(engine.url))
+        self.cache_ttl = cache_ttl
+        # Cached values and when they expire, keyed by (kind, schema).
+        self.cache: dict[tuple[str, str | None], tuple[float, Any]] = {}
+        # Guards `cache` and `key_locks`. Only held briefly, never while
+        # querying the database.
+        self.cache_lock = threading.Lock()
+        # One lock per cache key, so concurrent crawl workers only wait for
+        # each other when they need the same value.
+        self.key_locks: dict[tuple[str, str | None], threading.Lock] = {}
+        # Inspectors aren't thread-safe.
+        self.inspector_lock = threading.Lock()
+        self.inspector: sqlalchemy.engine.Inspector | None = None
+        self.inspector_expires_at = 0.0
 
     def children(
         self,
@@ -118,7 +244,7 @@ class DatabaseBrowser(AbstractBrowser):
                 return [SchemaPath(schema=s) for s in self.schemas()]
             case SchemaPath(schema_=schema):
                 # TODO can we move this if to the case
-                if schema in self.schemas():
+                if schema in self._schema_set():
                     return [
                         TablesPath(schema=schema),
                         ViewsPath(schema=schema),
@@ -129,6 +255,62 @@ class DatabaseBrowser(AbstractBrowser):
                 return [ViewPath(schema=schema, view=v) for v in self.views(schema)]
         return None
 
+    def fingerprint(self, path: str) -> str | None:
+        catalog_path = create_catalog_path(path, TablePath, ViewPath)
+        match catalog_path:
+            case TablePath(schema_=schema, table=name) | ViewPath(
+                schema_=schema,
+                view=name,
+            ):
+                fingerprints = self._cached(
+                    ("fingerprints", schema),
+                    lambda: self._fingerprints(schema),
+                )
+                if fingerprints:
+                    return fingerprints.get(name)
+        return None
+
+    def _fingerprints(self, schema: str) -> dict[str, str] | None:
+        """
+        Fetch fingerprints for all tables and views in a schema.
+
+        :returns: A dictionary of table or view name to fingerprint, or None
+            if the dialect isn't supported or the query failed.
+        """
+
+        dialect = self.engine.dialect.name
+        if not (query := FINGERPRINT_QUERIES.get(dialect)):
+            return None
+        change_info: dict[str, list[Any]] = {}
+        unknown = set()
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    sqlalchemy.text(query.format(schema=schema)),
+                    {"schema": schema},
+                )
+                for row in rows:
+                    name, *row_change_info = row
+                    # Match SQLAlchemy's name normalization for dialects that
+                    # store case-insensitive names in upper case.
+                    if dialect == "snowflake" and name.upper() == name:
+                        name = name.lower()
+                    if row_change_info[0] is None:
+                        unknown.add(name)
+                    change_info.setdefault(name, []).append(row_change_info)
+        except Exception as e:
+            log.debug(
+                "Unable to fetch fingerprints for schema=%s",
+                schema,
+                exc_info=e,
+            )
+            return None
+        return {
+            name: hashlib.sha256(repr(info).encode()).hexdigest()
+            for name, info in change_info.items()
+            if name not in unknown
+        }
+
     def schemas(self) -> list[str]:
         """
         :returns: All schema names in a database. In PostgreSQL, this is
@@ -136,31 +318,86 @@ class DatabaseBrowser(AbstractBrowser):
             all database names.
         """
 
-        return sqlalchemy.inspect(self.engine).get_schema_names()
+        return self._cached(
+            ("schemas", None),
+            lambda: self._inspect("get_schema_names"),
+        )
 
     def tables(self, schema: str) -> list[str]:
         """
         :returns: All table names in a schema.
         """
 
-        return self._tables_or_views(
-            schema,
-            sqlalchemy.inspect(self.engine).get_table_names,
+        return self._cached(
+            ("tables", schema),
+            lambda: self._tables_or_views(schema, "get_table_names"),
         )
 
     def views(self, schema: str) -> list[str]:
         """
         :returns: All view names in a schema.
         """
-        return self._tables_or_views(
-            schema,
-            sqlalchemy.inspect(self.engine).get_view_names,
+        return self._cached(
+            ("views", schema),
+            lambda: self._tables_or_views(schema, "get_view_names"),
+        )
+
+    def _schema_set(self) -> set[str]:
+        """
+        :returns: All schema names in a database as a set, for membership
+            checks.
+        """
+
+        return self._cached(("schema_set", None), lambda: set(self.schemas()))
+
+    def _cached(self, key: tuple[str, str | None], fetch: Callable[[], Any]) -> Any:
+        """
+        :param key: Cache key.
+        :param fetch: Called to get the value if it's not cached or expired.
+        :returns: A cached value.
+        """
+
+        with self.cache_lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        # Only callers that need the same key wait for the fetch.
+        with key_lock:
+            with self.cache_lock:
+                expires_at, value = self.cache.get(key, (0.0, None))
+                if key in self.cache and time.monotonic() < expires_at:
+                    return value
+            value = fetch()
+            with self.cache_lock:
+                self.cache[key] = (self._expires_at(), value)
+            return value
+
+    def _inspect(self, method: str, *args: Any) -> Any:
+        """
+        Call a SQLAlchemy Inspector method. The Inspector is reused until the
+        cache expires, so its reflection cache is shared across calls. Calls
+        are serialized with `inspector_lock`, since Inspectors aren't
+        thread-safe.
+
+        :param method: Inspector method name, such as `get_table_names`.
+        :returns: The method's return value.
+        """
+
+        with self.inspector_lock:
+            if not self.inspector or time.monotonic() >= self.inspector_expires_at:
+                self.inspector = sqlalchemy.inspect(self.engine)
+                self.inspector_expires_at = self._expires_at()
+            return getattr(self.inspector, method)(*args)
+
+    def _expires_at(self) -> float:
+        return (
+            time.monotonic() + self.cache_ttl
+            if self.cache_ttl is not None
+            else float("inf")
         )
 
     def _tables_or_views(
         self,
         schema: str,
-        get_method: Callable[[str], list[str]],
+        get_method: str,
     ) -> list[str]:
         """
         Helper function that gets returns all tables or views for a given
@@ -168,14 +405,14 @@ class DatabaseBrowser(AbstractBrowser):
         and others just return `<table>`. To keep things standard, we strip out
         the `<schema>.` prefix if it exists.
 
-        :param get_method: A SQLAlchemy inspection method; either
-            (`get_table_names` or `get_schema_names`).
+        :param get_method: A SQLAlchemy inspection method name; either
+            (`get_table_names` or `get_view_names`).
         :returns: All views or tables in a schema.
         """
 
         results = []
         try:
-            for table_or_view in get_method(schema):
+            for table_or_view in self._inspect(get_method, schema):
                 # Stripe schema name from the table/view name. Some dialects
                 # include the schema name as part of the table/view. Let's keep
                 # things consistent.
@@ -208,18 +445,122 @@ class DatabaseBrowser(AbstractBrowser):
         )
 
 
+# Engines shared by create_engine, keyed by URL and engine options. Values
+# are (engine, number of open create_engine contexts).
+_engines: dict[tuple[str, str], tuple[sqlalchemy.engine.Engine, int]] = {}
+_engines_lock = threading.Lock()
+
+
+@contextmanager
+def create_engine(
+    url: str,
+    **options,
+) -> Generator[sqlalchemy.engine.Engine, None, None]:
+    """
+    Yields a SQLAlchemy engine that's shared with every other open
+    `create_engine` context for the same URL and options. The DatabaseBrowser
+    and all SQLAlchemy analyzers for a crawl share one engine (and connection
+    pool) this way. The engine is disposed when the last context exits.
+
+    :param url: SQLAlchemy database URL.
+    :param options: **kwargs to pass to `sqlalchemy.create_engine`.
+        `pool_pre_ping` defaults to True, so connections that the database
+        closed while idle are replaced rather than failing a query.
+    """
+
+    options = {"pool_pre_ping": True} | options
+    key = (url, json.dumps(options, sort_keys=True, default=str))
+    with _engines_lock:
+        engine, references = _engines.get(key) or (
+            sqlalchemy.create_engine(url, **options),
+            0,
+        )
+        _engines[key] = (engine, references + 1)
+    try:
+        yield engine
+    finally:
+        with _engines_lock:
+            engine, references = _engines[key]
+            if references > 1:
+                _engines[key] = (engine, references - 1)
+            else:
+                del _engines[key]
+                engine.dispose()
+
+
+def statement_timeout_options(
+    url: str,
+    seconds: float,
+    options: dict[str, Any] = {},
+) -> dict[str, Any]:
+    """
+    Add a server-side statement timeout to SQLAlchemy engine options, for
+    drivers that can set one when they connect: PostgreSQL's
+    `statement_timeout` (psycopg2) and MySQL's `max_execution_time`
+    (mysqlclient and PyMySQL, SELECTs only).
+
+    :param url: SQLAlchemy database URL.
+    :param seconds: Seconds a statement may run for.
+    :param options: Engine options to add the timeout to.
+    :returns: New engine options, or `options` unchanged if the URL's driver
+        isn't supported.
+    """
+
+    try:
+        drivername = sqlalchemy.engine.make_url(url).drivername
+    except Exception:
+        return options
+    milliseconds = max(1, round(seconds * 1000))
+    connect_args = dict(options.get("connect_args", {}))
+    match drivername:
+        case "postgresql" | "postgresql+psycopg2":
+            connect_args["options"] = " ".join(
+                filter(
+                    None,
+                    [
+                        connect_args.get("options"),
+                        f"-c statement_timeout={milliseconds}",
+                    ],
+                )
+            )
+        case "mysql" | "mysql+mysqldb" | "mysql+pymysql" if (
+            "init_command" not in connect_args
+        ):
+            connect_args[
+                "init_command"
+            ] = f"SET SESSION max_execution_time = {milliseconds}"
+        case _:
+            return options
+    return options | {"connect_args": connect_args}
+
+
 @contextmanager
 def create_browser(
     url: str,
     name: str | None = None,
     engine: dict[str, Any] = {},
+    cache_ttl: float | None = None,
     **_,
 ) -> Generator[DatabaseBrowser, None, None]:
+    """
+    :param url: SQLAlchemy database URL.
+    :param name: The name to use in the DatabaseRootPath. If unspecified, the
+        URL host is used.
+    :param engine: **kwargs to pass to `sqlalchemy.create_engine`. Browsers
+        and analyzers with the same URL and engine config share an engine. Set
+        `engine.pool_size` to at least the crawler's `concurrency` times its
+        `analyzer_concurrency` to avoid waiting on connections.
+    :param cache_ttl: Seconds to cache schema, table, and view names for.
+        Cached for the browser's lifetime if unset.
+    """
+
     default_root = DatabaseBrowser.default_root(url)
-    yield DatabaseBrowser(
-        engine=sqlalchemy.create_engine(url, **engine),
-        root_=DatabaseRootPath(
-            scheme=default_root.scheme,
-            name=name or default_root.name_,
-        ),
-    )
+    with create_engine(url, **engine) as shared_engine:
+        yield DatabaseBrowser(
+            engine=shared_engine,
+            root_=DatabaseRootPath(
+                scheme=default_root.scheme,
+                name=name or default_root.name_,
+            ),
+            cache_ttl=cache_ttl,
+        )
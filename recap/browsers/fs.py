@@ -1,10 +1,16 @@
+import asyncio
+import fnmatch
+import json
 import logging
+import re
+import threading
 from contextlib import contextmanager
 from pathlib import PurePosixPath
 from typing import Any, Generator, Union
 from urllib.parse import urlparse
 
 from fsspec import AbstractFileSystem, get_fs_token_paths
+from fsspec.asyn import sync
 from pydantic import Field
 
 from recap.paths import CatalogPath
@@ -37,6 +43,62 @@ FilesystemBrowserPath = Union[
     FilePath,
 ]
 
+# fsspec detail fields that change when a file changes. Different filesystem
+# implementations use different names.
+FINGERPRINT_FIELDS = [
+    "mtime",
+    "LastModified",
+    "last_modified",
+    "updated",
+    "ETag",
+    "etag",
+    "md5Hash",
+    "crc32c",
+    "generation",
+]
+
+# A Hive-style partition directory name, like `dt=2023-01-01`.
+HIVE_PARTITION = re.compile(r"^([^=/]+)=([^/]*)$")
+
+
+def partition_values(path: str) -> list[tuple[str, str]]:
+    """
+    :param path: A path relative to a partitioned dataset's directory.
+    :returns: The (key, value) pairs for each partition directory in the path.
+    """
+
+    return [
+        (match.group(1), match.group(2))
+        for part in PurePosixPath(path).parent.parts
+        if (match := HIVE_PARTITION.match(part))
+    ]
+
+
+def is_partitioned(children: list[dict[str, Any]]) -> bool:
+    """
+    :param children: fsspec listing details for a directory's children.
+    :returns: True if every child directory is a Hive-style partition. Files
+        (like `_SUCCESS` markers) are ignored.
+    """
+
+    directories = [
+        PurePosixPath(child["name"]).name
+        for child in children
+        if child["type"] == "directory"
+    ]
+    return bool(directories) and all(
+        HIVE_PARTITION.match(directory) for directory in directories
+    )
+
+
+def is_data_file(path: str) -> bool:
+    """
+    :returns: False for hidden files and markers like `_SUCCESS` and
+        `.part-0000.crc` that Spark and Hive write next to data files.
+    """
+
+    return not PurePosixPath(path).name.startswith(("_", "."))
+
 
 class FilesystemBrowser(AbstractBrowser):
     """
@@ -45,6 +107,39 @@ class FilesystemBrowser(AbstractBrowser):
     (https://filesystem-spec.readthedocs.io/en/latest/api.html#built-in-implementations).
 
     FilesystemBrowser mirrors the directory structure in the filesystem.
+
+    File fingerprints are built from the size, modification time, and ETag
+    details that fsspec returns when listing a file's parent directory, so
+    fingerprinting doesn't cost any extra requests.
+
+    Each call to `children` makes a single `ls` call; missing paths and files
+    are recognized from its response. With `prefetch` enabled, the browser
+    instead lists the whole tree under its base path with one (paginated)
+    `find` call the first time `children` is called, and serves every later
+    listing from memory. This is much faster for object stores with many
+    prefixes, but holds the whole listing in memory.
+
+    With `listing_concurrency` set, the browser instead lists the tree in the
+    background, one directory per `ls` call, with up to `listing_concurrency`
+    calls in flight. Async filesystems (s3fs, gcsfs, and so on) use their
+    native coroutines; other filesystems use a thread per call. `children`
+    returns as soon as its directory has been listed, so the crawler's
+    frontier fills while the rest of the tree is still being listed. Like
+    `prefetch`, this holds the whole listing in memory. The background
+    listing only descends into directories the crawl will visit (see
+    `recursive` and `filters`), and stops when the browser is closed. Paths
+    it won't list (like missing paths) are listed with a direct `ls` call.
+
+    With `hive_partitions` enabled, a directory whose subdirectories are all
+    Hive-style partitions (`dt=2023-01-01/hour=00/...`) is treated as one
+    partitioned dataset. Its children are `partition_sample` data files
+    chosen from partitions spread evenly across the dataset (always
+    including the last partition), rather than every partition directory
+    and file. Sampled files keep their real paths, nested below the
+    dataset's directory. The `fsspec.partitions` analyzer records the
+    dataset's partition values and counts. It shares the crawl's browser
+    (see `create_browser`), and `children` reuses the listing the analyzer
+    made for a directory, so each dataset is listed once.
     """
 
     def __init__(
@@ -52,29 +147,381 @@ class FilesystemBrowser(AbstractBrowser):
         fs: AbstractFileSystem,
         base_path: str,
         root_: FilesystemRootPath,
+        prefetch: bool = False,
+        hive_partitions: bool = False,
+        partition_sample: int = 1,
+        listing_concurrency: int | None = None,
+        recursive: bool = True,
+        filters: list[str] = [],
     ):
+        assert (
+            listing_concurrency is None or listing_concurrency > 0
+        ), f"Expected listing_concurrency > 0, but got {listing_concurrency}"
+        assert (
+            partition_sample > 0
+        ), f"Expected partition_sample > 0, but got {partition_sample}"
         self.fs = fs
         self.base_path = base_path
         self.root_ = root_
+        self.prefetch = prefetch
+        self.hive_partitions = hive_partitions
+        self.partition_sample = partition_sample
+        self.listing_concurrency = listing_concurrency
+        self.recursive = recursive
+        # Each filter and its parents, like the crawler's exploded filters.
+        # The background listing only descends into directories that match.
+        self.filter_parents = [
+            "/" + "/".join(filter.strip("/").split("/")[: i + 1])
+            for filter in filters
+            for i in range(len(filter.strip("/").split("/")))
+        ]
+        # Listing details for children seen so far, keyed by relative path.
+        self.details: dict[str, dict[str, Any]] = {}
+        # Prefetched listing details for each directory's children, keyed by
+        # the directory's relative path.
+        self.tree: dict[str, list[dict[str, Any]]] | None = None
+        # Notified whenever the tree changes.
+        self.listed = threading.Condition()
+        self.listing_done = False
+        self.listing_error: Exception | None = None
+        # Directories the background listing will list, but hasn't yet.
+        self.listing_pending: set[str] = set()
+        # Set when the browser is closed.
+        self.listing_stopped = threading.Event()
+        # Listings `partition_files` made for directories that `children`
+        # hasn't listed yet, keyed by relative path. `children` takes them.
+        self.listings: dict[
+            str,
+            tuple[list[dict[str, Any]] | None, list[dict[str, Any]] | None],
+        ] = {}
 
     def children(self, path: str) -> list[FilesystemBrowserPath] | None:
-        absolute_path = self.base_path + path
-        paths = []
-        if not self.fs.exists(absolute_path):
+        key = self._relative_path(self.base_path + path)
+        children, files = self.listings.pop(key, None) or self._list(path)
+        if children is None:
             return None
-        if self.fs.isdir(absolute_path):
+        if files is not None:
+            children = self._sample_partitions(files)
+        paths = []
+        for child in children:
+            child_path = self._relative_path(child["name"])
+            path_type = DirectoryPath if child["type"] == "directory" else FilePath
+            paths.append(path_type(path=child_path))
+            self.details[f"/{child_path}"] = child
+        return paths
+
+    def partition_files(self, path: str) -> list[dict[str, Any]] | None:
+        """
+        List a directory for the `fsspec.partitions` analyzer. The listing is
+        kept for the next `children` call for the directory.
+
+        :param path: A directory's path.
+        :returns: Listing details for every file in a partitioned dataset, or
+            None if the directory isn't partitioned.
+        """
+
+        listing = self._list(path)
+        self.listings[self._relative_path(self.base_path + path)] = listing
+        return listing[1]
+
+    def _list(
+        self,
+        path: str,
+    ) -> tuple[list[dict[str, Any]] | None, list[dict[str, Any]] | None]:
+        """
+        :returns: Listing details for a path's children (see `_ls`), and for
+            every file under the path if it's a partitioned dataset.
+        """
+
+        if self.prefetch or self.listing_concurrency:
+            children = self._prefetched_ls(path)
+        else:
+            children = self._ls(path)
+        files = None
+        if children and self.hive_partitions and is_partitioned(children):
+            if self.prefetch or self.listing_concurrency:
+                files = self._prefetched_find(path)
+            if files is None:
+                found = self.fs.find(self.base_path + path, detail=True)
+                files = list(found.values())
+        return children, files
+
+    def _ls(self, path: str) -> list[dict[str, Any]] | None:
+        """
+        :returns: Listing details for a directory's children, an empty list
+            for a file, or None if the path doesn't exist.
+        """
+
+        absolute_path = self.base_path + path
+        try:
             # Force detail=True because gcsfs doesn't honor defaults.
             children = self.fs.ls(absolute_path, detail=True)
-            for child in children:
-                # Trim any duplicate // in the path.
-                child_path = str(PurePosixPath("/", child["name"]))
-                # Remove base_path prefix since paths are relative.
-                child_path = child_path.removeprefix(self.base_path)
-                # Make child path relative for *Path models.
-                child_path = child_path.lstrip("/")
-                path_type = DirectoryPath if child["type"] == "directory" else FilePath
-                paths.append(path_type(path=child_path))
-        return paths
+        except FileNotFoundError:
+            return None
+        except NotADirectoryError:
+            # Local filesystems can't list files.
+            return []
+        # Listing a file returns the file itself.
+        if (
+            len(children) == 1
+            and children[0]["type"] != "directory"
+            and self._relative_path(children[0]["name"])
+            == self._relative_path(absolute_path)
+        ):
+            return []
+        return children
+
+    def _sample_partitions(
+        self,
+        files: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """
+        :param files: Listing details for every file in a partitioned dataset.
+        :returns: Listing details for the dataset's sampled data files.
+        """
+
+        # Data files grouped by partition directory.
+        partitions: dict[str, list[dict[str, Any]]] = {}
+        for info in files:
+            if is_data_file(info["name"]):
+                partition = str(PurePosixPath(self._relative_path(info["name"])).parent)
+                partitions.setdefault(partition, []).append(info)
+        keys = sorted(partitions)
+        if len(keys) > self.partition_sample:
+            if self.partition_sample == 1:
+                keys = keys[-1:]
+            else:
+                step = (len(keys) - 1) / (self.partition_sample - 1)
+                keys = [keys[round(i * step)] for i in range(self.partition_sample)]
+        return [min(partitions[key], key=lambda info: info["name"]) for key in keys]
+
+    def _prefetched_find(self, path: str) -> list[dict[str, Any]] | None:
+        """
+        :returns: Listing details for every file under a prefetched directory,
+            or None if the directory wasn't prefetched.
+        """
+
+        key = self._relative_path(self.base_path + path)
+        if key not in self._wait_for(key):
+            return None
+        files = []
+        directories = [key]
+        while directories:
+            directory = directories.pop()
+            for info in self._wait_for(directory).get(directory, []):
+                if info["type"] == "directory":
+                    directories.append(self._relative_path(info["name"]))
+                else:
+                    files.append(info)
+        return files
+
+    def _prefetched_ls(self, path: str) -> list[dict[str, Any]] | None:
+        key = self._relative_path(self.base_path + path)
+        tree = self._wait_for(key)
+        if key in tree:
+            return tree[key]
+        if self._is_file(key):
+            return []
+        if self.listing_concurrency:
+            # The background listing won't list this path. It's outside
+            # the crawl's scope, or doesn't exist.
+            return self._ls(path)
+        return None
+
+    def _is_file(self, key: str) -> bool:
+        details = self.details.get(f"/{key}")
+        return details is not None and details["type"] != "directory"
+
+    def _wait_for(self, key: str) -> dict[str, list[dict[str, Any]]]:
+        """
+        Start listing the tree if it hasn't been listed yet, and wait until a
+        path's parent directory (and the path, if it's a directory) has been
+        listed. Doesn't wait for paths the background listing won't list.
+
+        :param key: A path relative to the base path, without a leading '/'.
+        :returns: The tree listed so far.
+        """
+
+        with self.listed:
+            if self.tree is None:
+                if self.listing_concurrency:
+                    self.tree = {}
+                    self.listing_pending.add("")
+                    threading.Thread(
+                        target=self._list_tree,
+                        name="recap-fs-listing",
+                        daemon=True,
+                    ).start()
+                else:
+                    self.tree = self._find()
+                    self.listing_done = True
+            while (
+                not self.listing_done
+                and key not in self.tree
+                and not self._is_file(key)
+                and self._is_pending(key)
+            ):
+                self.listed.wait()
+            if self.listing_error:
+                raise self.listing_error
+            return self.tree
+
+    def _is_pending(self, key: str) -> bool:
+        """
+        :returns: True if the background listing might still list a path:
+            the path, or its nearest listed-or-pending ancestor, is pending.
+        """
+
+        assert self.tree is not None
+        while True:
+            if key in self.listing_pending:
+                return True
+            if key in self.tree or not key:
+                return False
+            parent = str(PurePosixPath(key).parent)
+            key = "" if parent == "." else parent
+
+    def _in_scope(self, key: str) -> bool:
+        """
+        :returns: True if the crawl will list a directory.
+        """
+
+        if not self.recursive:
+            return False
+        return not self.filter_parents or any(
+            fnmatch.fnmatch(f"/{key}", filter) for filter in self.filter_parents
+        )
+
+    def close(self):
+        """
+        Stop the background listing, if it's running.
+        """
+
+        self.listing_stopped.set()
+
+    def _list_tree(self):
+        """
+        List the tree in the background, `listing_concurrency` directories at
+        a time.
+        """
+
+        try:
+            if self.fs.async_impl:
+                sync(self.fs.loop, self._alist_tree)
+            else:
+                asyncio.run(self._alist_tree())
+        except Exception as e:
+            self.listing_error = e
+        finally:
+            with self.listed:
+                self.listing_done = True
+                self.listing_pending.clear()
+                self.listed.notify_all()
+
+    async def _alist_tree(self):
+        semaphore = asyncio.Semaphore(self.listing_concurrency or 1)
+
+        async def list_directory(key: str, in_dataset: bool = False):
+            absolute_path = self.base_path + (f"/{key}" if key else "")
+            async with semaphore:
+                if self.listing_stopped.is_set():
+                    return
+                try:
+                    if self.fs.async_impl:
+                        children = await self.fs._ls(absolute_path, detail=True)
+                    else:
+                        children = await asyncio.to_thread(
+                            self.fs.ls,
+                            absolute_path,
+                            detail=True,
+                        )
+                except FileNotFoundError:
+                    # Deleted since its parent was listed.
+                    children = []
+            # Partitioned datasets are sampled from their whole subtree.
+            in_dataset = in_dataset or (
+                self.hive_partitions and is_partitioned(children)
+            )
+            directories = []
+            with self.listed:
+                assert self.tree is not None
+                for child in children:
+                    child_path = self._relative_path(child["name"])
+                    if child["type"] == "directory":
+                        if in_dataset or self._in_scope(child_path):
+                            directories.append(child_path)
+                    else:
+                        self.details[f"/{child_path}"] = child
+                self.listing_pending.update(directories)
+                self.listing_pending.discard(key)
+                self.tree[key] = children
+                self.listed.notify_all()
+            await asyncio.gather(
+                *(list_directory(directory, in_dataset) for directory in directories)
+            )
+
+        await list_directory("")
+
+    def _find(self) -> dict[str, list[dict[str, Any]]]:
+        """
+        List every file and directory under the base path.
+
+        :returns: Listing details for each directory's children, keyed by the
+            directory's relative path.
+        """
+
+        found = self.fs.find(self.base_path, detail=True, withdirs=True)
+        entries = {self._relative_path(name): info for name, info in found.items()}
+        # Object stores might not return directories that exist only as
+        # prefixes of other objects, so add any that are missing.
+        for child_path in list(entries):
+            for parent in PurePosixPath(child_path).parents:
+                if str(parent) in entries or str(parent) == ".":
+                    break
+                entries[str(parent)] = {
+                    "name": f"{self.base_path.rstrip('/')}/{parent}",
+                    "type": "directory",
+                    "size": 0,
+                }
+        tree: dict[str, list[dict[str, Any]]] = {"": []}
+        for child_path, info in entries.items():
+            if not child_path:
+                # The base path itself.
+                continue
+            if info["type"] == "directory":
+                tree.setdefault(child_path, [])
+            else:
+                self.details[f"/{child_path}"] = info
+            parent = str(PurePosixPath(child_path).parent)
+            tree.setdefault("" if parent == "." else parent, []).append(info)
+        return tree
+
+    def _relative_path(self, name: str) -> str:
+        # Trim any duplicate // in the path.
+        path = str(PurePosixPath("/", name))
+        # Remove base_path prefix since paths are relative.
+        path = path.removeprefix(self.base_path)
+        # Make child path relative for *Path models.
+        return path.lstrip("/")
+
+    def fingerprint(self, path: str) -> str | None:
+        details = self.details.get(path)
+        if details is None:
+            try:
+                details = self.fs.info(self.base_path + path)
+            except FileNotFoundError:
+                return None
+        if details.get("type") == "directory":
+            return None
+        fingerprint = [
+            f"{field}={details[field]}"
+            for field in FINGERPRINT_FIELDS
+            if details.get(field) is not None
+        ]
+        # Size alone isn't enough to tell if a file changed.
+        if fingerprint:
+            return ",".join([f"size={details.get('size')}"] + fingerprint)
+        return None
 
     def root(self) -> FilesystemRootPath:
         return self.root_
@@ -92,22 +539,104 @@ class FilesystemBrowser(AbstractBrowser):
         )
 
 
+# Open browsers, keyed by URL and options, and their reference counts.
+_browsers: dict[str, tuple[FilesystemBrowser, int]] = {}
+_browsers_lock = threading.Lock()
+
+
 @contextmanager
 def create_browser(
     url: str,
     name: str | None = None,
     storage_options: dict[str, Any] = {},
+    prefetch: bool = False,
+    hive_partitions: bool = False,
+    partition_sample: int = 1,
+    listing_concurrency: int | None = None,
+    recursive: bool = True,
+    filters: list[str] = [],
     **_,
 ) -> Generator[FilesystemBrowser, None, None]:
     """
+    Yields a FilesystemBrowser that's shared with every other open
+    `create_browser` context for the same URL and options. The crawl's
+    browser and the `fsspec.partitions` analyzer share one browser (and its
+    listings) this way. The browser is closed when the last context exits.
+
     :param url: The URL to use for the filesystem. If the URL contains a path,
         the FilesystemBrowser will treat all paths relative to the URL path.
     :param name: The name to use in the FilesystemRootPath. If unspecified, the
         URL host is used (or 'localhost' for 'file' schemes).
     :param storage_options: Storage options **kwargs to pass on to the fsspec
         filesystem constructor.
+    :param prefetch: List the whole tree with a single `find` call instead of
+        listing each directory separately.
+    :param hive_partitions: Treat directories of Hive-style partitions as a
+        single dataset.
+    :param partition_sample: Number of data files to list for each
+        partitioned dataset.
+    :param listing_concurrency: If set, list directories in the background
+        with up to this many listing calls in flight.
+    :param recursive: The crawler's `recursive` setting. Limits the
+        background listing.
+    :param filters: The crawler's path filters. Limits the background
+        listing.
     """
 
+    key = json.dumps(
+        [
+            url,
+            name,
+            storage_options,
+            prefetch,
+            hive_partitions,
+            partition_sample,
+            listing_concurrency,
+            recursive,
+            filters,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    with _browsers_lock:
+        browser, references = _browsers.get(key) or (
+            _create_browser(
+                url,
+                name,
+                storage_options,
+                prefetch,
+                hive_partitions,
+                partition_sample,
+                listing_concurrency,
+                recursive,
+                filters,
+            ),
+            0,
+        )
+        _browsers[key] = (browser, references + 1)
+    try:
+        yield browser
+    finally:
+        with _browsers_lock:
+            browser, references = _browsers[key]
+            if references > 1:
+                _browsers[key] = (browser, references - 1)
+            else:
+                del _browsers[key]
+                browser.close()
+
+
+def _create_browser(
+    url: str,
+    name: str | None,
+    storage_options: dict[str, Any],
+    prefetch: bool,
+    hive_partitions: bool,
+    partition_sample: int,
+    listing_concurrency: int | None,
+    recursive: bool,
+    filters: list[str],
+) -> FilesystemBrowser:
     default_root = FilesystemBrowser.default_root(url)
     fs, _, paths = get_fs_token_paths(url, storage_options=storage_options)
 
@@ -116,11 +645,17 @@ def create_browser(
     ), f"Expected to get exactly 1 path from URL, but got paths={paths}"
 
     # Don't use DirFileSystem because it doesn't work properly with gcsfs.
-    yield FilesystemBrowser(
+    return FilesystemBrowser(
         fs=fs,
         base_path=paths[0],
         root_=FilesystemRootPath(
             scheme=default_root.scheme,
             name=name or default_root.name_,
         ),
+        prefetch=prefetch,
+        hive_partitions=hive_partitions,
+        partition_sample=partition_sample,
+        listing_concurrency=listing_concurrency,
+        recursive=recursive,
+        filters=filters,
     )
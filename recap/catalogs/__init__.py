@@ -2,14 +2,18 @@
 Recap catalogs store metadata and expose read and search APIs. Recap ships with
 a database catalog and Recap catalog implementation. The database catalog is
 enabled by default (with SQLite).
+
+Catalog plugins may also expose a `create_async_catalog` async context manager
+that yields an AsyncAbstractCatalog. Plugins that don't are wrapped in a
+ThreadedAsyncCatalog by `create_async_catalog`.
 """
 
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Generator
 
 from recap.plugins import load_catalog_plugins
 
-from .abstract import AbstractCatalog
+from .abstract import AbstractCatalog, AsyncAbstractCatalog, ThreadedAsyncCatalog
 
 
 @contextmanager
@@ -24,3 +28,21 @@ def create_catalog(
     ), f"Unable to find catalog plugin module={catalog_plugin_module}"
     with catalog_plugin_module.create_catalog(**config) as catalog:
         yield catalog
+
+
+@asynccontextmanager
+async def create_async_catalog(
+    plugin: str = "db",
+    **config,
+) -> AsyncGenerator["AsyncAbstractCatalog", None]:
+    catalog_plugins = load_catalog_plugins()
+    catalog_plugin_module = catalog_plugins.get(plugin)
+    assert (
+        catalog_plugin_module
+    ), f"Unable to find catalog plugin module={catalog_plugin_module}"
+    if create_async := getattr(catalog_plugin_module, "create_async_catalog", None):
+        async with create_async(**config) as catalog:
+            yield catalog
+    else:
+        with catalog_plugin_module.create_catalog(**config) as catalog:
+            yield ThreadedAsyncCatalog(catalog)
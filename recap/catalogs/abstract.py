@@ -1,6 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Any
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import PurePosixPath
+from typing import Any, Generator
 
 
 class AbstractCatalog(ABC):
@@ -34,6 +37,34 @@ class AbstractCatalog(ABC):
 
         raise NotImplementedError
 
+    def write_many(
+        self,
+        entries: list[tuple[str, dict[str, Any]]],
+        patch: bool = True,
+    ):
+        """
+        Writes metadata to many directory locations. Catalogs should override
+        this method if they can write many entries more efficiently than
+        calling `write` for each entry.
+
+        :param entries: A list of (path, metadata) tuples to write.
+        """
+
+        for path, metadata in entries:
+            self.write(path, metadata, patch)
+
+    @contextmanager
+    def batch(self) -> Generator[None, None, None]:
+        """
+        Groups all catalog calls made in the context into a single batch.
+        Catalogs that support batching (transactions, for example) should
+        override this method so that all writes in the batch are persisted
+        together when the context exits. Batches are not shared across
+        threads.
+        """
+
+        yield
+
     @abstractmethod
     def rm(
         self,
@@ -62,6 +93,40 @@ class AbstractCatalog(ABC):
 
         raise NotImplementedError
 
+    def walk(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yields every descendant of a directory (children, grandchildren, and
+        so on). Catalogs should override this method if they can list a whole
+        subtree more efficiently than calling `ls` for each directory.
+
+        :returns: A generator of absolute descendant paths, in no particular
+            order. The path itself is not included.
+        """
+
+        stack = [PurePosixPath("/", path)]
+        while stack:
+            parent = stack.pop()
+            for name in self.ls(str(parent), time) or []:
+                child = parent / name
+                yield str(child)
+                stack.append(child)
+
+    def count(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> int:
+        """
+        :returns: The number of descendants of a directory. The path itself is
+            not counted.
+        """
+
+        return sum(1 for _ in self.walk(path, time))
+
     @abstractmethod
     def read(
         self,
@@ -90,3 +155,197 @@ class AbstractCatalog(ABC):
         """
 
         raise NotImplementedError
+
+    def compact(
+        self,
+        retention: timedelta | None = None,
+    ) -> int:
+        """
+        Removes redundant history from the catalog. Catalogs that keep
+        previous metadata versions should override this method. Compaction
+        must not change the results of reads for any time within the retention
+        window.
+
+        :param retention: How much history to keep. Versions that were
+            replaced before `now - retention` are removed. All history is kept
+            if retention is None.
+        :returns: The number of versions that were removed.
+        """
+
+        raise NotImplementedError
+
+
+class AsyncAbstractCatalog(ABC):
+    """
+    The async counterpart of AbstractCatalog. Recap's server uses async
+    catalogs so that requests don't hold a thread while they wait on the
+    catalog's I/O. Methods behave the same as their AbstractCatalog
+    equivalents.
+    """
+
+    @abstractmethod
+    async def touch(
+        self,
+        path: str,
+    ):
+        """
+        Creates an empty directory.
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def write(
+        self,
+        path: str,
+        metadata: dict[str, Any],
+        patch: bool = True,
+    ):
+        """
+        Writes metadata to a directory location.
+        """
+
+        raise NotImplementedError
+
+    async def write_many(
+        self,
+        entries: list[tuple[str, dict[str, Any]]],
+        patch: bool = True,
+    ):
+        """
+        Writes metadata to many directory locations.
+
+        :param entries: A list of (path, metadata) tuples to write.
+        """
+
+        for path, metadata in entries:
+            await self.write(path, metadata, patch)
+
+    @abstractmethod
+    async def rm(
+        self,
+        path: str,
+    ):
+        """
+        Remove a directory, its metadata, and all of its children.
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ls(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> list[str] | None:
+        """
+        :returns: A list of child names. Does not include absolute path.
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def read(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        :returns: Metadata dictionary of the format {"metadata_type": Any}.
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        time: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        :param query: A query string to match against metadata in a catalog.
+        """
+
+        raise NotImplementedError
+
+    async def compact(
+        self,
+        retention: timedelta | None = None,
+    ) -> int:
+        """
+        Removes redundant history from the catalog.
+
+        :param retention: How much history to keep. All history is kept if
+            retention is None.
+        :returns: The number of versions that were removed.
+        """
+
+        raise NotImplementedError
+
+
+class ThreadedAsyncCatalog(AsyncAbstractCatalog):
+    """
+    Adapts an AbstractCatalog to AsyncAbstractCatalog by running each call in
+    a worker thread. This is the fallback for catalog plugins (or drivers)
+    that don't have a native async implementation.
+    """
+
+    def __init__(
+        self,
+        catalog: AbstractCatalog,
+    ):
+        self.catalog = catalog
+
+    async def touch(
+        self,
+        path: str,
+    ):
+        await asyncio.to_thread(self.catalog.touch, path)
+
+    async def write(
+        self,
+        path: str,
+        metadata: dict[str, Any],
+        patch: bool = True,
+    ):
+        await asyncio.to_thread(self.catalog.write, path, metadata, patch)
+
+    async def write_many(
+        self,
+        entries: list[tuple[str, dict[str, Any]]],
+        patch: bool = True,
+    ):
+        await asyncio.to_thread(self.catalog.write_many, entries, patch)
+
+    async def rm(
+        self,
+        path: str,
+    ):
+        await asyncio.to_thread(self.catalog.rm, path)
+
+    async def ls(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> list[str] | None:
+        return await asyncio.to_thread(self.catalog.ls, path, time)
+
+    async def read(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> dict[str, Any] | None:
+        return await asyncio.to_thread(self.catalog.read, path, time)
+
+    async def search(
+        self,
+        query: str,
+        time: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(self.catalog.search, query, time)
+
+    async def compact(
+        self,
+        retention: timedelta | None = None,
+    ) -> int:
+        return await asyncio.to_thread(self.catalog.compact, retention)
@@ -1,26 +1,62 @@
-from contextlib import contextmanager
-from datetime import datetime
+import hashlib
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path, PurePosixPath
-from typing import Any, Generator
+from typing import Any, AsyncGenerator, Generator
 from urllib.parse import urlparse
 
-from sqlalchemy import Column, DateTime, Index, create_engine, select, update
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    case,
+    create_engine,
+    delete,
+    insert,
+    inspect,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.engine import Engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from sqlalchemy.schema import Sequence
 from sqlalchemy.sql import func, text
 from sqlalchemy.types import JSON, BigInteger, Integer, String
+from sqlalchemy.util import greenlet_spawn
 
 from recap.config import RECAP_HOME, settings
 
-from .abstract import AbstractCatalog
+from .abstract import AbstractCatalog, AsyncAbstractCatalog, ThreadedAsyncCatalog
+
+log = logging.getLogger(__name__)
 
 DEFAULT_URL = f"sqlite:///{settings('root_path', RECAP_HOME)}/catalog/recap.db"
+# Async drivers to use for URLs that don't specify a driver.
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
 Base = declarative_base()
 
 
+def content_hash(metadata: Any) -> str:
+    """
+    :returns: A SHA-256 hex digest of the metadata's canonical JSON form (keys
+        sorted, no whitespace). Equal metadata always has an equal hash.
+    """
+
+    canonical_json = json.dumps(metadata, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical_json.encode()).hexdigest()
+
+
 class CatalogEntry(Base):
     __tablename__ = "catalog"
 
@@ -39,6 +75,9 @@ class CatalogEntry(Base):
         JSON().with_variant(JSONB, "postgresql"),
         nullable=False,
     )
+    # Nullable because catalogs created before this column existed have
+    # versions without a hash.
+    content_hash = Column(String(64))
     created_at = Column(
         DateTime,
         nullable=False,
@@ -59,6 +98,29 @@ class CatalogEntry(Base):
         return self.deleted_at is not None
 
 
+class CurrentCatalogEntry(Base):
+    """
+    The latest version of every path in the `catalog` table that isn't
+    deleted. This table is updated in the same transaction as `catalog`.
+    """
+
+    __tablename__ = "catalog_current"
+
+    parent = Column(String(65535), primary_key=True)
+    name = Column(String(4096), primary_key=True)
+    metadata_ = Column(
+        "metadata",
+        JSON().with_variant(JSONB, "postgresql"),
+        nullable=False,
+    )
+    content_hash = Column(String(64))
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
 class DatabaseCatalog(AbstractCatalog):
     """
     The database catalog uses [SQLAlchemy](https://www.sqlalchemy.org/) to
@@ -99,13 +161,46 @@ class DatabaseCatalog(AbstractCatalog):
     all the various metadata types and objects.
 
     Previous metadata versions are kept in `catalog` as well. A `deleted_at`
-    field is used to tombstone deleted directories. Directories that were
+    field is used to tombstone deleted directories: `rm` appends a tombstone
+    version for every path in the deleted subtree. Directories that were
     updated, not deleted, will not have a `deleted_at` set; there will just be
     a more recent row (as sorted by `id`).
 
     Reads return the most recent metadata that was written to the path. If the
     most recent record has a `deleted_at` tombstone, a None is returned.
 
+    The latest version of every path that isn't deleted is also kept in a
+    `catalog_current` table, which is keyed by parent and name. `ls`, `read`,
+    and `search` calls without a `time` read from `catalog_current`, so their
+    cost doesn't grow with the number of versions in `catalog`. Calls with a
+    `time` read from the `catalog` table's history.
+
+    Subtree operations (`rm`, `walk`, and `count`) match descendants with a
+    range predicate on `parent`, so they use the (parent, name) indexes rather
+    than scanning the table. `rm` only touches `catalog_current` rows for live
+    paths and appends one tombstone per path, so its cost doesn't depend on
+    how much history the subtree has.
+
+    Every version also stores a `content_hash`, a SHA-256 digest of its
+    metadata's canonical JSON. Writes that wouldn't change a path's metadata
+    (the hash matches the current version's) are skipped, so re-crawling
+    unchanged infrastructure doesn't add rows. As a result, every version in
+    `catalog` is a real change; "what changed" queries don't need to compare
+    JSON blobs.
+
+    Every call runs in its own transaction unless it's made inside a
+    `batch()` context, in which case all calls on that thread share one
+    transaction. `write_many` writes many paths in one transaction, and
+    fetches existing metadata for all of them in bulk when patching.
+
+    Since every write appends a new version, `catalog` grows with every crawl.
+    `compact` (and `recap catalog compact`) removes versions that are
+    identical to the version before them, and versions that were replaced
+    before a retention window. Reads for any time inside the retention window
+    return the same results before and after compaction. Compaction deletes
+    rows in small transactions, so it's safe to run while Recap is serving
+    requests.
+
     Search strings are simply passed along to the WHERE clause in a SELECT
     statement. This does leave room for SQL injection attacks; not thrilled
     about that.
@@ -116,58 +211,201 @@ class DatabaseCatalog(AbstractCatalog):
         engine: Engine,
     ):
         self.engine = engine
+        has_current = inspect(engine).has_table(CurrentCatalogEntry.__tablename__)
         Base.metadata.create_all(engine)
+        self._add_missing_columns()
+        self._add_prefix_indexes()
         self.Session = sessionmaker(engine)
+        # Per-thread session and touched paths for `batch()`.
+        self.local = threading.local()
+        if not has_current:
+            self._backfill_current()
+
+    def _add_missing_columns(self):
+        """
+        Add nullable columns that are missing from existing tables.
+        `create_all` only creates missing tables, so catalogs created by older
+        versions of Recap need this on startup.
+        """
+
+        inspector = inspect(self.engine)
+        preparer = self.engine.dialect.identifier_preparer
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                existing = {c["name"] for c in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing and column.nullable:
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        conn.execute(
+                            text(
+                                f"ALTER TABLE {preparer.format_table(table)} "
+                                f"ADD COLUMN {preparer.format_column(column)} "
+                                f"{column_type}"
+                            )
+                        )
+
+    def _add_prefix_indexes(self):
+        """
+        PostgreSQL compares strings using the database's collation, which
+        doesn't sort '/' right before '0' for most locales. Subtree queries
+        compare `parent` with the "C" collation instead, so they need an index
+        with that collation.
+        """
+
+        if self.engine.dialect.name != "postgresql":
+            return
+        with self.engine.begin() as conn:
+            for table in [CatalogEntry.__table__, CurrentCatalogEntry.__table__]:
+                conn.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {table.name}_parent_c_idx "
+                        f'ON {table.name} (parent COLLATE "C", name)'
+                    )
+                )
+
+    def _backfill_current(self):
+        """
+        Populate `catalog_current` from `catalog`'s history. Catalogs created
+        before `catalog_current` existed need this on startup.
+        """
+
+        subquery = select(
+            CatalogEntry.parent,
+            CatalogEntry.name,
+            CatalogEntry.metadata_,
+            CatalogEntry.content_hash,
+            CatalogEntry.created_at,
+            CatalogEntry.deleted_at,
+            func.rank()
+            .over(
+                order_by=CatalogEntry.id.desc(),
+                partition_by=(
+                    CatalogEntry.parent,
+                    CatalogEntry.name,
+                ),
+            )
+            .label("rnk"),
+        ).subquery()
+        with self.Session() as session, session.begin():
+            session.execute(
+                insert(CurrentCatalogEntry).from_select(
+                    ["parent", "name", "metadata", "content_hash", "created_at"],
+                    select(
+                        subquery.c.parent,
+                        subquery.c.name,
+                        subquery.c.metadata_,
+                        subquery.c.content_hash,
+                        subquery.c.created_at,
+                    ).where(
+                        subquery.c.rnk == 1,
+                        subquery.c.deleted_at == None,
+                    ),
+                )
+            )
 
     def _clean_path(self, path: str) -> tuple[str, PurePosixPath]:
         path_posix = PurePosixPath("/", path)
         path_str = str(path_posix)
         return (path_str, path_posix)
 
+    @contextmanager
+    def batch(self) -> Generator[None, None, None]:
+        """
+        Runs all catalog calls made in the context (on the current thread) in
+        a single transaction. The transaction is committed when the context
+        exits, and rolled back if an exception is raised. Paths touched in the
+        batch are remembered, so their ancestors are only checked once.
+        """
+
+        if getattr(self.local, "session", None):
+            # Nested batches join the outer batch.
+            yield
+            return
+
+        with self.Session() as session, session.begin():
+            self.local.session = session
+            self.local.touched = set()
+            try:
+                yield
+            finally:
+                self.local.session = None
+                self.local.touched = None
+
+    @contextmanager
+    def _session(self) -> Generator[Session, None, None]:
+        """
+        Yields the current thread's batch session if a batch is active.
+        Otherwise, yields a new session that is committed when the context
+        exits.
+        """
+
+        if session := getattr(self.local, "session", None):
+            yield session
+        else:
+            with self.Session() as session, session.begin():
+                yield session
+
     def touch(
         self,
         path: str,
     ):
         _, path_posix = self._clean_path(path)
+        with self._session() as session:
+            self._touch(session, path_posix)
+
+    def _touch(
+        self,
+        session: Session,
+        path_posix: PurePosixPath,
+    ):
+        # Paths known to exist in the current batch (if any).
+        touched = getattr(self.local, "touched", None)
+        if touched is None:
+            touched = set()
         path_stack = list(path_posix.parts)
         cwd = "/"
 
-        with self.Session() as session, session.begin():
-            # Touch all parents to make sure they exist.
-            while len(path_stack):
-                cwd = PurePosixPath(cwd, *path_stack)
-
-                # PurePosixPath('/').parts returns ('/',). We don't want to touch
-                # the root because it doesn't fit the parent/name model that we
-                # have.
-                if len(cwd.parts) > 1:
-                    maybe_row = session.scalar(
-                        select(
-                            CatalogEntry,
-                        )
-                        .filter(
-                            CatalogEntry.parent == str(cwd.parent),
-                            CatalogEntry.name == str(cwd.name),
-                        )
-                        .order_by(
-                            CatalogEntry.id.desc(),
-                        )
+        # Touch all parents to make sure they exist.
+        while len(path_stack):
+            cwd = PurePosixPath(cwd, *path_stack)
+
+            if str(cwd) in touched:
+                # Path was already touched in this batch, so it and all of its
+                # parents exist.
+                break
+
+            # PurePosixPath('/').parts returns ('/',). We don't want to touch
+            # the root because it doesn't fit the parent/name model that we
+            # have.
+            if len(cwd.parts) > 1:
+                exists = session.scalar(
+                    select(
+                        CurrentCatalogEntry.name,
+                    ).filter(
+                        CurrentCatalogEntry.parent == str(cwd.parent),
+                        CurrentCatalogEntry.name == str(cwd.name),
                     )
+                )
 
-                    if not maybe_row or maybe_row.is_deleted():
-                        session.add(
-                            CatalogEntry(
-                                parent=str(cwd.parent),
-                                name=cwd.name,
-                                metadata_={},
-                            )
+                if not exists:
+                    empty_hash = content_hash({})
+                    session.add(
+                        CatalogEntry(
+                            parent=str(cwd.parent),
+                            name=cwd.name,
+                            metadata_={},
+                            content_hash=empty_hash,
                         )
-                    else:
-                        # Path exists and isn't deleted. We can assume all
-                        # parents also exist, so no need to check.
-                        break
+                    )
+                    self._set_current(session, [(cwd, {}, empty_hash)])
+                    touched.add(str(cwd))
+                else:
+                    # Path exists and isn't deleted. We can assume all
+                    # parents also exist, so no need to check.
+                    touched.add(str(cwd))
+                    break
 
-                path_stack.pop()
+            path_stack.pop()
 
     def write(
         self,
@@ -175,18 +413,51 @@ class DatabaseCatalog(AbstractCatalog):
         metadata: dict[str, Any],
         patch: bool = True,
     ):
-        path_str, path_posix = self._clean_path(path)
-        self.touch(path_str)
-        with self.Session() as session, session.begin():
-            if patch:
-                existing_doc = self._get_metadata(session, path_posix) or {}
-                metadata = existing_doc | metadata
-            session.add(
-                CatalogEntry(
-                    parent=str(path_posix.parent),
-                    name=path_posix.name,
-                    metadata_=metadata,
+        self.write_many([(path, metadata)], patch)
+
+    def write_many(
+        self,
+        entries: list[tuple[str, dict[str, Any]]],
+        patch: bool = True,
+    ):
+        """
+        Writes all entries in a single transaction (or in the current batch,
+        if one is active). Existing metadata for all paths is fetched with one
+        query per 500 entries. Entries that wouldn't change a path's metadata
+        are skipped.
+        """
+
+        paths = [self._clean_path(path)[1] for path, _ in entries]
+        with self._session() as session:
+            for path_posix in paths:
+                self._touch(session, path_posix)
+            latest = self._get_latest_metadata(session, paths)
+            # Later entries for the same path patch earlier ones.
+            changed: dict[PurePosixPath, tuple[Any, str]] = {}
+            for path_posix, (_, metadata) in zip(paths, entries):
+                latest_metadata, latest_hash = changed.get(path_posix) or latest.get(
+                    path_posix, ({}, None)
                 )
+                if patch:
+                    metadata = latest_metadata | metadata
+                metadata_hash = content_hash(metadata)
+                if metadata_hash != latest_hash:
+                    changed[path_posix] = (metadata, metadata_hash)
+            for path_posix, (metadata, metadata_hash) in changed.items():
+                session.add(
+                    CatalogEntry(
+                        parent=str(path_posix.parent),
+                        name=path_posix.name,
+                        metadata_=metadata,
+                        content_hash=metadata_hash,
+                    )
+                )
+            self._set_current(
+                session,
+                [
+                    (path_posix, metadata, metadata_hash)
+                    for path_posix, (metadata, metadata_hash) in changed.items()
+                ],
             )
 
     def rm(
@@ -194,28 +465,259 @@ class DatabaseCatalog(AbstractCatalog):
         path: str,
     ):
         _, path_posix = self._clean_path(path)
-        with self.Session() as session:
+        with self._session() as session:
+            # Append a tombstone for every live path in the subtree rather
+            # than updating every historical version.
             session.execute(
-                update(CatalogEntry)
-                .filter(
-                    # parent = /foo/bar/baz
-                    (CatalogEntry.parent == str(path_posix))
-                    # or parent = /foo/bar/baz/%
-                    | (CatalogEntry.parent.like(f"{path_posix}/%"))
-                    # or parent = /foo/bar and name = baz
-                    | (
-                        (CatalogEntry.parent == str(path_posix.parent))
-                        & (CatalogEntry.name == path_posix.name)
-                    )
+                insert(CatalogEntry).from_select(
+                    ["parent", "name", "metadata", "content_hash", "deleted_at"],
+                    select(
+                        CurrentCatalogEntry.parent,
+                        CurrentCatalogEntry.name,
+                        CurrentCatalogEntry.metadata_,
+                        CurrentCatalogEntry.content_hash,
+                        func.now(),
+                    ).where(self._subtree_filter(CurrentCatalogEntry, path_posix)),
                 )
-                .values(deleted_at=func.now())
+            )
+            session.execute(
+                delete(CurrentCatalogEntry)
+                .filter(self._subtree_filter(CurrentCatalogEntry, path_posix))
                 .execution_options(synchronize_session=False)
             )
 
-            # Have to commit since synchronize_session=False. Have to set
-            # synchronize_session=False because BinaryExpression isn't
-            # supported in the filter otherwise.
-            session.commit()
+            # Entries that were loaded earlier in a batch are now stale.
+            session.expire_all()
+
+            if touched := getattr(self.local, "touched", None):
+                touched -= {
+                    touched_path
+                    for touched_path in touched
+                    if touched_path == str(path_posix)
+                    or touched_path.startswith(f"{path_posix}/")
+                }
+
+    def walk(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> Generator[str, None, None]:
+        """
+        Lists the whole subtree with one query when time is None.
+
+        :returns: A generator of absolute descendant paths, sorted by parent
+            and then name.
+        """
+
+        if time:
+            yield from super().walk(path, time)
+            return
+        _, path_posix = self._clean_path(path)
+        with self._session() as session:
+            rows = session.execute(
+                select(
+                    CurrentCatalogEntry.parent,
+                    CurrentCatalogEntry.name,
+                )
+                .where(self._descendant_filter(CurrentCatalogEntry, path_posix))
+                .order_by(
+                    CurrentCatalogEntry.parent,
+                    CurrentCatalogEntry.name,
+                )
+            ).fetchall()
+        for parent, name in rows:
+            yield str(PurePosixPath(parent, name))
+
+    def count(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> int:
+        if time:
+            return super().count(path, time)
+        _, path_posix = self._clean_path(path)
+        with self._session() as session:
+            return session.scalar(
+                select(func.count()).where(
+                    self._descendant_filter(CurrentCatalogEntry, path_posix)
+                )
+            )
+
+    def compact(
+        self,
+        retention: timedelta | None = None,
+        vacuum: bool = True,
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        :param retention: How much history to keep. All history is kept if
+            retention is None.
+        :param vacuum: Reclaim space after compaction. Only SQLite and
+            PostgreSQL are vacuumed.
+        :param chunk_size: Maximum number of versions to delete per
+            transaction.
+        :returns: The number of versions that were removed.
+        """
+
+        with self.Session() as session:
+            cutoff = (
+                session.scalar(select(func.now())) - retention if retention else None
+            )
+            redundant_ids = self._redundant_ids(session, cutoff)
+
+        for i in range(0, len(redundant_ids), chunk_size):
+            with self.Session() as session, session.begin():
+                session.execute(
+                    delete(CatalogEntry)
+                    .where(CatalogEntry.id.in_(redundant_ids[i : i + chunk_size]))
+                    .execution_options(synchronize_session=False)
+                )
+
+        if vacuum:
+            self._vacuum()
+
+        return len(redundant_ids)
+
+    def _redundant_ids(
+        self,
+        session: Session,
+        cutoff: datetime | None = None,
+    ) -> list[int]:
+        """
+        Find versions in `catalog` that can be removed without changing reads
+        made after `cutoff`:
+
+        * Versions created before the cutoff, except the last one for each
+          path (which is still visible at the cutoff). The last one is also
+          removed if it's deleted, since missing and deleted paths read the
+          same.
+        * Versions that have the same metadata and deleted state as the
+          (kept) version before them.
+
+        :param cutoff: Only keep history from this time onward. If None, all
+            history is kept.
+        :returns: Version IDs to remove.
+        """
+
+        redundant_ids = []
+        rows = session.execute(
+            select(
+                CatalogEntry.id,
+                CatalogEntry.parent,
+                CatalogEntry.name,
+                CatalogEntry.content_hash,
+                # Only versions written before content hashes existed need
+                # their metadata, to hash it.
+                case(
+                    (CatalogEntry.content_hash.is_(None), CatalogEntry.metadata_),
+                ).label("unhashed_metadata"),
+                CatalogEntry.created_at,
+                CatalogEntry.deleted_at,
+            )
+            .order_by(
+                CatalogEntry.parent,
+                CatalogEntry.name,
+                CatalogEntry.id,
+            )
+            .execution_options(yield_per=1000)
+        )
+
+        def versions() -> Generator[list[Any], None, None]:
+            """
+            Group rows into lists of versions for each path.
+            """
+
+            path_versions = []
+            for row in rows:
+                if path_versions and (row.parent, row.name) != (
+                    path_versions[0].parent,
+                    path_versions[0].name,
+                ):
+                    yield path_versions
+                    path_versions = []
+                path_versions.append(row)
+            if path_versions:
+                yield path_versions
+
+        for path_versions in versions():
+            if cutoff:
+                expired = [v for v in path_versions if v.created_at < cutoff]
+                # The last expired version is still visible at the cutoff.
+                if expired and expired[-1].deleted_at is None:
+                    expired.pop()
+                redundant_ids.extend(v.id for v in expired)
+                expired_ids = {v.id for v in expired}
+                path_versions = [v for v in path_versions if v.id not in expired_ids]
+            previous = None
+            for version in path_versions:
+                version_key = (
+                    version.content_hash or content_hash(version.unhashed_metadata),
+                    version.deleted_at is None,
+                )
+                if version_key == previous:
+                    redundant_ids.append(version.id)
+                else:
+                    previous = version_key
+
+        return redundant_ids
+
+    def _vacuum(self):
+        """
+        Reclaim space from deleted rows. VACUUM can't run in a transaction, so
+        use an autocommit connection.
+        """
+
+        match self.engine.dialect.name:
+            case "sqlite":
+                vacuum = "VACUUM"
+            case "postgresql":
+                vacuum = f"VACUUM ANALYZE {CatalogEntry.__tablename__}"
+            case _:
+                return
+        with self.engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text(vacuum))
+
+    def _subtree_filter(
+        self,
+        entry_class: type[CatalogEntry] | type[CurrentCatalogEntry],
+        path_posix: PurePosixPath,
+    ):
+        """
+        :returns: A filter that matches a path and all of its descendants.
+        """
+
+        return (
+            # parent = /foo/bar and name = baz
+            (entry_class.parent == str(path_posix.parent))
+            & (entry_class.name == path_posix.name)
+        ) | self._descendant_filter(entry_class, path_posix)
+
+    def _descendant_filter(
+        self,
+        entry_class: type[CatalogEntry] | type[CurrentCatalogEntry],
+        path_posix: PurePosixPath,
+    ):
+        """
+        Descendants are matched with a range on `parent` instead of LIKE, so
+        the (parent, name) index is used on every dialect. '0' is the
+        character after '/', so every parent that starts with '/foo/' sorts
+        between '/foo/' and '/foo0'.
+
+        :returns: A filter that matches all descendants of a path.
+        """
+
+        if path_posix == PurePosixPath("/"):
+            return entry_class.parent.is_not(None)
+        parent = entry_class.parent
+        if self.engine.dialect.name == "postgresql":
+            # Compare bytewise, like the catalog_*_parent_c_idx indexes.
+            parent = parent.collate("C")
+        return (
+            # parent = /foo/bar/baz
+            (entry_class.parent == str(path_posix))
+            # or parent starts with /foo/bar/baz/
+            | ((parent >= f"{path_posix}/") & (parent < f"{path_posix}0"))
+        )
 
     def ls(
         self,
@@ -223,9 +725,16 @@ class DatabaseCatalog(AbstractCatalog):
         time: datetime | None = None,
     ) -> list[str] | None:
         path_str, _ = self._clean_path(path)
-        with self.Session() as session:
+        with self._session() as session:
+            if not time:
+                names = session.scalars(
+                    select(CurrentCatalogEntry.name).filter(
+                        CurrentCatalogEntry.parent == path_str,
+                    )
+                )
+                return list(names) or None
             subquery = (
-                session.query(
+                select(
                     CatalogEntry.name,
                     CatalogEntry.deleted_at,
                     func.rank()
@@ -238,18 +747,19 @@ class DatabaseCatalog(AbstractCatalog):
                     )
                     .label("rnk"),
                 )
-                .filter(
+                .where(
                     CatalogEntry.parent == path_str,
-                    CatalogEntry.created_at <= (time or func.now()),
+                    CatalogEntry.created_at <= time,
                 )
                 .subquery()
             )
-            query = session.query(subquery).filter(
-                subquery.c.rnk == 1,
-                subquery.c.deleted_at == None,
+            names = session.scalars(
+                select(subquery.c.name).where(
+                    subquery.c.rnk == 1,
+                    subquery.c.deleted_at == None,
+                )
             )
-            rows = session.execute(query).fetchall()
-            return [row[0] for row in rows] or None
+            return list(names) or None
 
     def read(
         self,
@@ -257,7 +767,7 @@ class DatabaseCatalog(AbstractCatalog):
         time: datetime | None = None,
     ) -> dict[str, Any] | None:
         _, path_posix = self._clean_path(path)
-        with self.Session() as session:
+        with self._session() as session:
             return self._get_metadata(session, path_posix, time)
 
     def search(
@@ -265,9 +775,17 @@ class DatabaseCatalog(AbstractCatalog):
         query: str,
         time: datetime | None = None,
     ) -> list[dict[str, Any]]:
-        with self.Session() as session:
+        with self._session() as session:
+            if not time:
+                rows = session.execute(
+                    select(CurrentCatalogEntry.metadata_).filter(
+                        # TODO Yikes. Pretty sure this is a SQL injection vulnerability.
+                        text(query),
+                    )
+                ).fetchall()
+                return [row[0] for row in rows]
             subquery = (
-                session.query(
+                select(
                     CatalogEntry.metadata_,
                     CatalogEntry.deleted_at,
                     func.rank()
@@ -280,20 +798,20 @@ class DatabaseCatalog(AbstractCatalog):
                     )
                     .label("rnk"),
                 )
-                .filter(
-                    CatalogEntry.created_at <= (time or func.now()),
+                .where(
+                    CatalogEntry.created_at <= time,
                     # TODO Yikes. Pretty sure this is a SQL injection vulnerability.
                     text(query),
                 )
                 .subquery()
             )
 
-            query = session.query(subquery).filter(
-                subquery.c.rnk == 1,
-                subquery.c.deleted_at == None,
-            )  # pyright: ignore [reportGeneralTypeIssues]
-
-            rows = session.execute(query).fetchall()
+            rows = session.execute(
+                select(subquery.c.metadata_).where(
+                    subquery.c.rnk == 1,
+                    subquery.c.deleted_at == None,
+                )
+            ).fetchall()
 
             return [row[0] for row in rows]
 
@@ -303,6 +821,13 @@ class DatabaseCatalog(AbstractCatalog):
         path_posix: PurePosixPath,
         time: datetime | None = None,
     ) -> Any | None:
+        if not time:
+            return session.scalar(
+                select(CurrentCatalogEntry.metadata_).where(
+                    CurrentCatalogEntry.parent == str(path_posix.parent),
+                    CurrentCatalogEntry.name == path_posix.name,
+                )
+            )
         maybe_entry = session.scalar(
             select(
                 CatalogEntry,
@@ -310,7 +835,7 @@ class DatabaseCatalog(AbstractCatalog):
             .where(
                 CatalogEntry.parent == str(path_posix.parent),
                 CatalogEntry.name == path_posix.name,
-                CatalogEntry.created_at <= (time or func.now()),
+                CatalogEntry.created_at <= time,
             )
             .order_by(
                 CatalogEntry.id.desc(),
@@ -321,6 +846,188 @@ class DatabaseCatalog(AbstractCatalog):
         else:
             return None
 
+    def _get_latest_metadata(
+        self,
+        session: Session,
+        paths: list[PurePosixPath],
+        chunk_size: int = 500,
+    ) -> dict[PurePosixPath, tuple[Any, str]]:
+        """
+        Fetch the latest metadata and content hash for many paths.
+
+        :param chunk_size: Maximum number of paths to fetch per query.
+        :returns: A dictionary of path to (metadata, content hash). Paths that
+            don't exist or are deleted are not included.
+        """
+
+        results = {}
+        for i in range(0, len(paths), chunk_size):
+            chunk = paths[i : i + chunk_size]
+            rows = session.execute(
+                select(
+                    CurrentCatalogEntry.parent,
+                    CurrentCatalogEntry.name,
+                    CurrentCatalogEntry.metadata_,
+                    CurrentCatalogEntry.content_hash,
+                ).where(
+                    tuple_(
+                        CurrentCatalogEntry.parent,
+                        CurrentCatalogEntry.name,
+                    ).in_({(str(p.parent), p.name) for p in chunk})
+                )
+            )
+            for parent, name, metadata, metadata_hash in rows:
+                results[PurePosixPath(parent, name)] = (
+                    metadata,
+                    metadata_hash or content_hash(metadata),
+                )
+        return results
+
+    def _set_current(
+        self,
+        session: Session,
+        entries: list[tuple[PurePosixPath, Any, str]],
+    ):
+        """
+        Replace the `catalog_current` rows for many paths. PostgreSQL and
+        SQLite use an upsert. Other dialects delete and re-insert the rows.
+
+        :param entries: A list of (path, metadata, content hash) tuples.
+        """
+
+        if not entries:
+            return
+        rows = [
+            {
+                "parent": str(path_posix.parent),
+                "name": path_posix.name,
+                "metadata": metadata,
+                "content_hash": metadata_hash,
+            }
+            for path_posix, metadata, metadata_hash in entries
+        ]
+        table = CurrentCatalogEntry.__table__
+        match self.engine.dialect.name:
+            case "postgresql":
+                upsert = postgresql.insert(table)
+            case "sqlite":
+                upsert = sqlite.insert(table)
+            case _:
+                upsert = None
+
+        if upsert is not None:
+            upsert = upsert.on_conflict_do_update(
+                index_elements=[table.c.parent, table.c.name],
+                set_={
+                    "metadata": upsert.excluded.metadata,
+                    "content_hash": upsert.excluded.content_hash,
+                    "created_at": func.now(),
+                },
+            )
+            session.execute(upsert, rows)
+        else:
+            session.execute(
+                delete(table).where(
+                    tuple_(table.c.parent, table.c.name).in_(
+                        {(row["parent"], row["name"]) for row in rows}
+                    )
+                )
+            )
+            session.execute(insert(table), rows)
+
+
+class AsyncDatabaseCatalog(AsyncAbstractCatalog):
+    """
+    An async DatabaseCatalog that uses a SQLAlchemy
+    [async engine](https://docs.sqlalchemy.org/en/14/orm/extensions/asyncio.html).
+    Calls run DatabaseCatalog's queries on the async engine's sync facade in a
+    greenlet (the same way SQLAlchemy's `run_sync` works), so the event loop
+    is never blocked while waiting on the database.
+
+    Use `AsyncDatabaseCatalog.create` rather than the constructor, since
+    creating a DatabaseCatalog runs queries.
+    """
+
+    def __init__(
+        self,
+        catalog: DatabaseCatalog,
+    ):
+        """
+        :param catalog: A DatabaseCatalog that uses an async engine's
+            `sync_engine`.
+        """
+
+        self.catalog = catalog
+
+    @staticmethod
+    async def create(engine: AsyncEngine) -> "AsyncDatabaseCatalog":
+        catalog = await greenlet_spawn(DatabaseCatalog, engine.sync_engine)
+        return AsyncDatabaseCatalog(catalog)
+
+    async def touch(
+        self,
+        path: str,
+    ):
+        await greenlet_spawn(self.catalog.touch, path)
+
+    async def write(
+        self,
+        path: str,
+        metadata: dict[str, Any],
+        patch: bool = True,
+    ):
+        await greenlet_spawn(self.catalog.write, path, metadata, patch)
+
+    async def write_many(
+        self,
+        entries: list[tuple[str, dict[str, Any]]],
+        patch: bool = True,
+    ):
+        await greenlet_spawn(self.catalog.write_many, entries, patch)
+
+    async def rm(
+        self,
+        path: str,
+    ):
+        await greenlet_spawn(self.catalog.rm, path)
+
+    async def ls(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> list[str] | None:
+        return await greenlet_spawn(self.catalog.ls, path, time)
+
+    async def read(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> dict[str, Any] | None:
+        return await greenlet_spawn(self.catalog.read, path, time)
+
+    async def search(
+        self,
+        query: str,
+        time: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        return await greenlet_spawn(self.catalog.search, query, time)
+
+    async def compact(
+        self,
+        retention: timedelta | None = None,
+    ) -> int:
+        return await greenlet_spawn(self.catalog.compact, retention)
+
+
+def _default_url() -> str:
+    """
+    :returns: The default SQLite URL. Makes sure the catalog directory exists.
+    """
+
+    db_path = urlparse(DEFAULT_URL).path  # pyright: ignore [reportGeneralTypeIssues]
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    return DEFAULT_URL
+
 
 @contextmanager
 def create_catalog(
@@ -328,10 +1035,45 @@ def create_catalog(
     engine: dict[str, Any] = {},
     **_,
 ) -> Generator["DatabaseCatalog", None, None]:
-    if not url:
-        # If no URL is set, default to SQLite
-        url = DEFAULT_URL
-        # Make sure the catalog directory exists
-        db_path = urlparse(url).path  # pyright: ignore [reportGeneralTypeIssues]
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    yield DatabaseCatalog(create_engine(url, **engine))
+    # If no URL is set, default to SQLite
+    url = url or _default_url()
+    db_engine = create_engine(url, **engine)
+    try:
+        yield DatabaseCatalog(db_engine)
+    finally:
+        db_engine.dispose()
+
+
+@asynccontextmanager
+async def create_async_catalog(
+    url: str | None = None,
+    engine: dict[str, Any] = {},
+    **config,
+) -> AsyncGenerator[AsyncAbstractCatalog, None]:
+    """
+    Creates an AsyncDatabaseCatalog. URLs without a driver use the dialect's
+    driver from ASYNC_DRIVERS (aiosqlite for SQLite and asyncpg for
+    PostgreSQL). If the URL's driver isn't async, or the async driver isn't
+    installed, a DatabaseCatalog wrapped in a ThreadedAsyncCatalog is yielded
+    instead.
+    """
+
+    url = url or _default_url()
+    async_url = make_url(url)
+    if async_driver := ASYNC_DRIVERS.get(async_url.drivername):
+        async_url = async_url.set(drivername=f"{async_url.drivername}+{async_driver}")
+    try:
+        async_engine = create_async_engine(async_url, **engine)
+    except (ImportError, InvalidRequestError) as e:
+        log.warning(
+            "Unable to create an async engine for the catalog. Falling back to "
+            "a thread pool. Install an async driver for better performance.",
+            exc_info=e,
+        )
+        with create_catalog(url, engine, **config) as catalog:
+            yield ThreadedAsyncCatalog(catalog)
+        return
+    try:
+        yield await AsyncDatabaseCatalog.create(async_engine)
+    finally:
+        await async_engine.dispose()
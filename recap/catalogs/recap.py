@@ -1,12 +1,12 @@
-from contextlib import contextmanager
-from datetime import datetime
-from typing import Any, Generator
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Generator
 
 import httpx
 
 from recap.server import DEFAULT_URL
 
-from .abstract import AbstractCatalog
+from .abstract import AbstractCatalog, AsyncAbstractCatalog
 
 
 class RecapCatalog(AbstractCatalog):
@@ -95,6 +95,110 @@ class RecapCatalog(AbstractCatalog):
             params["time"] = time.isoformat()
         return self.client.get("/catalog", params=params).json()
 
+    def compact(
+        self,
+        retention: timedelta | None = None,
+    ) -> int:
+        params: dict[str, Any] = {}
+        if retention is not None:
+            params["retention"] = retention.total_seconds()
+        response = self.client.post("/catalog/compact", params=params)
+        if response.status_code == httpx.codes.NOT_IMPLEMENTED:
+            raise NotImplementedError
+        response.raise_for_status()
+        return response.json()["versions_removed"]
+
+
+class AsyncRecapCatalog(AsyncAbstractCatalog):
+    """
+    The async counterpart of RecapCatalog. Requests are made with an
+    `httpx.AsyncClient`.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+    ):
+        self.client = client
+
+    async def touch(
+        self,
+        path: str,
+    ):
+        await self.write(path, {})
+
+    async def write(
+        self,
+        path: str,
+        metadata: dict[str, Any],
+        patch: bool = True,
+    ):
+        method = self.client.patch if patch else self.client.put
+        response = await method(
+            f"/catalog{path}/metadata",
+            json=metadata,
+        )
+        response.raise_for_status()
+
+    async def rm(
+        self,
+        path: str,
+    ):
+        (await self.client.delete(f"/catalog{path}")).raise_for_status()
+
+    async def ls(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> list[str] | None:
+        params: dict[str, Any] = {}
+        if time:
+            params["time"] = time.isoformat()
+        response = await self.client.get(f"/catalog{path}/children", params=params)
+        if response.status_code == httpx.codes.OK:
+            return response.json()
+        if response.status_code == httpx.codes.NOT_FOUND:
+            return None
+        response.raise_for_status()
+
+    async def read(
+        self,
+        path: str,
+        time: datetime | None = None,
+    ) -> dict[str, Any] | None:
+        params: dict[str, Any] = {}
+        if time:
+            params["time"] = time.isoformat()
+        response = await self.client.get(f"/catalog{path}/metadata", params=params)
+        if response.status_code == httpx.codes.OK:
+            return response.json()
+        if response.status_code == httpx.codes.NOT_FOUND:
+            return None
+        response.raise_for_status()
+
+    async def search(
+        self,
+        query: str,
+        time: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        params: dict[str, Any] = {"query": query}
+        if time:
+            params["time"] = time.isoformat()
+        return (await self.client.get("/catalog", params=params)).json()
+
+    async def compact(
+        self,
+        retention: timedelta | None = None,
+    ) -> int:
+        params: dict[str, Any] = {}
+        if retention is not None:
+            params["retention"] = retention.total_seconds()
+        response = await self.client.post("/catalog/compact", params=params)
+        if response.status_code == httpx.codes.NOT_IMPLEMENTED:
+            raise NotImplementedError
+        response.raise_for_status()
+        return response.json()["versions_removed"]
+
 
 @contextmanager
 def create_catalog(
@@ -103,3 +207,12 @@ def create_catalog(
 ) -> Generator["RecapCatalog", None, None]:
     with httpx.Client(base_url=url or DEFAULT_URL) as client:
         yield RecapCatalog(client)
+
+
+@asynccontextmanager
+async def create_async_catalog(
+    url: str | None = None,
+    **_,
+) -> AsyncGenerator["AsyncRecapCatalog", None]:
+    async with httpx.AsyncClient(base_url=url or DEFAULT_URL) as client:
+        yield AsyncRecapCatalog(client)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import typer
 from rich import print_json
@@ -12,7 +12,8 @@ app = typer.Typer(
 
     Recap's `recap catalog` command reads metadata Recap's data catalog. List
     the catalog's directory structure with `recap list`, read metadata from a
-    directory with `recap read`, and search with `recap search`.
+    directory with `recap read`, and search with `recap search`. Remove old
+    metadata versions with `recap compact`.
 """
 )
 
@@ -84,3 +85,32 @@ def read(
     with catalogs.create_catalog(**settings("catalog", {})) as c:
         results = c.read(path, time) or []
         print_json(data=results, sort_keys=True)
+
+
+@app.command()
+def compact(
+    retention_days: float = typer.Option(
+        None,
+        "--retention-days",
+        "-r",
+        help="Remove history older than this many days.",
+    ),
+):
+    """
+    Removes redundant metadata versions from the data catalog.
+
+    \b
+    Versions that are identical to the version before them are always
+    removed. If `--retention-days` is set, versions that were replaced before
+    the retention window are removed, too. Reads with `--time` inside the
+    retention window are unaffected.
+    """
+
+    retention = timedelta(days=retention_days) if retention_days else None
+    with catalogs.create_catalog(**settings("catalog", {})) as c:
+        try:
+            versions_removed = c.compact(retention)
+        except NotImplementedError:
+            typer.echo("The catalog doesn't support compaction.", err=True)
+            raise typer.Exit(code=1)
+        print_json(data={"versions_removed": versions_removed})
@@ -32,6 +32,16 @@ def crawl(
         True,
         help="Crawl all subdirectories recursively.",
     ),
+    concurrency: Optional[int] = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        help="Number of worker threads to browse and analyze paths with.",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        help="Skip analyzing paths that haven't changed since the last crawl.",
+    ),
 ):
     """
     Crawls infrastructure and writes metadata to the data catalog.
@@ -72,6 +82,16 @@ def crawl(
             if not url or url == crawler_config["url"]:
                 crawler_config["recursive"] = recursive
 
+    if concurrency:
+        for crawler_config in crawlers_configs:
+            if not url or url == crawler_config["url"]:
+                crawler_config["concurrency"] = concurrency
+
+    if incremental:
+        for crawler_config in crawlers_configs:
+            if not url or url == crawler_config["url"]:
+                crawler_config["incremental"] = incremental
+
     with create_catalog(**settings("catalog", {})) as catalog:
         for crawler_config in crawlers_configs:
             if not url or url == crawler_config["url"]:
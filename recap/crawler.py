@@ -1,15 +1,19 @@
 import fnmatch
 import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from pathlib import PurePosixPath
 from typing import Any, Generator
 
-from recap.browsers.analyzing import AnalyzingBrowser, create_browser
+from recap.browsers.analyzing import TIMEOUTS_KEY, AnalyzingBrowser, create_browser
 from recap.catalogs.abstract import AbstractCatalog
 from recap.paths import CatalogPath, RootPath
 
 log = logging.getLogger(__name__)
 
+# Metadata key that incremental crawls store path fingerprints in.
+FINGERPRINT_KEY = "crawler.fingerprint"
+
 
 class Crawler:
     """
@@ -32,6 +36,48 @@ class Crawler:
         terminology). For object stores, the _root_ is usually the bucket
         location.
 
+    # Concurrency
+
+    By default, the crawler browses and analyzes one path at a time. Crawling
+    large databases and object stores is mostly spent waiting on the network,
+    so the crawler can also browse and analyze paths from a pool of worker
+    threads. Set `concurrency` for a crawler in your `settings.toml`:
+
+    ```toml
+    [[crawlers]]
+    url = "postgresql://username@localhost/some_db"
+    concurrency = 16
+    ```
+
+    Workers pull paths from a shared frontier, and analyze and list them in
+    parallel. All catalog writes and deletes still happen on a single thread,
+    so catalogs need not be thread-safe.
+
+    # Batching
+
+    The crawler persists paths in catalog batches (see
+    `AbstractCatalog.batch`) of up to `batch_size` paths, which defaults to
+    100. For the database catalog, each batch is a single transaction.
+
+    # Incremental Crawls
+
+    Analyzing every path on every crawl is expensive, especially when
+    analyzers profile data. When `incremental` is set, the crawler asks the
+    browser for a cheap fingerprint of each path (file size and modification
+    time, or a table's last modification time in the database's system
+    catalog). The fingerprint is stored alongside the path's metadata. Paths
+    whose fingerprint hasn't changed since the last crawl aren't analyzed
+    again.
+
+    ```toml
+    [[crawlers]]
+    url = "postgresql://username@localhost/some_db"
+    incremental = true
+    ```
+
+    Paths that a browser can't fingerprint are always analyzed, as are paths
+    where an analyzer timed out on the previous crawl.
+
     # Scheduling
 
     Recap's crawler does not have a built in scheduler or orchestrator. You can
@@ -48,6 +94,9 @@ class Crawler:
         catalog: AbstractCatalog,
         recursive: bool = True,
         filters: list[str] = [],
+        concurrency: int = 1,
+        incremental: bool = False,
+        batch_size: int = 100,
         **_,
     ):
         """
@@ -61,13 +110,27 @@ class Crawler:
             Unix filename pattern matching as defined in Python's fnmatch
             module. Filtered paths are relative to the browser (excluding the
             browser's root).
+        :param concurrency: Number of worker threads to use when browsing and
+            analyzing paths. A concurrency of 1 crawls one path at a time.
+        :param incremental: Skip analyzing paths whose browser fingerprint
+            matches the fingerprint stored in the catalog by a previous crawl.
+        :param batch_size: Maximum number of paths to persist in a single
+            catalog batch.
         """
 
+        assert concurrency > 0, f"Expected concurrency > 0, but got {concurrency}"
+        assert batch_size > 0, f"Expected batch_size > 0, but got {batch_size}"
+
         self.browser = browser
         self.catalog = catalog
         self.recursive = recursive
         self.filters = filters
         self.exploded_filters = self._explode_filters(filters)
+        self.concurrency = concurrency
+        self.incremental = incremental
+        self.batch_size = batch_size
+        # Metadata waiting to be written when the current batch ends.
+        self.pending_writes: list[tuple[str, dict[str, Any]]] = []
 
     def crawl(self):
         """
@@ -75,37 +138,189 @@ class Crawler:
         """
 
         log.info("Beginning crawl root=%s", self.browser.root())
+
+        if self.concurrency > 1:
+            self._crawl_concurrently()
+        else:
+            self._crawl_serially()
+
+        log.info("Finished crawl root=%s", self.browser.root())
+
+    def _crawl_serially(self):
+        """
+        Crawl depth-first, browsing and analyzing one path at a time.
+        """
+
         path_stack: list[CatalogPath] = [RootPath()]
 
         while len(path_stack) > 0:
-            relative_path = str(path_stack.pop())
-            full_path_posix = PurePosixPath(
-                str(self.browser.root()),
-                relative_path[1:],
-            )
+            with self._batch():
+                for _ in range(self.batch_size):
+                    if not path_stack:
+                        break
+                    path = path_stack.pop()
+                    stored_fingerprint = self._stored_fingerprint(path)
+                    browsed = self._browse(path, stored_fingerprint)
+                    path_stack.extend(self._persist(*browsed))
+
+    def _crawl_concurrently(self):
+        """
+        Crawl using a pool of `concurrency` worker threads. Workers browse and
+        analyze paths from the frontier. The calling thread persists each
+        result and adds the path's children to the frontier.
+
+        Results are persisted in batches of up to `batch_size` paths. A batch
+        is also written whenever no more results are ready, so the catalog
+        doesn't hold a batch open while waiting on slow workers.
+        """
 
-            log.info("Crawling path=%s", relative_path)
-            self.catalog.touch(str(full_path_posix))
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="recap-crawler",
+        )
 
-            # 1. Read and save metadata for path if filters match.
-            if self._matches(relative_path, self.filters) and (
-                metadata := self.browser.analyze(relative_path)
-            ):
-                self._write_metadata(full_path_posix, metadata)
+        try:
+            frontier: set[Future] = {executor.submit(self._browse, RootPath())}
+
+            while frontier:
+                # Wait for a result before opening a batch, so the catalog
+                # isn't held open while workers are busy.
+                done, frontier = wait(frontier, return_when=FIRST_COMPLETED)
+                with self._batch():
+                    persisted = 0
+                    while done and persisted < self.batch_size:
+                        for future in done:
+                            for child in self._persist(*future.result()):
+                                stored_fingerprint = self._stored_fingerprint(child)
+                                frontier.add(
+                                    executor.submit(
+                                        self._browse,
+                                        child,
+                                        stored_fingerprint,
+                                    )
+                                )
+                            persisted += 1
+                        # Only pick up results that are already finished.
+                        done, frontier = wait(
+                            frontier,
+                            timeout=0,
+                            return_when=FIRST_COMPLETED,
+                        )
+                    # Put back finished results that didn't fit in the batch.
+                    frontier |= done
+        finally:
+            # Don't start queued paths if the crawl failed.
+            executor.shutdown(cancel_futures=True)
+
+    @contextmanager
+    def _batch(self) -> Generator[None, None, None]:
+        """
+        Persist everything in the context in one catalog batch. Metadata
+        writes are buffered and written together with `write_many` at the end
+        of the batch.
+        """
 
-            # 2. Add children (that match filter) to path_stack.
-            children = self.browser.children(relative_path) or []
-            filtered_children = filter(
-                lambda p: self._matches(str(p), self.exploded_filters),
-                children,
+        self.pending_writes = []
+        with self.catalog.batch():
+            yield
+            if self.pending_writes:
+                self.catalog.write_many(self.pending_writes, True)
+        self.pending_writes = []
+
+    def _browse(
+        self,
+        path: CatalogPath,
+        stored_fingerprint: str | None = None,
+    ) -> tuple[str, dict[str, Any] | None, list[CatalogPath]]:
+        """
+        Analyze a path and list its children. This method does not touch the
+        catalog, so it's safe to call from crawler worker threads.
+
+        :param path: The path to browse, relative to the browser's root.
+        :param stored_fingerprint: The path's fingerprint from the previous
+            crawl, if any. The path is not analyzed if it's unchanged.
+        :returns: A tuple with the relative path, its metadata (if the path
+            matches the crawler's filters and has changed), and its children.
+        """
+
+        relative_path = str(path)
+        metadata = None
+
+        log.info("Crawling path=%s", relative_path)
+
+        # 1. Read metadata for path if filters match.
+        if self._matches(relative_path, self.filters):
+            fingerprint = (
+                self.browser.fingerprint(relative_path) if self.incremental else None
             )
-            if self.recursive:
-                path_stack.extend(filtered_children)
+            if fingerprint and fingerprint == stored_fingerprint:
+                log.debug("Skipping unchanged path=%s", relative_path)
+            elif metadata := self.browser.analyze(path):
+                if fingerprint:
+                    # Analyze paths with timed-out analyzers again next time.
+                    metadata[FINGERPRINT_KEY] = (
+                        None if metadata.get(TIMEOUTS_KEY) else fingerprint
+                    )
 
-            # 3. Remove deleted children from catalog.
-            self._remove_deleted(full_path_posix, children)
+        # 2. List children.
+        children = self.browser.children(relative_path) or []
 
-        log.info("Finished crawl root=%s", self.browser.root())
+        return (relative_path, metadata, children)
+
+    def _persist(
+        self,
+        relative_path: str,
+        metadata: dict[str, Any] | None,
+        children: list[CatalogPath],
+    ) -> list[CatalogPath]:
+        """
+        Write a browsed path's results to the catalog. This method must only
+        be called from a single thread.
+
+        :returns: The path's children that should be crawled next.
+        """
+
+        full_path_posix = self._full_path(relative_path)
+
+        self.catalog.touch(str(full_path_posix))
+
+        # 1. Save metadata for path.
+        if metadata:
+            self._write_metadata(full_path_posix, metadata)
+
+        # 2. Remove deleted children from catalog.
+        self._remove_deleted(full_path_posix, children)
+
+        # 3. Return children (that match filter) to crawl.
+        if self.recursive:
+            return [
+                child
+                for child in children
+                if self._matches(str(child), self.exploded_filters)
+            ]
+        return []
+
+    def _full_path(self, relative_path: str) -> PurePosixPath:
+        """
+        :returns: The path in the catalog for a path relative to the browser's
+            root.
+        """
+
+        return PurePosixPath(
+            str(self.browser.root()),
+            relative_path[1:],
+        )
+
+    def _stored_fingerprint(self, path: CatalogPath) -> str | None:
+        """
+        :returns: The fingerprint stored for a path by a previous incremental
+            crawl, or None if crawl is not incremental.
+        """
+
+        if self.incremental:
+            metadata = self.catalog.read(str(self._full_path(str(path)))) or {}
+            return metadata.get(FINGERPRINT_KEY)
+        return None
 
     def _matches(
         self,
@@ -129,7 +344,8 @@ class Crawler:
         metadata: dict[str, Any],
     ):
         """
-        Write a metadata dictionary to a path in the catalog.
+        Write a metadata dictionary to a path in the catalog. The write is
+        buffered until the current batch ends.
         """
 
         log.debug(
@@ -137,7 +353,7 @@ class Crawler:
             full_path_posix,
             metadata,
         )
-        self.catalog.write(str(full_path_posix), metadata, True)
+        self.pending_writes.append((str(full_path_posix), metadata))
 
     def _remove_deleted(
         self,
@@ -150,20 +366,35 @@ class Crawler:
         longer appear in the browser. This behavior removes children that used
         to exist in data infrastructure, but have been deleted since the last
         crawl.
+
+        Browsers may return children nested below the path, like the sampled
+        files in a Hive-partitioned dataset. The directories between the path
+        and its nested children are kept, and their catalog children are
+        compared the same way.
         """
 
-        catalog_children = self.catalog.ls(str(full_path_posix)) or []
-        instance_children_names = [c.name() for c in instance_children]
-        # Find catalog children that are not in the browser's children.
-        deleted_children = [
-            catalog_child
-            for catalog_child in catalog_children
-            if catalog_child not in instance_children_names
-        ]
-        for child in deleted_children:
-            path_to_remove = str(PurePosixPath(full_path_posix, child))
-            log.debug("Removing deleted path from catalog: %s", path_to_remove)
-            self.catalog.rm(path_to_remove)
+        # Expected catalog children for the path and each intermediate
+        # directory.
+        expected: dict[PurePosixPath, set[str]] = {full_path_posix: set()}
+        for instance_child in instance_children:
+            child_path = self._full_path(str(instance_child))
+            if full_path_posix not in child_path.parents:
+                continue
+            while child_path != full_path_posix:
+                expected.setdefault(child_path.parent, set()).add(child_path.name)
+                child_path = child_path.parent
+        for directory, instance_children_names in expected.items():
+            catalog_children = self.catalog.ls(str(directory)) or []
+            # Find catalog children that are not in the browser's children.
+            deleted_children = [
+                catalog_child
+                for catalog_child in catalog_children
+                if catalog_child not in instance_children_names
+            ]
+            for child in deleted_children:
+                path_to_remove = str(PurePosixPath(directory, child))
+                log.debug("Removing deleted path from catalog: %s", path_to_remove)
+                self.catalog.rm(path_to_remove)
 
     def _explode_filters(self, filters: list[str]) -> list[str]:
         """
@@ -1,6 +1,8 @@
 import logging
 import sys
+from functools import cache
 from types import ModuleType
+from typing import Any
 
 import typer
 from fastapi import APIRouter
@@ -21,89 +23,63 @@ COMMAND_PLUGIN_GROUP = "recap.commands"
 ROUTER_PLUGIN_GROUP = "recap.routers"
 
 
-def load_analyzer_plugins() -> dict[str, ModuleType]:
+def _load_plugins(group: str, plugin_type: str) -> dict[str, Any]:
+    """
+    Loads all plugins in an entry point group. Entry points are only scanned
+    and loaded once per process; call `refresh()` to scan them again.
+
+    :param group: The entry point group to load.
+    :param plugin_type: The plugin type to use in log messages.
+    :returns: A new dictionary of plugin name to loaded plugin, so callers can
+        modify it without affecting the cache.
+    """
+
+    return dict(_load_plugins_cached(group, plugin_type))
+
+
+@cache
+def _load_plugins_cached(group: str, plugin_type: str) -> dict[str, Any]:
     plugins = {}
-    analyzer_plugins = entry_points(group=ANALYZER_PLUGIN_GROUP)
-    for analyzer_plugin in analyzer_plugins:
-        analyzer_plugin_name = analyzer_plugin.name
+    for plugin in entry_points(group=group):
         try:
-            analyzer_plugin_class = analyzer_plugin.load()
-            plugins[analyzer_plugin_name] = analyzer_plugin_class
+            plugins[plugin.name] = plugin.load()
         except ImportError as e:
             log.debug(
-                "Skipping analyzer=%s due to import error.",
-                analyzer_plugin_name,
+                "Skipping %s=%s due to import error.",
+                plugin_type,
+                plugin.name,
                 exc_info=e,
             )
     return plugins
 
 
+def refresh():
+    """
+    Clears the plugin cache, so the next `load_*_plugins` call scans entry
+    points again. Useful in tests, or after installing packages at runtime.
+    """
+
+    _load_plugins_cached.cache_clear()
+
+
+def load_analyzer_plugins() -> dict[str, ModuleType]:
+    return _load_plugins(ANALYZER_PLUGIN_GROUP, "analyzer")
+
+
 def load_browser_plugins() -> dict[str, ModuleType]:
-    plugins = {}
-    browser_plugins = entry_points(group=BROWSER_PLUGIN_GROUP)
-    for browser_plugin in browser_plugins:
-        browser_plugin_name = browser_plugin.name
-        try:
-            browser_plugin_class = browser_plugin.load()
-            plugins[browser_plugin_name] = browser_plugin_class
-        except ImportError as e:
-            log.debug(
-                "Skipping browser=%s due to import error.",
-                browser_plugin_name,
-                exc_info=e,
-            )
-    return plugins
+    return _load_plugins(BROWSER_PLUGIN_GROUP, "browser")
 
 
 def load_catalog_plugins() -> dict[str, ModuleType]:
-    plugins = {}
-    catalog_plugins = entry_points(group=CATALOG_PLUGIN_GROUP)
-    for catalog_plugin in catalog_plugins:
-        catalog_plugin_name = catalog_plugin.name
-        try:
-            catalog_plugin_class = catalog_plugin.load()
-            plugins[catalog_plugin_name] = catalog_plugin_class
-        except ImportError as e:
-            log.debug(
-                "Skipping catalog=%s due to import error.",
-                catalog_plugin_name,
-                exc_info=e,
-            )
-    return plugins
+    return _load_plugins(CATALOG_PLUGIN_GROUP, "catalog")
 
 
 def load_command_plugins() -> dict[str, typer.Typer]:
-    plugins = {}
-    command_plugins = entry_points(group=COMMAND_PLUGIN_GROUP)
-    for command_plugin in command_plugins:
-        command_plugin_name = command_plugin.name
-        try:
-            command_plugin_instance = command_plugin.load()
-            plugins[command_plugin_name] = command_plugin_instance
-        except ImportError as e:
-            log.debug(
-                "Skipping command=%s due to import error.",
-                command_plugin_name,
-                exc_info=e,
-            )
-    return plugins
+    return _load_plugins(COMMAND_PLUGIN_GROUP, "command")
 
 
 def load_router_plugins() -> dict[str, APIRouter]:
-    plugins = {}
-    router_plugins = entry_points(group=ROUTER_PLUGIN_GROUP)
-    for router_plugin in router_plugins:
-        router_plugin_name = router_plugin.name
-        try:
-            router_plugin_instance = router_plugin.load()
-            plugins[router_plugin_name] = router_plugin_instance
-        except ImportError as e:
-            log.debug(
-                "Skipping router=%s due to import error.",
-                router_plugin_name,
-                exc_info=e,
-            )
-    return plugins
+    return _load_plugins(ROUTER_PLUGIN_GROUP, "router")
 
 
 def init_command_plugins(app: typer.Typer) -> typer.Typer:
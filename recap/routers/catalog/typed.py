@@ -15,7 +15,7 @@ from typing import Callable
 from fastapi import APIRouter, Body, Depends, HTTPException
 from pydantic import BaseModel
 
-from recap.catalogs.abstract import AbstractCatalog
+from recap.catalogs.abstract import AsyncAbstractCatalog
 from recap.paths import CatalogPath
 from recap.plugins import load_browser_plugins
 from recap.server import get_catalog
@@ -113,22 +113,22 @@ def add_routes(
         path.
     """
 
-    def read_metadata(
+    async def read_metadata(
         time: datetime | None = None,
-        catalog: AbstractCatalog = Depends(get_catalog),
+        catalog: AsyncAbstractCatalog = Depends(get_catalog),
         **kwargs,
     ) -> metadata_class:
         browser_root_path = browser_root_path_class.parse_obj(kwargs)
         child_path = child_path_class.parse_obj(kwargs)
         path = str(browser_root_path) + str(child_path)
-        metadata = catalog.read(path, time)
+        metadata = await catalog.read(path, time)
         if metadata:
             return metadata_class.parse_obj(metadata)
         raise HTTPException(status_code=404)
 
-    def put_metadata(
+    async def put_metadata(
         metadata: metadata_class = Body(),
-        catalog: AbstractCatalog = Depends(get_catalog),
+        catalog: AsyncAbstractCatalog = Depends(get_catalog),
         **kwargs,
     ):
         browser_root_path = browser_root_path_class.parse_obj(kwargs)
@@ -140,11 +140,11 @@ def add_routes(
             exclude_none=True,
             exclude_unset=True,
         )
-        catalog.write(path, metadata_dict)
+        await catalog.write(path, metadata_dict)
 
-    def patch_metadata(
+    async def patch_metadata(
         metadata: metadata_class = Body(),
-        catalog: AbstractCatalog = Depends(get_catalog),
+        catalog: AsyncAbstractCatalog = Depends(get_catalog),
         **kwargs,
     ):
         browser_root_path = browser_root_path_class.parse_obj(kwargs)
@@ -156,7 +156,7 @@ def add_routes(
             exclude_none=True,
             exclude_unset=True,
         )
-        catalog.write(path, metadata_dict, True)
+        await catalog.write(path, metadata_dict, True)
 
     add_route(
         router,
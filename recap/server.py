@@ -1,8 +1,8 @@
-from typing import Generator
+from contextlib import AsyncExitStack
 
 from fastapi import FastAPI
 
-from recap.catalogs.abstract import AbstractCatalog
+from recap.catalogs.abstract import AsyncAbstractCatalog
 from recap.config import settings
 
 from . import catalogs, plugins
@@ -13,9 +13,38 @@ DEFAULT_URL = "http://localhost:8000"
 fastapp = FastAPI()
 
 
-def get_catalog() -> Generator[AbstractCatalog, None, None]:
-    with catalogs.create_catalog(**settings("catalog", {})) as c:
-        yield c
+def get_catalog() -> AsyncAbstractCatalog:
+    """
+    :returns: The async catalog that was opened when the server started. All
+        requests share the same catalog (and its connection pool).
+    """
+
+    return fastapp.state.catalog
+
+
+@fastapp.on_event("startup")
+async def open_catalog():
+    """
+    Opens the server's catalog. Settings under `server.pool` are forwarded to
+    the catalog's `engine` settings, so the database catalog's connection pool
+    can be sized for the server separately from the CLI.
+    """
+
+    catalog_settings = dict(settings("catalog", {}))
+    if pool_settings := settings("server.pool", {}):
+        catalog_settings["engine"] = dict(catalog_settings.get("engine", {})) | dict(
+            pool_settings
+        )
+    exit_stack = AsyncExitStack()
+    fastapp.state.catalog = await exit_stack.enter_async_context(
+        catalogs.create_async_catalog(**catalog_settings)
+    )
+    fastapp.state.exit_stack = exit_stack
+
+
+@fastapp.on_event("shutdown")
+async def close_catalog():
+    await fastapp.state.exit_stack.aclose()
 
 
 @fastapp.on_event("startup")
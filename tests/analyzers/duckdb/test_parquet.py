@@ -0,0 +1,165 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+import pytest
+
+pytest.importorskip("duckdb")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from recap.analyzers.duckdb.columns import Column, FileColumnAnalyzer
+from recap.analyzers.duckdb.parquet import ColumnChunk, FileParquetAnalyzer
+from recap.browsers.fs import FilePath
+
+
+class TestParquet:
+    @pytest.fixture
+    def url(self, tmp_path):
+        table = pa.table(
+            {"a": pa.array([1, 2, None]), "b": pa.array(["x", "y", "z"])},
+            schema=pa.schema(
+                [
+                    pa.field("a", pa.int64()),
+                    pa.field("b", pa.string(), nullable=False),
+                ]
+            ),
+        )
+        pq.write_table(table, tmp_path / "data.parquet", row_group_size=2)
+        return f"file://{tmp_path}"
+
+    def test_columns(self, url):
+        columns = FileColumnAnalyzer(url).analyze(FilePath(path="data.parquet"))
+
+        assert columns is not None
+        assert columns.__root__ == {
+            "a": Column(type="BIGINT", nullable=True),
+            "b": Column(type="VARCHAR", nullable=False),
+        }
+
+    def test_batch(self, url, tmp_path, monkeypatch):
+        for i in range(3):
+            pq.write_table(
+                pa.table({"a": [i]}),
+                tmp_path / f"other-{i}.parquet",
+            )
+        analyzer = FileColumnAnalyzer(url, batch=True)
+        described = []
+        describe = analyzer._describe
+
+        def record(cursor, function, url):
+            described.append(url)
+            return describe(cursor, function, url)
+
+        monkeypatch.setattr(analyzer, "_describe", record)
+        columns = {
+            name: analyzer.analyze(FilePath(path=name))
+            for name in [f"other-{i}.parquet" for i in range(3)] + ["data.parquet"]
+        }
+
+        # The first file is described on its own, then one DESCRIBE per
+        # distinct schema.
+        assert len(described) == 3
+        assert columns == {
+            name: FileColumnAnalyzer(url).analyze(FilePath(path=name))
+            for name in columns
+        }
+        assert columns["data.parquet"].__root__["b"].nullable is False  # type: ignore
+        # Batched results are only kept until they're returned.
+        assert analyzer.batched == {}
+
+    def test_batch_single_file(self, url, tmp_path, monkeypatch):
+        for i in range(3):
+            pq.write_table(
+                pa.table({"a": [i]}),
+                tmp_path / f"other-{i}.parquet",
+            )
+        analyzer = FileColumnAnalyzer(url, batch=True)
+        monkeypatch.setattr(
+            analyzer,
+            "_describe_parquet_directory",
+            lambda *_: pytest.fail("Read every footer for one file"),
+        )
+
+        columns = analyzer.analyze(FilePath(path="data.parquet"))
+
+        assert columns == FileColumnAnalyzer(url).analyze(FilePath(path="data.parquet"))
+
+    def test_batch_url_with_scheme(self, monkeypatch):
+        analyzer = FileColumnAnalyzer("s3://bucket/dir", batch=True)
+        directories = []
+        monkeypatch.setattr(
+            analyzer,
+            "_describe_parquet_directory",
+            lambda cursor, directory: directories.append(directory),
+        )
+        monkeypatch.setattr(analyzer, "_parquet_columns", lambda *_: {})
+
+        analyzer.analyze(FilePath(path="sub/a.parquet"))
+        analyzer.analyze(FilePath(path="sub/b.parquet"))
+
+        assert directories == ["s3://bucket/dir/sub"]
+
+    def test_batch_only_blocks_same_directory(self, monkeypatch):
+        analyzer = FileColumnAnalyzer("s3://bucket", batch=True)
+        slow_done = Event()
+
+        def describe_directory(cursor, directory):
+            if directory.endswith("/slow"):
+                slow_done.wait()
+
+        monkeypatch.setattr(
+            analyzer,
+            "_describe_parquet_directory",
+            describe_directory,
+        )
+        monkeypatch.setattr(analyzer, "_parquet_columns", lambda *_: {})
+        for directory in ["slow", "fast"]:
+            analyzer.analyze(FilePath(path=f"{directory}/a.parquet"))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            try:
+                slow = executor.submit(
+                    analyzer.analyze,
+                    FilePath(path="slow/b.parquet"),
+                )
+                fast = executor.submit(
+                    analyzer.analyze,
+                    FilePath(path="fast/b.parquet"),
+                )
+                assert fast.result(timeout=1) is not None
+                assert not slow.done()
+            finally:
+                slow_done.set()
+            assert slow.result(timeout=1) is not None
+
+    def test_metadata(self, url):
+        metadata = FileParquetAnalyzer(url).analyze(FilePath(path="data.parquet"))
+
+        assert metadata is not None
+        assert metadata.num_rows == 3
+        assert metadata.num_row_groups == 2
+        assert metadata.columns["a"].type == "INT64"
+        assert metadata.columns["a"].null_count == 1
+        assert metadata.columns["a"].compressed_size > 0
+        assert metadata.columns["a"].chunks is None
+
+    def test_column_chunks(self, url):
+        metadata = FileParquetAnalyzer(url, column_chunks=True).analyze(
+            FilePath(path="data.parquet")
+        )
+
+        assert metadata is not None
+        chunks = metadata.columns["b"].chunks
+        assert chunks is not None
+        assert [(c.row_group, c.num_values, c.min, c.max) for c in chunks] == [
+            (0, 2, "x", "y"),
+            (1, 1, "z", "z"),
+        ]
+        assert all(isinstance(c, ColumnChunk) for c in chunks)
+
+    def test_not_parquet(self, url):
+        assert FileParquetAnalyzer(url).analyze(FilePath(path="data.csv")) is None
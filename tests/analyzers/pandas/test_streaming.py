@@ -0,0 +1,233 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+from datetime import date
+
+import pytest
+
+pandas = pytest.importorskip("pandas")
+numpy = pytest.importorskip("numpy")
+
+from recap.analyzers.pandas.profile import ProfileAnalyzer
+from recap.analyzers.pandas.streaming import (
+    DistinctSketch,
+    HeavyHitters,
+    QuantileSketch,
+)
+from recap.browsers.fs import FilePath
+
+
+class TestStreamingProfile:
+    @pytest.fixture
+    def df(self):
+        return pandas.DataFrame(
+            {
+                "n": [float(i % 17) for i in range(1000)],
+                "s": [f"v{i % 7}" if i % 10 else None for i in range(1000)],
+            }
+        )
+
+    def test_matches_describe(self, df, tmp_path):
+        df.to_csv(tmp_path / "data.csv", index=False)
+        profile = ProfileAnalyzer(str(tmp_path), chunksize=64).analyze(
+            FilePath(path="data.csv")
+        )
+        description = df.describe(
+            percentiles=[0.25, 0.5, 0.75, 0.95, 0.99, 0.999],
+            include="all",
+        )
+
+        assert profile is not None
+        n = profile.__root__["n"]
+        assert n.count == 1000
+        assert n.mean == pytest.approx(description["n"]["mean"])
+        assert n.std == pytest.approx(description["n"]["std"])
+        assert n.min == 0
+        assert n.max == 16
+        assert n.p50 == pytest.approx(description["n"]["50%"])
+        assert n.p999 == pytest.approx(description["n"]["99.9%"])
+        s = profile.__root__["s"]
+        assert s.count == 900
+        assert s.unique == 7
+        assert s.top == description["s"]["top"]
+        assert s.freq == description["s"]["freq"]
+
+    @pytest.mark.parametrize("suffix", ["csv", "parquet", "jsonl"])
+    def test_select_columns(self, df, tmp_path, suffix):
+        df["x"] = 1
+        match suffix:
+            case "csv":
+                df.to_csv(tmp_path / "data.csv", index=False)
+            case "parquet":
+                pytest.importorskip("pyarrow")
+                df.to_parquet(tmp_path / "data.parquet")
+            case "jsonl":
+                df.to_json(tmp_path / "data.jsonl", orient="records", lines=True)
+        profile = ProfileAnalyzer(
+            str(tmp_path),
+            include_columns=["n", "s", "missing"],
+            exclude_columns=["s"],
+        ).analyze(FilePath(path=f"data.{suffix}"))
+
+        assert profile is not None
+        assert list(profile.__root__.keys()) == ["n"]
+        assert profile.__root__["n"].count == 1000
+
+    def test_boolean_column(self, tmp_path):
+        (tmp_path / "data.csv").write_text("flag\ntrue\nfalse\ntrue\n")
+        profile = ProfileAnalyzer(str(tmp_path)).analyze(FilePath(path="data.csv"))
+
+        assert profile is not None
+        flag = profile.__root__["flag"]
+        assert flag.count == 3
+        assert flag.unique == 2
+        assert flag.top == "true"
+        assert flag.freq == 2
+
+    def test_csv_date_columns(self, tmp_path):
+        (tmp_path / "data.csv").write_text(
+            "day,time,name\n"
+            "2022-01-01,2022-01-01 10:00:00,a\n"
+            "2022-01-02,2022-01-02T11:00:00,b\n"
+            "2022-01-02,2022-01-02T11:00:00,c\n"
+        )
+        profile = ProfileAnalyzer(str(tmp_path), chunksize=2).analyze(
+            FilePath(path="data.csv")
+        )
+        description = pandas.read_csv(tmp_path / "data.csv").describe(include="all")
+
+        assert profile is not None
+        for name in ["day", "time"]:
+            column = profile.__root__[name]
+            assert column.count == 3
+            assert column.unique == 2
+            assert column.top == description[name]["top"]
+            assert column.freq == 2
+            assert column.mean is None
+
+    def test_csv_late_type_change(self, tmp_path):
+        # PyArrow picks column types from the first block (1 MB by default).
+        (tmp_path / "data.csv").write_text(
+            "n,name\n" + "".join(f"{i % 3},a\n" for i in range(300_000)) + "oops,b\n"
+        )
+        profile = ProfileAnalyzer(str(tmp_path)).analyze(FilePath(path="data.csv"))
+
+        assert profile is not None
+        n = profile.__root__["n"]
+        assert n.count == 300_001
+        assert n.unique == 4
+        assert n.top == "0"
+        assert n.freq == 100_000
+        assert n.mean is None
+        assert profile.__root__["name"].count == 300_001
+
+    def test_json_late_type_change(self, tmp_path):
+        values = [i % 3 for i in range(250)] + ["oops"]
+        pandas.DataFrame({"n": values}).to_json(
+            tmp_path / "data.jsonl", orient="records", lines=True
+        )
+        profile = ProfileAnalyzer(str(tmp_path), chunksize=100).analyze(
+            FilePath(path="data.jsonl")
+        )
+        description = pandas.Series(values).describe()
+
+        assert profile is not None
+        n = profile.__root__["n"]
+        assert n.count == 251
+        assert n.unique == description["unique"] == 4
+        assert n.top == str(description["top"])
+        assert n.freq == description["freq"]
+        assert n.mean is None
+
+    def test_unique_column_has_top(self, tmp_path):
+        values = [f"key{i}" for i in range(5000)]
+        pandas.DataFrame({"key": values}).to_csv(tmp_path / "data.csv", index=False)
+        profile = ProfileAnalyzer(str(tmp_path), chunksize=1000).analyze(
+            FilePath(path="data.csv")
+        )
+
+        assert profile is not None
+        assert profile.__root__["key"].top in values
+        assert profile.__root__["key"].freq == 1
+
+    def test_parquet_date_column(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        pandas.DataFrame(
+            {"day": [date(2022, 1, 1), date(2022, 1, 2), date(2022, 1, 2)]}
+        ).to_parquet(tmp_path / "data.parquet")
+        profile = ProfileAnalyzer(str(tmp_path)).analyze(FilePath(path="data.parquet"))
+
+        assert profile is not None
+        assert profile.__root__["day"].top == "2022-01-02"
+        assert profile.__root__["day"].freq == 2
+
+    def test_empty_file(self, tmp_path):
+        (tmp_path / "empty.csv").write_text("a,b\n")
+
+        assert (
+            ProfileAnalyzer(str(tmp_path)).analyze(FilePath(path="empty.csv")) is None
+        )
+
+
+class TestSketches:
+    def test_quantile_sketch_is_bounded(self):
+        sketch = QuantileSketch(k=256)
+        values = numpy.random.default_rng(1).permutation(100_000).astype("float64")
+        for chunk in numpy.array_split(values, 100):
+            sketch.update(chunk)
+
+        assert sum(len(level) for level in sketch.levels) < 256 * len(sketch.levels)
+        p50, p99 = sketch.quantiles([0.5, 0.99])  # type: ignore
+        assert p50 == pytest.approx(50_000, rel=0.05)
+        assert p99 == pytest.approx(99_000, rel=0.05)
+
+    def test_quantile_sketch_is_exact_below_exact_size(self):
+        sketch = QuantileSketch()
+        values = numpy.random.default_rng(1).standard_normal(5_000)
+        for chunk in numpy.array_split(values, 50):
+            sketch.update(chunk)
+        qs = [0.25, 0.5, 0.99, 0.999]
+
+        assert sketch.quantiles(qs) == pytest.approx(
+            pandas.Series(values).quantile(qs).tolist()
+        )
+
+    def test_quantile_sketch_rank_error(self):
+        sketch = QuantileSketch()
+        values = numpy.random.default_rng(1).standard_normal(500_000)
+        for chunk in numpy.array_split(values, 500):
+            sketch.update(chunk)
+        qs = [0.001, 0.25, 0.5, 0.75, 0.99, 0.999]
+        ranks = numpy.searchsorted(numpy.sort(values), sketch.quantiles(qs))
+
+        assert sketch.count == 500_000
+        assert max(abs(ranks / len(values) - qs)) < 0.005
+
+    def test_distinct_sketch(self):
+        sketch = DistinctSketch(k=1024)
+        for start in range(0, 50_000, 10_000):
+            sketch.update(pandas.Series(range(start, start + 10_000)))
+        # Overlapping values aren't double counted.
+        sketch.update(pandas.Series(range(10_000)))
+
+        assert len(sketch.hashes) == 1024
+        assert sketch.count == pytest.approx(50_000, rel=0.1)
+
+    def test_heavy_hitters(self):
+        sketch = HeavyHitters(capacity=10)
+        for i in range(10):
+            sketch.update(
+                pandas.Series(["hot"] * 100 + [f"cold{i}-{j}" for j in range(50)])
+            )
+
+        assert len(sketch.counts) <= 10
+        assert sketch.top()[0] == "hot"  # type: ignore
+
+    def test_heavy_hitters_booleans(self):
+        sketch = HeavyHitters()
+        sketch.update(pandas.Series([True, False, True]))
+        top, freq = sketch.top()  # type: ignore
+
+        assert top is True
+        assert freq == 2
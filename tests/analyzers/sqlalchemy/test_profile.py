@@ -0,0 +1,108 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+import pytest
+import sqlalchemy
+
+from recap.analyzers.sqlalchemy.columns import Column, Columns, TableColumnAnalyzer
+from recap.analyzers.sqlalchemy.profile import TableProfileAnalyzer
+from recap.browsers.db import TablePath
+
+
+class TestTableProfileAnalyzer:
+    @pytest.fixture
+    def engine(self, monkeypatch, tmp_path):
+        # SQLite reports autoincrement="auto", which Column doesn't accept.
+        columns = Columns(
+            __root__={
+                "n": Column(nullable=True, type="INTEGER", generic_type="INTEGER"),
+                "s": Column(nullable=True, type="TEXT", generic_type="TEXT"),
+            }
+        )
+        monkeypatch.setattr(TableColumnAnalyzer, "analyze", lambda *_: columns)
+        # Use a file so concurrent chunk queries see the same database.
+        engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path}/profile.db")
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("CREATE TABLE t (n INTEGER, s TEXT)"))
+            for i in range(10):
+                conn.execute(sqlalchemy.text(f"INSERT INTO t VALUES ({i}, 'v{i}')"))
+        return engine
+
+    def test_profile(self, engine):
+        profile = TableProfileAnalyzer(engine).analyze(
+            TablePath(schema="main", table="t")
+        )
+
+        assert profile is not None
+        assert profile.__root__["n"].count == 10
+        assert profile.__root__["n"].row_limit is None
+        assert profile.__root__["s"].distinct == 10
+
+    def test_row_limit(self, engine):
+        profile = TableProfileAnalyzer(engine, row_limit=3).analyze(
+            TablePath(schema="main", table="t")
+        )
+
+        assert profile is not None
+        assert profile.__root__["s"].count == 3
+        assert profile.__root__["s"].distinct == 3
+        assert profile.__root__["s"].row_limit == 3
+        assert profile.__root__["s"].sample_rate is None
+
+    def test_unsupported_sample_falls_back_to_row_limit(self, engine):
+        profile = TableProfileAnalyzer(
+            engine,
+            sample_percent=10,
+            row_limit=5,
+            approximate=True,
+        ).analyze(TablePath(schema="main", table="t"))
+
+        assert profile is not None
+        assert profile.__root__["n"].count == 5
+        assert profile.__root__["n"].row_limit == 5
+        # SQLite has no approximate distinct count.
+        assert profile.__root__["n"].approximate is None
+
+    @pytest.mark.parametrize("concurrency", [1, 2])
+    def test_chunked(self, engine, concurrency):
+        executed = []
+        analyzer = TableProfileAnalyzer(
+            engine,
+            chunk_size=1,
+            concurrency=concurrency,
+        )
+        execute = analyzer._execute
+
+        def record(sql):
+            executed.append(sql)
+            return execute(sql)
+
+        analyzer._execute = record  # type: ignore
+        profile = analyzer.analyze(TablePath(schema="main", table="t"))
+
+        assert len(executed) == 2
+        assert profile is not None
+        assert profile.__root__["n"].count == 10
+        assert profile.__root__["n"].sum == 45
+        assert profile.__root__["s"].distinct == 10
+
+    @pytest.mark.parametrize(
+        "dialect,expected",
+        [
+            ("postgresql", "x t TABLESAMPLE SYSTEM (1.5)"),
+            ("snowflake", "x t TABLESAMPLE SYSTEM (1.5)"),
+            ("bigquery", "x t TABLESAMPLE SYSTEM (1.5 PERCENT)"),
+            ("mysql", "x t"),
+        ],
+    )
+    def test_sample_from_clause(self, dialect, expected):
+        analyzer = TableProfileAnalyzer(None, sample_percent=1.5)  # type: ignore
+
+        assert analyzer._from_clause(dialect, "x", True)[0] == expected
+        # Views can't be sampled.
+        assert analyzer._from_clause(dialect, "x", False) == ("x t", {})
+
+    def test_invalid_sample_percent(self):
+        with pytest.raises(AssertionError):
+            TableProfileAnalyzer(None, sample_percent=0)  # type: ignore
@@ -0,0 +1,391 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+
+import pytest
+import sqlalchemy
+from sqlalchemy.dialects.mysql.base import MySQLDialect
+
+from recap.analyzers.sqlalchemy.primary_key import TablePrimaryKeyAnalyzer
+from recap.analyzers.sqlalchemy.reflection import (
+    EMPTY_RESULTS,
+    PRIVATE_DIALECT_ATTRIBUTES,
+    SchemaReflector,
+    get_reflector,
+)
+from recap.browsers.db import TablePath
+
+
+class SqliteReflector(SchemaReflector):
+    """
+    Bulk reflects SQLite's columns through the same dialect hooks that
+    PostgreSQL and MySQL use.
+    """
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.queries = []
+
+    def _sqlite_relations(self, conn, schema):
+        self.queries.append(("relations", schema))
+        return list(
+            conn.execute(
+                sqlalchemy.text("SELECT name FROM sqlite_master WHERE type = 'table'")
+            ).scalars()
+        )
+
+    def _sqlite_columns(self, conn, schema):
+        self.queries.append(("columns", schema))
+        return {
+            row["tbl"]: [{"name": row["name"]}]
+            for row in conn.execute(
+                sqlalchemy.text(
+                    """
+                    SELECT m.name AS tbl, p.name
+                    FROM sqlite_master m, pragma_table_info(m.name) p
+                    WHERE m.type = 'table' AND p.cid = 0
+                    """
+                )
+            ).mappings()
+        }
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, dialect, rows):
+        self.dialect = dialect
+        self.rows = rows
+
+    def execute(self, statement, parameters):
+        assert parameters == {"schema": "db"}
+        return FakeResult(self.rows)
+
+
+class TestSchemaReflector:
+    @pytest.fixture
+    def engine(self):
+        engine = sqlalchemy.create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.text("CREATE TABLE one (id INTEGER PRIMARY KEY, name TEXT)")
+            )
+            conn.execute(sqlalchemy.text("CREATE TABLE two (id INTEGER)"))
+        return engine
+
+    @pytest.fixture
+    def mysql_dialect(self):
+        dialect = MySQLDialect()
+        dialect.server_version_info = (8, 0, 32)
+        dialect._connection_charset = "utf8mb4"
+        return dialect
+
+    def test_bulk_reflection(self, engine):
+        reflector = SqliteReflector(engine)
+
+        assert reflector.get("columns", "one", "main") == [{"name": "id"}]
+        assert reflector.get("columns", "two", "main") == [{"name": "id"}]
+        assert reflector.queries == [("relations", "main"), ("columns", "main")]
+
+    def test_results_are_copies(self, engine):
+        reflector = SqliteReflector(engine)
+
+        # Analyzers modify reflected results.
+        del reflector.get("columns", "one", "main")[0]["name"]
+        assert reflector.get("columns", "one", "main") == [{"name": "id"}]
+
+    def test_missing_table_falls_back(self, engine):
+        reflector = SqliteReflector(engine)
+        reflector.get("columns", "one", "main")
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("CREATE TABLE three (a TEXT, b TEXT)"))
+
+        assert [c["name"] for c in reflector.get("columns", "three", "main")] == [
+            "a",
+            "b",
+        ]
+        assert reflector.queries == [("relations", "main"), ("columns", "main")]
+
+    def test_fallback(self, engine):
+        reflector = SchemaReflector(engine)
+
+        assert [c["name"] for c in reflector.get("columns", "one", "main")] == [
+            "id",
+            "name",
+        ]
+
+    def test_fallback_reuses_inspector(self, engine):
+        reflector = SchemaReflector(engine)
+        statements = []
+        sqlalchemy.event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        reflector.get("columns", "one", "main")
+        queried = len(statements)
+        reflector.get("columns", "one", "main")
+
+        # Served from the Inspector's reflection cache.
+        assert queried
+        assert len(statements) == queried
+
+    def test_missing_private_attributes_fall_back(self, engine, monkeypatch):
+        monkeypatch.setitem(
+            PRIVATE_DIALECT_ATTRIBUTES,
+            "_sqlite_columns",
+            ["_removed_in_a_later_release"],
+        )
+        reflector = SqliteReflector(engine)
+
+        assert [c["name"] for c in reflector.get("columns", "one", "main")] == [
+            "id",
+            "name",
+        ]
+        assert reflector.queries == []
+
+    def test_reflector_is_shared(self, engine):
+        assert get_reflector(engine) is get_reflector(engine)
+        assert (
+            TablePrimaryKeyAnalyzer(engine).analyze(
+                TablePath(schema="main", table="two")
+            )
+            is None
+        )
+
+    def test_reflector_is_dropped_on_dispose(self, engine):
+        reflector = get_reflector(engine)
+        engine.dispose()
+
+        assert get_reflector(engine) is not reflector
+        assert get_reflector(engine) is get_reflector(engine)
+        engine.dispose()
+
+    def test_mysql_columns(self, engine, mysql_dialect):
+        columns = [
+            ("id", "int", "NO", None, "auto_increment", "", ""),
+            ("name", "varchar(32)", "YES", None, "", "it's", ""),
+            (
+                "ts",
+                "timestamp",
+                "NO",
+                "CURRENT_TIMESTAMP",
+                "DEFAULT_GENERATED on update CURRENT_TIMESTAMP",
+                "",
+                "",
+            ),
+            ("u", "int unsigned", "NO", "0", "", "", ""),
+            ("e", "enum('a','b')", "YES", "a", "", "", ""),
+            ("g", "int", "YES", None, "VIRTUAL GENERATED", "", "(`id` * 2)"),
+        ]
+        conn = FakeConnection(
+            mysql_dialect,
+            [
+                {
+                    "TABLE_NAME": "t",
+                    "COLUMN_NAME": name,
+                    "COLUMN_TYPE": column_type,
+                    "IS_NULLABLE": nullable,
+                    "COLUMN_DEFAULT": default,
+                    "EXTRA": extra,
+                    "COLUMN_COMMENT": comment,
+                    "GENERATION_EXPRESSION": generated,
+                }
+                for name, column_type, nullable, default, extra, comment, generated in columns
+            ],
+        )
+        # What SQLAlchemy reflects from the table's SHOW CREATE TABLE.
+        show_create = """CREATE TABLE `t` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `name` varchar(32) DEFAULT NULL COMMENT 'it''s',
+  `ts` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  `u` int unsigned NOT NULL DEFAULT '0',
+  `e` enum('a','b') DEFAULT 'a',
+  `g` int GENERATED ALWAYS AS ((`id` * 2)) VIRTUAL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB"""
+        expected = mysql_dialect._tabledef_parser.parse(show_create, "utf8mb4").columns
+
+        tables = SchemaReflector(engine)._mysql_columns(conn, "db")
+
+        assert [{**column, "type": repr(column["type"])} for column in tables["t"]] == [
+            {**column, "type": repr(column["type"])} for column in expected
+        ]
+
+    def test_mysql_indexes(self, engine, mysql_dialect):
+        conn = FakeConnection(
+            mysql_dialect,
+            [
+                {
+                    "TABLE_NAME": "t",
+                    "INDEX_NAME": index,
+                    "NON_UNIQUE": non_unique,
+                    "COLUMN_NAME": column,
+                    "SUB_PART": sub_part,
+                    "INDEX_TYPE": index_type,
+                }
+                for index, non_unique, column, sub_part, index_type in [
+                    ("ix_expr", 1, None, None, "BTREE"),
+                    ("ix_name", 1, "name", 10, "BTREE"),
+                    ("ix_name", 1, "e", None, "BTREE"),
+                    ("ix_text", 1, "name", None, "FULLTEXT"),
+                    ("uq_u", 0, "u", None, "BTREE"),
+                ]
+            ],
+        )
+
+        assert SchemaReflector(engine)._mysql_indexes(conn, "db") == {
+            "t": [
+                {
+                    "name": "ix_name",
+                    "column_names": ["name", "e"],
+                    "unique": False,
+                    "dialect_options": {"mysql_length": {"name": 10}},
+                },
+                {
+                    "name": "ix_text",
+                    "column_names": ["name"],
+                    "unique": False,
+                    "type": "FULLTEXT",
+                    "dialect_options": {"mysql_prefix": "FULLTEXT"},
+                },
+                {
+                    "name": "uq_u",
+                    "column_names": ["u"],
+                    "unique": True,
+                    "type": "UNIQUE",
+                },
+            ],
+        }
+
+    def test_mysql_foreign_keys(self, engine, mysql_dialect):
+        conn = FakeConnection(
+            mysql_dialect,
+            [
+                {
+                    "TABLE_NAME": "t",
+                    "CONSTRAINT_NAME": "fk",
+                    "COLUMN_NAME": column,
+                    "REFERENCED_TABLE_SCHEMA": "db",
+                    "REFERENCED_TABLE_NAME": "parent",
+                    "REFERENCED_COLUMN_NAME": referred_column,
+                    "UPDATE_RULE": "RESTRICT",
+                    "DELETE_RULE": "CASCADE",
+                }
+                for column, referred_column in [("a", "x"), ("b", "y")]
+            ],
+        )
+
+        assert SchemaReflector(engine)._mysql_foreign_keys(conn, "db") == {
+            "t": [
+                {
+                    "name": "fk",
+                    "constrained_columns": ["a", "b"],
+                    "referred_schema": "db",
+                    "referred_table": "parent",
+                    "referred_columns": ["x", "y"],
+                    "options": {"ondelete": "CASCADE"},
+                }
+            ],
+        }
+
+
+@pytest.mark.skipif(
+    "RECAP_TEST_POSTGRESQL_URL" not in os.environ,
+    reason="Set RECAP_TEST_POSTGRESQL_URL to test against PostgreSQL.",
+)
+class TestPostgresqlSchemaReflector:
+    @pytest.fixture
+    def engine(self):
+        engine = sqlalchemy.create_engine(os.environ["RECAP_TEST_POSTGRESQL_URL"])
+        with engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.text(
+                    """
+                    DROP SCHEMA IF EXISTS recap_test CASCADE;
+                    DROP SCHEMA IF EXISTS recap_test_other CASCADE;
+                    CREATE SCHEMA recap_test;
+                    CREATE SCHEMA recap_test_other;
+                    CREATE TYPE recap_test.mood AS ENUM ('happy', 'sad');
+                    CREATE DOMAIN recap_test.positive AS integer CHECK (VALUE > 0);
+                    CREATE TABLE recap_test_other.other (id int PRIMARY KEY);
+                    CREATE TABLE recap_test.parent (
+                        id serial PRIMARY KEY,
+                        a int,
+                        b text,
+                        UNIQUE (a, b)
+                    );
+                    COMMENT ON TABLE recap_test.parent IS 'A parent';
+                    COMMENT ON COLUMN recap_test.parent.b IS 'Column b';
+                    CREATE TABLE recap_test.child (
+                        id bigint GENERATED ALWAYS AS IDENTITY,
+                        parent_id int REFERENCES recap_test.parent (id)
+                            ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+                        a int,
+                        b text,
+                        other_id int REFERENCES recap_test_other.other (id)
+                            MATCH FULL ON UPDATE SET NULL,
+                        mood recap_test.mood DEFAULT 'happy',
+                        positive recap_test.positive,
+                        amount numeric(10, 2) NOT NULL DEFAULT 1.5,
+                        doubled int GENERATED ALWAYS AS (a * 2) STORED,
+                        PRIMARY KEY (parent_id, id),
+                        CONSTRAINT child_parent_ab FOREIGN KEY (a, b)
+                            REFERENCES recap_test.parent (a, b)
+                    );
+                    CREATE INDEX child_sorted ON recap_test.child
+                        (a DESC, b NULLS FIRST) INCLUDE (amount);
+                    CREATE UNIQUE INDEX child_partial ON recap_test.child (b)
+                        WHERE a > 0;
+                    CREATE INDEX child_expression ON recap_test.child (lower(b));
+                    CREATE INDEX child_hash ON recap_test.child USING hash (b)
+                        WITH (fillfactor = 70);
+                    CREATE VIEW recap_test.parent_view AS
+                        SELECT id, b FROM recap_test.parent;
+                    COMMENT ON VIEW recap_test.parent_view IS 'A view';
+                    CREATE MATERIALIZED VIEW recap_test.parent_materialized AS
+                        SELECT id FROM recap_test.parent;
+                    """
+                )
+            )
+        yield engine
+        with engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.text(
+                    """
+                    DROP SCHEMA recap_test CASCADE;
+                    DROP SCHEMA recap_test_other CASCADE;
+                    """
+                )
+            )
+        engine.dispose()
+
+    @pytest.mark.parametrize("kind", EMPTY_RESULTS.keys())
+    def test_matches_inspector(self, engine, kind):
+        inspector = sqlalchemy.inspect(engine)
+        reflector = SchemaReflector(engine)
+        tables = reflector._get_multi(kind, "recap_test")
+
+        assert tables is not None
+        assert set(tables) == {
+            "parent",
+            "child",
+            "parent_view",
+            "parent_materialized",
+        }
+        for table, result in tables.items():
+            expected = getattr(inspector, f"get_{kind}")(table, "recap_test")
+            if kind == "columns":
+                # Types don't compare equal.
+                result = [c | {"type": repr(c["type"])} for c in result]
+                expected = [c | {"type": repr(c["type"])} for c in expected]
+            assert result == expected
@@ -0,0 +1,157 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy
+
+from recap.analyzers.sqlalchemy.profile import NumericColumnProfile, StringColumnProfile
+from recap.analyzers.sqlalchemy.statistics import (
+    TableStatisticsAnalyzer,
+    _mysql_histogram,
+    _pg_distinct,
+)
+from recap.browsers.db import TablePath
+
+
+class TestTableStatisticsAnalyzer:
+    def test_statistics(self, monkeypatch):
+        engine = sqlalchemy.create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("CREATE TABLE t (n INTEGER, s TEXT, d DATE)"))
+            conn.execute(sqlalchemy.text("CREATE TABLE u (n INTEGER)"))
+        calls = []
+
+        def get_statistics(self, conn, schema):
+            calls.append(schema)
+            return (
+                {"t": 100.0, "u": -1},
+                {
+                    "t": {
+                        "n": {
+                            "null_fraction": 0.25,
+                            "distinct": 10,
+                            "most_common_values": ["3", "-1"],
+                            "histogram_bounds": ["-1.5", "2.5", "9"],
+                        },
+                        "s": {"distinct": 2, "most_common_values": ["a", "b"]},
+                    }
+                },
+            )
+
+        monkeypatch.setattr(
+            TableStatisticsAnalyzer,
+            "_sqlite_statistics",
+            get_statistics,
+            raising=False,
+        )
+        analyzer = TableStatisticsAnalyzer(engine)
+        statistics = analyzer.analyze(TablePath(schema="main", table="t"))
+
+        assert statistics is not None
+        columns = statistics.__root__
+        assert isinstance(columns["n"], NumericColumnProfile)
+        assert isinstance(columns["s"], StringColumnProfile)
+        assert columns["n"].dict(exclude_none=True) == {
+            "count": 100,
+            "approximate": True,
+            "nulls": 25,
+            "min": -1.5,
+            "max": 9,
+            "null_fraction": 0.25,
+            "distinct": 10,
+            "most_common_values": ["3", "-1"],
+            "histogram_bounds": ["-1.5", "2.5", "9"],
+        }
+        assert columns["s"].dict(exclude_none=True) == {
+            "count": 100,
+            "approximate": True,
+            "distinct": 2,
+            "most_common_values": ["a", "b"],
+        }
+        assert columns["d"].dict(exclude_none=True) == {
+            "count": 100,
+            "approximate": True,
+        }
+        # Never analyzed.
+        assert analyzer.analyze(TablePath(schema="main", table="u")) is None
+        # Statistics are read once per schema.
+        assert calls == ["main"]
+
+    def test_schemas_are_fetched_independently(self, monkeypatch):
+        analyzer = TableStatisticsAnalyzer(sqlalchemy.create_engine("sqlite://"))
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def get_schema_statistics(schema):
+            if schema == "slow":
+                fetching.set()
+                release.wait(5)
+            return None
+
+        monkeypatch.setattr(
+            analyzer,
+            "_get_schema_statistics",
+            get_schema_statistics,
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            slow = executor.submit(
+                analyzer.analyze,
+                TablePath(schema="slow", table="t"),
+            )
+            assert fetching.wait(5)
+            fast = executor.submit(
+                analyzer.analyze,
+                TablePath(schema="fast", table="t"),
+            )
+            try:
+                # Another schema doesn't wait for the slow query.
+                assert fast.result(timeout=1) is None
+            finally:
+                release.set()
+            assert slow.result() is None
+
+    def test_unsupported_dialect(self):
+        engine = sqlalchemy.create_engine("sqlite://")
+        analyzer = TableStatisticsAnalyzer(engine)
+
+        assert analyzer.analyze(TablePath(schema="main", table="t")) is None
+
+    def test_pg_distinct(self):
+        assert _pg_distinct(None, 100) is None
+        assert _pg_distinct(42, 100) == 42
+        assert _pg_distinct(-0.5, 100) == 50
+
+    def test_mysql_singleton_histogram(self):
+        statistics = _mysql_histogram(
+            '{"buckets": [[1, 0.25], [2, 0.75], [3, 1.0]], '
+            '"null-values": 0.0, "histogram-type": "singleton"}'
+        )
+
+        assert statistics == {
+            "null_fraction": 0.0,
+            "most_common_values": [1, 2, 3],
+            "most_common_frequencies": [0.25, 0.5, 0.25],
+            "distinct": 3,
+            "min": 1,
+            "max": 3,
+        }
+
+    def test_mysql_equi_height_histogram(self):
+        statistics = _mysql_histogram(
+            {
+                "buckets": [[1, 10, 0.5, 10], [11, 30, 1.0, 15]],
+                "null-values": 0.1,
+                "histogram-type": "equi-height",
+            }
+        )
+
+        assert statistics == {
+            "null_fraction": 0.1,
+            "histogram_bounds": [1, 11, 30],
+            "distinct": 25,
+            "min": 1,
+            "max": 30,
+        }
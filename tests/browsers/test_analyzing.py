@@ -0,0 +1,210 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+import sys
+import time
+from contextlib import contextmanager
+from threading import Event
+
+import pytest
+from fsspec.implementations.local import LocalFileSystem
+
+from recap.analyzers.abstract import AbstractAnalyzer, BaseMetadataModel
+from recap.browsers.analyzing import (
+    TIMEOUTS_KEY,
+    AnalyzingBrowser,
+    _analyzer_config,
+    parse_timeout,
+)
+from recap.browsers.fs import (
+    DirectoryPath,
+    FilePath,
+    FilesystemBrowser,
+    FilesystemRootPath,
+)
+
+
+class FileAnalyzer(AbstractAnalyzer):
+    def __init__(self):
+        self.analyzed = []
+
+    def analyze(self, path: FilePath) -> BaseMetadataModel | None:
+        self.analyzed.append(path)
+        return None
+
+
+class UntypedAnalyzer(AbstractAnalyzer):
+    def __init__(self):
+        self.analyzed = []
+
+    def analyze(self, path):
+        self.analyzed.append(path)
+        return None
+
+
+class SlowAnalyzer(AbstractAnalyzer):
+    def __init__(self):
+        self.done = Event()
+        self.calls = 0
+
+    def analyze(self, path):
+        self.calls += 1
+        self.done.wait()
+        return None
+
+
+class SleepAnalyzer(AbstractAnalyzer):
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def analyze(self, path):
+        time.sleep(self.seconds)
+        return None
+
+
+@contextmanager
+def create_analyzer(url: str, file_columns: list[str] | None = None, **_):
+    yield FileAnalyzer()
+
+
+class TestAnalyzingBrowser:
+    def test_only_compatible_analyzers_run(self, tmp_path):
+        file_analyzer = FileAnalyzer()
+        untyped_analyzer = UntypedAnalyzer()
+        browser = AnalyzingBrowser(
+            FilesystemBrowser(
+                fs=LocalFileSystem(),
+                base_path=str(tmp_path),
+                root_=FilesystemRootPath(scheme="file", name="localhost"),
+            ),
+            [file_analyzer, untyped_analyzer],
+        )
+        directory_path = DirectoryPath(path="some_dir")
+        file_path = FilePath(path="some_dir/some_file.csv")
+
+        browser.analyze(directory_path)
+        browser.analyze(file_path)
+
+        assert file_analyzer.analyzed == [file_path]
+        assert untyped_analyzer.analyzed == [directory_path, file_path]
+
+    def test_timeouts(self, tmp_path):
+        slow_analyzer = SlowAnalyzer()
+        untyped_analyzer = UntypedAnalyzer()
+        browser = AnalyzingBrowser(
+            FilesystemBrowser(
+                fs=LocalFileSystem(),
+                base_path=str(tmp_path),
+                root_=FilesystemRootPath(scheme="file", name="localhost"),
+            ),
+            [slow_analyzer, untyped_analyzer],
+            concurrency=2,
+            timeouts={slow_analyzer: 0.1},
+        )
+        file_path = FilePath(path="some_file.csv")
+
+        try:
+            assert browser.analyze(file_path) == {
+                TIMEOUTS_KEY: ["SlowAnalyzer"],
+            }
+            assert untyped_analyzer.analyzed == [file_path]
+        finally:
+            slow_analyzer.done.set()
+            browser.executor.shutdown()
+
+    def test_timeouts_start_when_analyzer_runs(self, tmp_path):
+        fast_analyzer = SleepAnalyzer(0.05)
+        browser = AnalyzingBrowser(
+            FilesystemBrowser(
+                fs=LocalFileSystem(),
+                base_path=str(tmp_path),
+                root_=FilesystemRootPath(scheme="file", name="localhost"),
+            ),
+            [SleepAnalyzer(0.3), SleepAnalyzer(0.3), fast_analyzer],
+            timeouts={fast_analyzer: 0.2},
+        )
+
+        assert browser.analyze(FilePath(path="some_file.csv")) == {
+            TIMEOUTS_KEY: [],
+        }
+
+    def test_hung_analyzer_does_not_block_others(self, tmp_path):
+        slow_analyzer = SlowAnalyzer()
+        untyped_analyzer = UntypedAnalyzer()
+        browser = AnalyzingBrowser(
+            FilesystemBrowser(
+                fs=LocalFileSystem(),
+                base_path=str(tmp_path),
+                root_=FilesystemRootPath(scheme="file", name="localhost"),
+            ),
+            [slow_analyzer, untyped_analyzer],
+            timeouts={slow_analyzer: 0.1},
+        )
+        file_paths = [FilePath(path="a.csv"), FilePath(path="b.csv")]
+
+        try:
+            for file_path in file_paths:
+                assert browser.analyze(file_path) == {
+                    TIMEOUTS_KEY: ["SlowAnalyzer"],
+                }
+            assert untyped_analyzer.analyzed == file_paths
+        finally:
+            slow_analyzer.done.set()
+
+    def test_abandoned_threads_are_capped(self, tmp_path):
+        slow_analyzer = SlowAnalyzer()
+        browser = AnalyzingBrowser(
+            FilesystemBrowser(
+                fs=LocalFileSystem(),
+                base_path=str(tmp_path),
+                root_=FilesystemRootPath(scheme="file", name="localhost"),
+            ),
+            [slow_analyzer],
+            timeouts={slow_analyzer: 0.05},
+            max_abandoned=1,
+        )
+        file_path = FilePath(path="some_file.csv")
+
+        try:
+            for _ in range(3):
+                assert browser.analyze(file_path) == {
+                    TIMEOUTS_KEY: ["SlowAnalyzer"],
+                }
+            # Skipped while its abandoned thread is still running.
+            assert slow_analyzer.calls == 1
+        finally:
+            slow_analyzer.done.set()
+        for _ in range(100):
+            if not browser.abandoned:
+                break
+            time.sleep(0.01)
+        assert browser.analyze(file_path) == {TIMEOUTS_KEY: []}
+        assert slow_analyzer.calls == 2
+
+    def test_fingerprint_covers_analyzer_config(self, tmp_path):
+        (tmp_path / "one.csv").write_text("a\n1\n")
+        analyzer = FileAnalyzer()
+
+        def fingerprint(**config):
+            return AnalyzingBrowser(
+                FilesystemBrowser(
+                    fs=LocalFileSystem(),
+                    base_path=str(tmp_path),
+                    root_=FilesystemRootPath(scheme="file", name="localhost"),
+                ),
+                [analyzer],
+                configs={analyzer: _analyzer_config(sys.modules[__name__], config)},
+            ).fingerprint("/one.csv")
+
+        assert fingerprint() == fingerprint(file_columns=None)
+        assert fingerprint() != fingerprint(file_columns=["a"])
+        # Settings the analyzer doesn't take don't change fingerprints.
+        assert fingerprint() == fingerprint(analyzer_concurrency=2)
+
+    @pytest.mark.parametrize(
+        "timeout,seconds",
+        [(5, 5.0), ("500ms", 0.5), ("60s", 60.0), ("1.5m", 90.0), ("1h", 3600.0)],
+    )
+    def test_parse_timeout(self, timeout, seconds):
+        assert parse_timeout(timeout) == seconds
@@ -0,0 +1,145 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy
+
+from recap.browsers.db import (
+    FINGERPRINT_QUERIES,
+    DatabaseBrowser,
+    TablePath,
+    TablesPath,
+    ViewsPath,
+    create_browser,
+    create_engine,
+    statement_timeout_options,
+)
+
+
+class TestCreateEngine:
+    def test_engines_are_shared(self, tmp_path):
+        url = f"sqlite:///{tmp_path}/one.db"
+
+        with create_browser(url=url) as browser:
+            with create_engine(url) as engine:
+                assert engine is browser.engine
+            # Still open for the browser.
+            with create_engine(url) as engine:
+                assert engine is browser.engine
+
+        with create_engine(url) as engine:
+            assert engine is not browser.engine
+
+    def test_options_are_part_of_key(self, tmp_path):
+        url = f"sqlite:///{tmp_path}/one.db"
+
+        with create_engine(url) as engine:
+            with create_engine(url, echo=True) as echo_engine:
+                assert engine is not echo_engine
+                assert engine.pool._pre_ping
+
+    def test_statement_timeout_options(self):
+        assert statement_timeout_options(
+            "postgresql://localhost/db",
+            1.5,
+            {"connect_args": {"options": "-c search_path=x"}, "echo": True},
+        ) == {
+            "connect_args": {"options": "-c search_path=x -c statement_timeout=1500"},
+            "echo": True,
+        }
+        assert statement_timeout_options("mysql+pymysql://localhost/db", 60) == {
+            "connect_args": {"init_command": "SET SESSION max_execution_time = 60000"}
+        }
+        assert statement_timeout_options("sqlite://", 1, {"echo": True}) == {
+            "echo": True
+        }
+        assert statement_timeout_options("/not/a/database", 1) == {}
+
+
+class TestDatabaseBrowser:
+    def _create_table(self, engine, table: str):
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text(f"CREATE TABLE {table} (id INTEGER)"))
+
+    def test_names_are_cached(self):
+        browser = DatabaseBrowser(sqlalchemy.create_engine("sqlite://"))
+        self._create_table(browser.engine, "one")
+
+        assert browser.children("/schemas/main/tables") == [
+            TablePath(schema="main", table="one")
+        ]
+        self._create_table(browser.engine, "two")
+        assert browser.tables("main") == ["one"]
+        assert browser.children("/schemas/main") == [
+            TablesPath(schema="main"),
+            ViewsPath(schema="main"),
+        ]
+        assert browser.children("/schemas/missing") is None
+
+    def test_cache_ttl(self):
+        browser = DatabaseBrowser(
+            sqlalchemy.create_engine("sqlite://"),
+            cache_ttl=0,
+        )
+        self._create_table(browser.engine, "one")
+
+        assert browser.tables("main") == ["one"]
+        self._create_table(browser.engine, "two")
+        assert browser.tables("main") == ["one", "two"]
+
+    def test_cache_only_blocks_same_key(self):
+        browser = DatabaseBrowser(sqlalchemy.create_engine("sqlite://"))
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch():
+            fetching.set()
+            release.wait(5)
+            return "slow"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            slow = executor.submit(browser._cached, ("fingerprints", "a"), slow_fetch)
+            assert fetching.wait(5)
+            fast = executor.submit(
+                browser._cached, ("fingerprints", "b"), lambda: "fast"
+            )
+            try:
+                # A different key doesn't wait for the slow fetch.
+                assert fast.result(timeout=1) == "fast"
+            finally:
+                release.set()
+            assert slow.result() == "slow"
+        # The same key is served from the cache.
+        assert browser._cached(("fingerprints", "a"), lambda: "refetched") == "slow"
+
+    def test_fingerprints(self, monkeypatch):
+        # One row per column, like the MySQL query.
+        monkeypatch.setitem(
+            FINGERPRINT_QUERIES,
+            "sqlite",
+            """
+            SELECT
+                m.name,
+                CASE WHEN m.name = 'unknown' THEN NULL ELSE 'known' END,
+                c.name,
+                c.type
+            FROM sqlite_master m
+            JOIN pragma_table_info(m.name) c
+            WHERE m.type IN ('table', 'view')
+            ORDER BY m.name, c.cid
+            """,
+        )
+        browser = DatabaseBrowser(sqlalchemy.create_engine("sqlite://"), cache_ttl=0)
+        self._create_table(browser.engine, "one")
+        self._create_table(browser.engine, "unknown")
+        fingerprint = browser.fingerprint("/schemas/main/tables/one")
+
+        assert fingerprint
+        assert browser.fingerprint("/schemas/main/tables/one") == fingerprint
+        assert browser.fingerprint("/schemas/main/tables/unknown") is None
+        with browser.engine.begin() as conn:
+            conn.execute(sqlalchemy.text("ALTER TABLE one ADD COLUMN name TEXT"))
+        assert browser.fingerprint("/schemas/main/tables/one") != fingerprint
@@ -0,0 +1,234 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+import threading
+
+import pytest
+
+from recap.analyzers.fsspec.partitions import Partitions, create_analyzer
+from recap.browsers.fs import DirectoryPath, FilePath, create_browser
+
+
+class TestFilesystemBrowser:
+    @pytest.fixture
+    def url(self, tmp_path):
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "a" / "one.csv").write_text("x\n1\n")
+        (tmp_path / "a" / "b" / "two.csv").write_text("x\n2\n")
+        (tmp_path / "three.csv").write_text("x\n3\n")
+        return f"file://{tmp_path}"
+
+    @pytest.mark.parametrize(
+        "options,expected_calls",
+        [
+            ({}, ["ls"] * 5),
+            ({"prefetch": True}, ["find"]),
+            # One ls per directory, listed in the background, and one for the
+            # missing path.
+            ({"listing_concurrency": 4}, ["ls"] * 4),
+        ],
+    )
+    def test_children(self, url, options, expected_calls, monkeypatch):
+        calls = []
+        local = threading.local()
+        with create_browser(url=url, **options) as browser:
+            for method in ["exists", "isdir", "info", "ls", "find"]:
+                original = getattr(browser.fs, method)
+
+                def record(*args, method=method, original=original, **kwargs):
+                    # Only record the browser's calls, not fsspec's own.
+                    if getattr(local, "depth", 0) == 0:
+                        calls.append(method)
+                    local.depth = getattr(local, "depth", 0) + 1
+                    try:
+                        return original(*args, **kwargs)
+                    finally:
+                        local.depth -= 1
+
+                monkeypatch.setattr(browser.fs, method, record)
+
+            assert sorted(browser.children("/"), key=str) == [  # type: ignore
+                DirectoryPath(path="a"),
+                FilePath(path="three.csv"),
+            ]
+            assert sorted(browser.children("/a"), key=str) == [  # type: ignore
+                DirectoryPath(path="a/b"),
+                FilePath(path="a/one.csv"),
+            ]
+            assert browser.children("/a/b") == [FilePath(path="a/b/two.csv")]
+            assert browser.children("/a/one.csv") == []
+            assert browser.children("/missing") is None
+            assert browser.fingerprint("/a/one.csv") is not None
+
+        assert calls == expected_calls
+
+    def _record_ls(self, browser, monkeypatch, block: str | None = None):
+        """
+        Record the directories the browser lists. Listing `block` waits until
+        the returned Event is set.
+        """
+
+        listed = []
+        unblock = threading.Event()
+        ls = browser.fs.ls
+
+        def record(path, *args, **kwargs):
+            key = browser._relative_path(path)
+            listed.append(key)
+            if key == block:
+                unblock.wait(5)
+            return ls(path, *args, **kwargs)
+
+        monkeypatch.setattr(browser.fs, "ls", record)
+        return listed, unblock
+
+    @pytest.mark.parametrize(
+        "options,expected_listed",
+        [
+            ({"filters": ["/a"]}, ["", "a"]),
+            ({"filters": ["/a/b/*.csv"]}, ["", "a", "a/b"]),
+            ({"recursive": False}, [""]),
+        ],
+    )
+    def test_listing_scope(self, url, options, expected_listed, monkeypatch):
+        with create_browser(url=url, listing_concurrency=4, **options) as browser:
+            listed, _ = self._record_ls(browser, monkeypatch)
+            browser.children("/")
+            with browser.listed:
+                browser.listed.wait_for(lambda: browser.listing_done, timeout=5)
+
+            assert sorted(listed) == expected_listed
+            # Paths outside the listing's scope are listed directly.
+            assert browser.children("/a/b") == [FilePath(path="a/b/two.csv")]
+
+    def test_missing_path_does_not_wait(self, url, monkeypatch):
+        with create_browser(url=url, listing_concurrency=4) as browser:
+            listed, unblock = self._record_ls(browser, monkeypatch, block="a")
+            try:
+                assert browser.children("/missing") is None
+                assert browser.children("/three.csv") == []
+                assert not browser.listing_done
+            finally:
+                unblock.set()
+
+    def test_close_stops_listing(self, url, monkeypatch):
+        with create_browser(url=url, listing_concurrency=4) as browser:
+            listed, unblock = self._record_ls(browser, monkeypatch, block="a")
+            browser.children("/")
+        unblock.set()
+        with browser.listed:
+            browser.listed.wait_for(lambda: browser.listing_done, timeout=5)
+
+        assert browser.listing_done
+        assert "a/b" not in listed
+
+    def test_prefetch_adds_implicit_directories(self, url, monkeypatch):
+        with create_browser(url=url, prefetch=True) as browser:
+            base_path = browser.base_path
+            # Object stores may only return objects, not their prefixes.
+            monkeypatch.setattr(
+                browser.fs,
+                "find",
+                lambda *_, **__: {
+                    f"{base_path}/a/b/two.csv": {
+                        "name": f"{base_path}/a/b/two.csv",
+                        "type": "file",
+                        "size": 4,
+                    },
+                },
+            )
+
+            assert browser.children("/") == [DirectoryPath(path="a")]
+            assert browser.children("/a") == [DirectoryPath(path="a/b")]
+            assert browser.children("/a/b") == [FilePath(path="a/b/two.csv")]
+
+
+class TestHivePartitions:
+    @pytest.fixture
+    def url(self, tmp_path):
+        for day in range(1, 6):
+            for hour in ["00", "01"]:
+                partition = tmp_path / "events" / f"dt=2023-01-0{day}" / f"hour={hour}"
+                partition.mkdir(parents=True)
+                (partition / "part-0000.parquet").write_text("data")
+                (partition / "part-0001.parquet").write_text("data")
+                (partition / "_SUCCESS").write_text("")
+        return f"file://{tmp_path}"
+
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"prefetch": True}, {"listing_concurrency": 2}],
+    )
+    def test_sample(self, url, options):
+        with create_browser(
+            url=url,
+            **options,
+            hive_partitions=True,
+            partition_sample=3,
+        ) as browser:
+            assert browser.children("/") == [DirectoryPath(path="events")]
+            assert browser.children("/events") == [
+                FilePath(path="events/dt=2023-01-01/hour=00/part-0000.parquet"),
+                FilePath(path="events/dt=2023-01-03/hour=00/part-0000.parquet"),
+                FilePath(path="events/dt=2023-01-05/hour=01/part-0000.parquet"),
+            ]
+
+    def test_sample_latest(self, url):
+        with create_browser(url=url, hive_partitions=True) as browser:
+            assert browser.children("/events") == [
+                FilePath(path="events/dt=2023-01-05/hour=01/part-0000.parquet"),
+            ]
+
+    def test_disabled(self, url):
+        with create_browser(url=url) as browser:
+            assert len(browser.children("/events")) == 5  # type: ignore
+
+    def test_partitions_analyzer(self, url):
+        with create_analyzer(url=url, hive_partitions=True) as analyzer:
+            assert analyzer.analyze(DirectoryPath(path="")) is None
+            partitions = analyzer.analyze(DirectoryPath(path="events"))
+
+        assert partitions == Partitions(
+            keys=["dt", "hour"],
+            values={
+                "dt": {f"2023-01-0{day}": 4 for day in range(1, 6)},
+                "hour": {"00": 10, "01": 10},
+            },
+            partitions=10,
+            files=20,
+            size=80,
+        )
+
+    @pytest.mark.parametrize(
+        "options,expected_calls",
+        [({}, ["ls", "find"]), ({"prefetch": True}, ["find"])],
+    )
+    def test_analyzer_shares_listing(self, url, options, expected_calls, monkeypatch):
+        calls = []
+        local = threading.local()
+        with create_browser(url=url, hive_partitions=True, **options) as browser:
+            with create_analyzer(url=url, hive_partitions=True, **options) as analyzer:
+                assert analyzer.browser is browser
+                for method in ["ls", "find"]:
+                    original = getattr(browser.fs, method)
+
+                    def record(*args, method=method, original=original, **kwargs):
+                        # Only record the browser's calls, not fsspec's own.
+                        if getattr(local, "depth", 0) == 0:
+                            calls.append(method)
+                        local.depth = getattr(local, "depth", 0) + 1
+                        try:
+                            return original(*args, **kwargs)
+                        finally:
+                            local.depth -= 1
+
+                    monkeypatch.setattr(browser.fs, method, record)
+
+                # The crawler analyzes a directory before listing its children.
+                assert analyzer.analyze(DirectoryPath(path="events"))
+                assert browser.children("/events") == [
+                    FilePath(path="events/dt=2023-01-05/hour=01/part-0000.parquet"),
+                ]
+
+        assert calls == expected_calls
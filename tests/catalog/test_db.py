@@ -2,14 +2,23 @@
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-module-docstring
 
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
 
 from recap.analyzers.sqlalchemy.primary_key import PrimaryKey
-from recap.catalogs.db import CatalogEntry, DatabaseCatalog
+from recap.catalogs.db import (
+    CatalogEntry,
+    CurrentCatalogEntry,
+    DatabaseCatalog,
+    content_hash,
+    create_async_catalog,
+)
 
 
 class TestCatalogEntry:
@@ -212,3 +221,292 @@ class TestDatabaseCatalog:
         search_result = catalog.search("json_extract(metadata, '$.\"name\"') = 'test'")
 
         assert search_result == [metadata.dict()]
+
+    def test_search_time(self, catalog):
+        path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.write(path / "one", {"name": "test"}, patch=False)
+        catalog.write(path / "two", {"name": "test"}, patch=False)
+        catalog.rm(path / "two")
+        query = "json_extract(metadata, '$.\"name\"') = 'test'"
+
+        assert catalog.search(query, datetime.utcnow() + timedelta(days=1)) == [
+            {"name": "test"}
+        ]
+        assert catalog.search(query, datetime.utcnow() - timedelta(days=1)) == []
+
+    def test_write_many(self, catalog):
+        parent_path = Path(
+            "databases",
+            "postgresql",
+            "instances",
+            "localhost",
+            "schemas",
+            "some_db",
+            "tables",
+        )
+        catalog.write(parent_path / "table_one", {"a": 1})
+        catalog.write_many(
+            [
+                (str(parent_path / "table_one"), {"b": 2}),
+                (str(parent_path / "table_two"), {"a": 3}),
+                (str(parent_path / "table_two"), {"b": 4}),
+            ]
+        )
+
+        assert sorted(catalog.ls(parent_path)) == ["table_one", "table_two"]
+        assert catalog.read(parent_path / "table_one") == {"a": 1, "b": 2}
+        assert catalog.read(parent_path / "table_two") == {"a": 3, "b": 4}
+
+    def test_write_many_no_patch(self, catalog):
+        path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.write(path, {"a": 1})
+        catalog.write_many([(str(path), {"b": 2})], patch=False)
+
+        assert catalog.read(path) == {"b": 2}
+
+    def test_batch(self, catalog):
+        parent_path = Path("databases", "postgresql", "instances", "localhost")
+        with catalog.batch():
+            catalog.touch(parent_path / "one")
+            catalog.write(parent_path / "two", {"a": 1})
+            # Reads in a batch see the batch's writes.
+            assert sorted(catalog.ls(parent_path)) == ["one", "two"]
+            catalog.rm(parent_path / "one")
+            catalog.touch(parent_path / "three")
+
+        assert sorted(catalog.ls(parent_path)) == ["three", "two"]
+        assert catalog.read(parent_path / "two") == {"a": 1}
+
+    def test_batch_touch_after_rm(self, catalog):
+        parent_path = Path("databases", "postgresql", "instances", "localhost")
+        with catalog.batch():
+            catalog.touch(parent_path / "one")
+            catalog.rm(parent_path)
+            catalog.touch(parent_path / "one")
+
+        assert catalog.ls(parent_path) == ["one"]
+
+    def test_batch_rollback(self, catalog):
+        parent_path = Path("databases", "postgresql", "instances", "localhost")
+        with pytest.raises(ValueError):
+            with catalog.batch():
+                catalog.write(parent_path / "one", {"a": 1})
+                raise ValueError()
+
+        assert catalog.ls(parent_path) is None
+
+    def test_read_time(self, catalog):
+        path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.write(path, {"a": 1})
+        before_update = datetime.utcnow()
+        catalog.write(path, {"a": 2})
+
+        assert catalog.read(path) == {"a": 2}
+        assert catalog.read(path, datetime.utcnow() + timedelta(days=1)) == {"a": 2}
+        assert catalog.read(path, before_update - timedelta(days=1)) is None
+
+    def test_ls_time_after_rm(self, catalog):
+        parent_path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.touch(parent_path / "one")
+        catalog.touch(parent_path / "two")
+        catalog.rm(parent_path / "one")
+
+        assert catalog.ls(parent_path) == ["two"]
+        assert catalog.ls(parent_path, datetime.utcnow() + timedelta(days=1)) == ["two"]
+
+    def test_backfill_current(self, engine):
+        CatalogEntry.__table__.create(engine)
+        with Session(engine) as session, session.begin():
+            session.add_all(
+                [
+                    CatalogEntry(parent="/", name="one", metadata_={"a": 1}),
+                    CatalogEntry(parent="/", name="one", metadata_={"a": 2}),
+                    CatalogEntry(
+                        parent="/",
+                        name="two",
+                        metadata_={},
+                        deleted_at=datetime.now(),
+                    ),
+                ]
+            )
+
+        catalog = DatabaseCatalog(engine)
+
+        with Session(engine) as session:
+            assert session.query(CurrentCatalogEntry).count() == 1
+        assert catalog.ls("/") == ["one"]
+        assert catalog.read("/one") == {"a": 2}
+
+    def test_compact_identical_versions(self, engine):
+        # Catalogs created before content hashes existed have duplicates.
+        CatalogEntry.__table__.create(engine)
+        with Session(engine) as session, session.begin():
+            session.add_all(
+                [
+                    CatalogEntry(parent="/", name="one", metadata_={"a": 1}),
+                    CatalogEntry(parent="/", name="one", metadata_={"a": 1}),
+                    CatalogEntry(parent="/", name="one", metadata_={"a": 2}),
+                    CatalogEntry(parent="/", name="one", metadata_={"a": 2}),
+                ]
+            )
+        catalog = DatabaseCatalog(engine)
+
+        assert catalog.compact() == 2
+        assert catalog.compact() == 0
+        assert catalog.read("/one") == {"a": 2}
+
+    def test_write_unchanged_metadata(self, catalog, engine):
+        path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.write(path, {"a": 1, "b": 2})
+        catalog.write(path, {"b": 2, "a": 1}, patch=False)
+        catalog.write(path, {"a": 1})
+
+        with Session(engine) as session:
+            hashes = session.scalars(
+                select(CatalogEntry.content_hash)
+                .where(CatalogEntry.name == "localhost")
+                .order_by(CatalogEntry.id)
+            ).all()
+            assert len(hashes) == 2
+            assert hashes[-1] == content_hash({"a": 1, "b": 2})
+
+    def test_add_missing_columns(self, engine):
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE catalog (id INTEGER PRIMARY KEY, "
+                    "parent VARCHAR NOT NULL, name VARCHAR NOT NULL, "
+                    "metadata JSON NOT NULL, "
+                    "created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+                    "deleted_at DATETIME)"
+                )
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO catalog (parent, name, metadata) "
+                    "VALUES ('/', 'one', '{\"a\": 1}')"
+                )
+            )
+        catalog = DatabaseCatalog(engine)
+        catalog.write("/one", {"a": 1})
+
+        assert catalog.read("/one") == {"a": 1}
+        with Session(engine) as session:
+            assert session.query(CatalogEntry).count() == 1
+
+    def test_compact_retention(self, engine):
+        now = datetime.utcnow()
+        CatalogEntry.__table__.create(engine)
+        with Session(engine) as session, session.begin():
+            session.add_all(
+                [
+                    CatalogEntry(
+                        parent="/",
+                        name="one",
+                        metadata_={"a": 1},
+                        created_at=now - timedelta(days=30),
+                    ),
+                    CatalogEntry(
+                        parent="/",
+                        name="one",
+                        metadata_={"a": 2},
+                        created_at=now - timedelta(days=20),
+                    ),
+                    CatalogEntry(
+                        parent="/",
+                        name="one",
+                        metadata_={"a": 3},
+                        created_at=now - timedelta(days=1),
+                    ),
+                    CatalogEntry(
+                        parent="/",
+                        name="two",
+                        metadata_={},
+                        created_at=now - timedelta(days=30),
+                        deleted_at=now - timedelta(days=20),
+                    ),
+                ]
+            )
+        catalog = DatabaseCatalog(engine)
+
+        assert catalog.compact(timedelta(days=7)) == 2
+        assert catalog.read("/one") == {"a": 3}
+        assert catalog.read("/one", now - timedelta(days=5)) == {"a": 2}
+        assert catalog.ls("/", now - timedelta(days=5)) == ["one"]
+        with Session(engine) as session:
+            assert session.query(CatalogEntry).count() == 2
+
+    def test_rm_keeps_history(self, catalog, engine):
+        path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.write(path / "one", {"a": 1})
+        catalog.rm(path)
+
+        assert catalog.read(path / "one") is None
+        assert catalog.ls(path) is None
+        with Session(engine) as session:
+            entries = (
+                session.query(CatalogEntry)
+                .filter(CatalogEntry.name == "one")
+                .order_by(CatalogEntry.id)
+                .all()
+            )
+            # Previous versions are left alone and a tombstone is appended.
+            assert [e.is_deleted() for e in entries] == [False, False, True]
+            assert entries[-1].metadata_ == {"a": 1}
+
+    def test_rm_prefix_sibling(self, catalog):
+        parent_path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.touch(parent_path / "one" / "child")
+        catalog.touch(parent_path / "one_two" / "child")
+        catalog.touch(parent_path / "one%" / "child")
+        catalog.rm(parent_path / "one")
+
+        assert sorted(catalog.ls(parent_path)) == ["one%", "one_two"]
+        assert catalog.ls(parent_path / "one_two") == ["child"]
+
+    def test_walk_and_count(self, catalog):
+        parent_path = Path("databases", "postgresql", "instances", "localhost")
+        catalog.touch(parent_path / "one" / "child")
+        catalog.touch(parent_path / "two")
+        catalog.touch(Path("databases", "postgresql", "instances", "other"))
+        time = datetime.utcnow() + timedelta(days=1)
+
+        expected = [
+            f"/{parent_path}/one",
+            f"/{parent_path}/one/child",
+            f"/{parent_path}/two",
+        ]
+        assert sorted(catalog.walk(parent_path)) == expected
+        assert sorted(catalog.walk(parent_path, time)) == expected
+        assert catalog.count(parent_path) == 3
+        assert catalog.count(parent_path, time) == 3
+        assert catalog.count("/") == 8
+
+
+class TestAsyncDatabaseCatalog:
+    async def _write_and_read(self, url: str) -> tuple[str, Any]:
+        async with create_async_catalog(url) as catalog:
+            await catalog.write("/databases/one", {"a": 1})
+            await catalog.write("/databases/one", {"b": 2})
+            assert await catalog.ls("/databases") == ["one"]
+            metadata = await catalog.read("/databases/one")
+            await catalog.rm("/databases")
+            assert await catalog.ls("/databases") is None
+            return type(catalog).__name__, metadata
+
+    def test_async_catalog(self, tmp_path):
+        pytest.importorskip("aiosqlite")
+        url = f"sqlite:///{tmp_path}/recap.db"
+
+        assert asyncio.run(self._write_and_read(url)) == (
+            "AsyncDatabaseCatalog",
+            {"a": 1, "b": 2},
+        )
+
+    def test_sync_driver_falls_back_to_threads(self, tmp_path):
+        url = f"sqlite+pysqlite:///{tmp_path}/recap.db"
+
+        assert asyncio.run(self._write_and_read(url)) == (
+            "ThreadedAsyncCatalog",
+            {"a": 1, "b": 2},
+        )
@@ -0,0 +1,59 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from recap.catalogs.abstract import AsyncAbstractCatalog, ThreadedAsyncCatalog
+from recap.catalogs.db import DatabaseCatalog
+from recap.catalogs.recap import RecapCatalog
+from recap.routers.catalog.untyped import router
+from recap.server import get_catalog
+
+
+class RecordingCatalog(ThreadedAsyncCatalog):
+    def __init__(self, catalog: DatabaseCatalog):
+        super().__init__(catalog)
+        self.retentions = []
+
+    async def compact(self, retention: timedelta | None = None) -> int:
+        self.retentions.append(retention)
+        return await super().compact(retention)
+
+
+class UncompactableCatalog(ThreadedAsyncCatalog):
+    async def compact(self, retention: timedelta | None = None) -> int:
+        raise NotImplementedError
+
+
+class TestRecapCatalog:
+    def _client(self, catalog: AsyncAbstractCatalog) -> TestClient:
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_catalog] = lambda: catalog
+        return TestClient(app)
+
+    def test_compact(self, tmp_path):
+        database_catalog = DatabaseCatalog(
+            create_engine(f"sqlite:///{tmp_path}/recap.db")
+        )
+        async_catalog = RecordingCatalog(database_catalog)
+        catalog = RecapCatalog(self._client(async_catalog))
+
+        assert catalog.compact() == 0
+        assert catalog.compact(timedelta(days=7)) == 0
+        assert async_catalog.retentions == [None, timedelta(days=7)]
+
+    def test_compact_not_supported(self, tmp_path):
+        database_catalog = DatabaseCatalog(
+            create_engine(f"sqlite:///{tmp_path}/recap.db")
+        )
+        catalog = RecapCatalog(self._client(UncompactableCatalog(database_catalog)))
+
+        with pytest.raises(NotImplementedError):
+            catalog.compact()
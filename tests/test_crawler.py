@@ -0,0 +1,171 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from recap.browsers.analyzing import AnalyzingBrowser
+from recap.browsers.fs import (
+    DirectoryPath,
+    FilePath,
+    FilesystemRootPath,
+    create_browser,
+)
+from recap.catalogs.db import CatalogEntry, DatabaseCatalog
+from recap.crawler import FINGERPRINT_KEY, Crawler
+from recap.paths import CatalogPath
+
+
+class FakeBrowser:
+    def __init__(self, tree: dict[str, list[CatalogPath]]):
+        self.tree = tree
+        self.fingerprints: dict[str, str] = {}
+        self.analyzed: list[str] = []
+
+    def root(self) -> CatalogPath:
+        return FilesystemRootPath(scheme="file", name="localhost")
+
+    def children(self, path: str) -> list[CatalogPath] | None:
+        return self.tree.get(path)
+
+    def fingerprint(self, path: str) -> str | None:
+        return self.fingerprints.get(path)
+
+    def analyze(self, path: CatalogPath) -> dict[str, Any] | None:
+        self.analyzed.append(str(path))
+        if str(path).endswith(".csv"):
+            return {"fake.analyzer": {"path": str(path)}}
+        return None
+
+
+class TestCrawler:
+    root = "/filesystems/file/instances/localhost"
+
+    @pytest.fixture
+    def catalog(self):
+        return DatabaseCatalog(create_engine("sqlite:///:memory:"))
+
+    @pytest.fixture
+    def browser(self):
+        return FakeBrowser(
+            {
+                "/": [DirectoryPath(path="a"), DirectoryPath(path="b")],
+                "/a": [FilePath(path="a/one.csv"), FilePath(path="a/two.csv")],
+                "/b": [DirectoryPath(path="b/c")],
+                "/b/c": [FilePath(path="b/c/three.csv")],
+            }
+        )
+
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    @pytest.mark.parametrize("batch_size", [1, 100])
+    def test_crawl(self, browser, catalog, concurrency, batch_size):
+        Crawler(
+            browser,
+            catalog,
+            concurrency=concurrency,
+            batch_size=batch_size,
+        ).crawl()
+
+        assert sorted(catalog.ls(self.root)) == ["a", "b"]
+        assert sorted(catalog.ls(f"{self.root}/a")) == ["one.csv", "two.csv"]
+        assert catalog.ls(f"{self.root}/b/c") == ["three.csv"]
+        assert catalog.read(f"{self.root}/b/c/three.csv") == {
+            "fake.analyzer": {"path": "/b/c/three.csv"},
+        }
+
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_crawl_removes_deleted(self, browser, catalog, concurrency):
+        Crawler(browser, catalog, concurrency=concurrency).crawl()
+        browser.tree["/a"] = [FilePath(path="a/one.csv")]
+        Crawler(browser, catalog, concurrency=concurrency).crawl()
+
+        assert catalog.ls(f"{self.root}/a") == ["one.csv"]
+        assert catalog.read(f"{self.root}/a/two.csv") is None
+
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_crawl_nested_children(self, browser, catalog, concurrency):
+        Crawler(browser, catalog, concurrency=concurrency).crawl()
+        browser.tree["/b"] = [FilePath(path="b/c/d/four.csv")]
+        Crawler(browser, catalog, concurrency=concurrency).crawl()
+
+        assert catalog.ls(f"{self.root}/b") == ["c"]
+        assert catalog.ls(f"{self.root}/b/c") == ["d"]
+        assert catalog.ls(f"{self.root}/b/c/d") == ["four.csv"]
+        # The nested child's old siblings are removed.
+        assert catalog.read(f"{self.root}/b/c/three.csv") is None
+
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_recrawl_partitions(self, catalog, tmp_path, concurrency):
+        for day in range(1, 4):
+            partition = tmp_path / "events" / f"dt=2023-01-0{day}"
+            partition.mkdir(parents=True)
+            (partition / "part-0000.csv").write_text("a\n1\n")
+
+        def crawl() -> int:
+            with create_browser(
+                url=f"file://{tmp_path}",
+                hive_partitions=True,
+            ) as fs_browser:
+                Crawler(
+                    AnalyzingBrowser(fs_browser, []),
+                    catalog,
+                    concurrency=concurrency,
+                ).crawl()
+            with catalog.engine.connect() as conn:
+                return conn.execute(
+                    select(func.count()).select_from(CatalogEntry)
+                ).scalar_one()
+
+        rows = crawl()
+
+        # Crawling again doesn't tombstone and re-add the sampled partition.
+        assert crawl() == rows
+        assert catalog.ls(f"{self.root}/events") == ["dt=2023-01-03"]
+
+        # Partitions that are no longer sampled are removed.
+        partition = tmp_path / "events" / "dt=2023-01-04"
+        partition.mkdir()
+        (partition / "part-0000.csv").write_text("a\n1\n")
+        crawl()
+
+        assert catalog.ls(f"{self.root}/events") == ["dt=2023-01-04"]
+
+    def test_crawl_not_recursive(self, browser, catalog):
+        Crawler(browser, catalog, recursive=False, concurrency=4).crawl()
+
+        assert catalog.ls("/filesystems/file/instances") == ["localhost"]
+        assert catalog.ls(self.root) is None
+
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_crawl_incremental(self, browser, catalog, concurrency):
+        browser.fingerprints = {"/a/one.csv": "v1", "/a/two.csv": "v1"}
+        Crawler(browser, catalog, concurrency=concurrency, incremental=True).crawl()
+
+        assert catalog.read(f"{self.root}/a/one.csv") == {
+            "fake.analyzer": {"path": "/a/one.csv"},
+            FINGERPRINT_KEY: "v1",
+        }
+
+        browser.analyzed.clear()
+        browser.fingerprints["/a/two.csv"] = "v2"
+        Crawler(browser, catalog, concurrency=concurrency, incremental=True).crawl()
+
+        assert "/a/one.csv" not in browser.analyzed
+        assert "/a/two.csv" in browser.analyzed
+        # Paths without fingerprints are always analyzed.
+        assert "/b/c/three.csv" in browser.analyzed
+        assert catalog.read(f"{self.root}/a/one.csv") == {
+            "fake.analyzer": {"path": "/a/one.csv"},
+            FINGERPRINT_KEY: "v1",
+        }
+        assert catalog.read(f"{self.root}/a/two.csv") == {
+            "fake.analyzer": {"path": "/a/two.csv"},
+            FINGERPRINT_KEY: "v2",
+        }
+
+    def test_invalid_concurrency(self, browser, catalog):
+        with pytest.raises(AssertionError):
+            Crawler(browser, catalog, concurrency=0)
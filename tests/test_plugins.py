@@ -0,0 +1,49 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from recap import plugins
+
+
+class TestPlugins:
+    @pytest.fixture
+    def entry_point_calls(self, monkeypatch):
+        calls = []
+
+        def entry_points(group: str) -> list[EntryPoint]:
+            calls.append(group)
+            return [
+                EntryPoint(
+                    name="db",
+                    value="recap.catalogs.db",
+                    group=group,
+                ),
+                EntryPoint(
+                    name="missing",
+                    value="recap.does_not_exist",
+                    group=group,
+                ),
+            ]
+
+        monkeypatch.setattr(plugins, "entry_points", entry_points)
+        plugins.refresh()
+        yield calls
+        plugins.refresh()
+
+    def test_plugins_are_cached(self, entry_point_calls):
+        catalog_plugins = plugins.load_catalog_plugins()
+        catalog_plugins.clear()
+
+        assert list(plugins.load_catalog_plugins()) == ["db"]
+        assert entry_point_calls == [plugins.CATALOG_PLUGIN_GROUP]
+
+    def test_refresh(self, entry_point_calls):
+        plugins.load_catalog_plugins()
+        plugins.refresh()
+        plugins.load_catalog_plugins()
+
+        assert entry_point_calls == [plugins.CATALOG_PLUGIN_GROUP] * 2
@@ -0,0 +1,70 @@
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-module-docstring
+
+import pytest
+import sqlalchemy
+from fastapi import APIRouter, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import recap.catalogs.db
+from recap import catalogs, server
+from recap.catalogs.abstract import AsyncAbstractCatalog
+
+
+@pytest.fixture
+def server_settings(monkeypatch, tmp_path):
+    values = {
+        "catalog": {
+            "url": f"sqlite:///{tmp_path}/recap.db",
+            # SQLite file databases don't pool connections by default.
+            "engine": {"poolclass": AsyncAdaptedQueuePool},
+        },
+        "server.pool": {"pool_size": 3},
+    }
+    monkeypatch.setattr(
+        server,
+        "settings",
+        lambda key, default=None: values.get(key, default),
+    )
+    # Don't depend on the installed package's entry points.
+    monkeypatch.setattr(
+        catalogs,
+        "load_catalog_plugins",
+        lambda: {"db": recap.catalogs.db},
+    )
+    router = APIRouter()
+
+    @router.get("/catalog-id")
+    def catalog_id(catalog: AsyncAbstractCatalog = Depends(server.get_catalog)):
+        return id(catalog)
+
+    monkeypatch.setattr(
+        server.plugins,
+        "load_router_plugins",
+        lambda: {"test": router},
+    )
+    routes = list(server.fastapp.router.routes)
+    yield
+    server.fastapp.router.routes[:] = routes
+
+
+class TestServer:
+    def test_requests_share_catalog(self, server_settings):
+        with TestClient(server.fastapp) as client:
+            catalog = server.fastapp.state.catalog
+            responses = [client.get("/catalog-id") for _ in range(3)]
+
+            assert {response.json() for response in responses} == {id(catalog)}
+            # `server.pool` settings reach the catalog's engine.
+            assert catalog.catalog.engine.pool.size() == 3
+            disposed = []
+            sqlalchemy.event.listen(
+                catalog.catalog.engine,
+                "engine_disposed",
+                lambda engine: disposed.append(engine),
+            )
+
+        # Shutdown closes the catalog's engine.
+        assert disposed